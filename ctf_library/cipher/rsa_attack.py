@@ -0,0 +1,459 @@
+# file: rsa_attack.py
+
+# Attacks on RSA with Weak Parameters
+# - Ref: D. Boneh, Twenty Years of Attacks on the RSA Cryptosystem,
+#        https://crypto.stanford.edu/~dabo/papers/RSA-survey.pdf
+#
+# Hastad's Broadcast Attack
+# - Ref: https://en.wikipedia.org/wiki/Coppersmith%27s_attack#H%C3%A5stad%27s_broadcast_attack
+#
+# Common Modulus Attack
+# - Ref: G. J. Simmons, A "weak" privacy protocol using the RSA crypto algorithm,
+#        Cryptologia 7 (1983)
+#
+# Wiener's Attack
+# - Ref: https://en.wikipedia.org/wiki/Wiener%27s_attack
+# - Ref: https://en.wikipedia.org/wiki/Continued_fraction
+#
+# Fermat's Factorization (close primes)
+# - Ref: https://en.wikipedia.org/wiki/Fermat%27s_factorization_method
+#
+# Key Files
+# - Ref: https://www.pycryptodome.org/src/public_key/rsa
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from ctf_library.math.mathlib import MathLib
+from ctf_library.math.chinese_remainder_theorem import ChineseRemainderTheorem
+from ctf_library.math.fermat_factorization import FermatFactorization
+
+class RSAAttack:
+    '''
+    Attacks on RSA with Weak Parameters
+
+    The attacks on one public key (n, e):
+    (a) Wiener's attack finds a small private exponent d, when d is less
+        than n ^ (1/4) / 3, from the continued fraction of e / n, and
+    (b) Fermat's factorization finds p and q when they are close.
+
+    The attacks on several public keys with ciphertexts of one message:
+    (c) Hastad's broadcast attack finds m from m ^ e mod ni for e moduli,
+        with the Chinese Remainder Theorem and an integer e-th root, and
+    (d) the common modulus attack finds m from m ^ e1 mod n and m ^ e2 mod n
+        when gcd(e1, e2) = 1.
+
+    The attacks can be run over a batch of keys read from a directory of
+    JSON and PEM files, with the attacks on each key in several processes.
+    '''
+
+    default_attacks = [ 'wiener', 'fermat', 'hastad', 'common_modulus' ]
+    '''
+    The attacks run by attack_keys() by default.
+    '''
+
+    fermat_max_iterations = 1 << 20
+    '''
+    The number of iterations of Fermat's factorization for each key in
+    attack_keys().
+    '''
+
+    # ----- Attacks with Several Keys ----- #
+
+    @staticmethod
+    def hastad_broadcast(ciphertexts, moduli, e=None):
+        '''
+        Find the message m from the ciphertexts m ^ e mod ni, for e or more
+        pairwise coprime moduli ni.
+
+        With the Chinese Remainder Theorem, m ^ e mod (n1 * n2 * ... * ne) is
+        found, which is m ^ e itself because m is less than every ni.
+
+        :param ciphertexts: the ciphertexts ci = m ^ e mod ni
+        :type ciphertexts: list of int
+        :param moduli: the moduli ni
+        :type moduli: list of int
+        :param e: the public exponent; defaults to the number of ciphertexts
+        :type e: int, optional
+
+        :raise: ValueError if m is not found, e.g. when there are fewer than
+            e ciphertexts and m is not small enough
+
+        :return: the message m
+        :rtype: int
+        '''
+        if len(ciphertexts) != len(moduli):
+            raise ValueError(f'{len(ciphertexts)} ciphertexts for {len(moduli)} moduli')
+        if len(ciphertexts) < 1:
+            raise ValueError('no ciphertexts')
+        if e is None:
+            e = len(ciphertexts)
+        c, _ = ChineseRemainderTheorem.solve([ (c % n, n) for c, n in zip(ciphertexts, moduli) ])
+        m = MathLib.iroot(c, e)
+        if m ** e != c:
+            raise ValueError(f'the message is not found: the combined ciphertext is not an {e}-th power')
+        return m
+
+    @staticmethod
+    def common_modulus(c1, c2, e1, e2, n):
+        '''
+        Find the message m from c1 = m ^ e1 mod n and c2 = m ^ e2 mod n.
+
+        With s * e1 + t * e2 = g from the extended Euclidean algorithm,
+        m ^ g = c1 ^ s * c2 ^ t mod n.
+
+        :param c1: the ciphertext with the public exponent e1
+        :type c1: int
+        :param c2: the ciphertext with the public exponent e2
+        :type c2: int
+        :param e1: the first public exponent
+        :type e1: int
+        :param e2: the second public exponent
+        :type e2: int
+        :param n: the common modulus
+        :type n: int
+
+        :raise: ValueError if m is not found, i.e. when gcd(e1, e2) > 1 and
+            m ^ gcd(e1, e2) is not less than n
+
+        :return: the message m
+        :rtype: int
+        '''
+        g, s, t = MathLib.xgcd(e1, e2)
+        # a negative exponent is a power of the inverse mod n
+        m = pow(c1, s, n) * pow(c2, t, n) % n
+        if g == 1:
+            return m
+        root = MathLib.iroot(m, g)
+        if root ** g != m:
+            raise ValueError(f'the message is not found: gcd({e1}, {e2}) = {g}')
+        return root
+
+    # ----- Attacks on One Key ----- #
+
+    @staticmethod
+    def wiener(e, n):
+        '''
+        Find a small private exponent d with Wiener's attack.
+
+        Since e * d = 1 + k * phi(n) and phi(n) is close to n, k / d is a
+        convergent of the continued fraction of e / n when d < n ^ (1/4) / 3.
+        For each convergent, phi(n) = (e * d - 1) / k gives p + q, and p and
+        q are the roots of x * x - (p + q) * x + n.
+
+        :param e: the public exponent
+        :type e: int
+        :param n: the modulus
+        :type n: int
+
+        :return: the tuple (p, q, d) with p < q; None if d is not found
+        :rtype: tuple
+        '''
+        for k, d in RSAAttack.convergents(RSAAttack.continued_fraction(e, n)):
+            if k == 0 or (e * d - 1) % k != 0:
+                continue
+            phi = (e * d - 1) // k
+            s = n - phi + 1
+            discriminant = s * s - 4 * n
+            if discriminant < 0:
+                continue
+            r = MathLib.isqrt(discriminant)
+            if r * r == discriminant and (s + r) % 2 == 0:
+                p, q = (s - r) // 2, (s + r) // 2
+                if p > 1 and p * q == n:
+                    return p, q, d
+        return None
+
+    @staticmethod
+    def fermat(e, n, max_iterations=None):
+        '''
+        Factor n with Fermat's factorization, which is fast when p and q are
+        close, and find the private exponent.
+
+        :param e: the public exponent
+        :type e: int
+        :param n: the modulus
+        :type n: int
+        :param max_iterations: stop after this many iterations
+        :type max_iterations: int, optional
+
+        :return: the tuple (p, q, d) with p <= q; None if the factors are
+            not found, or if e is not invertible mod phi(n)
+        :rtype: tuple
+        '''
+        p = FermatFactorization.factor(n, max_iterations=max_iterations)
+        if p is None or p <= 1:
+            return None
+        q = n // p
+        try:
+            d = pow(e, -1, (p - 1) * (q - 1))
+        except ValueError:
+            return None
+        return p, q, d
+
+    @staticmethod
+    def continued_fraction(numerator, denominator):
+        '''
+        Generate the terms of the continued fraction of numerator / denominator.
+
+        :meta private:
+        '''
+        while denominator != 0:
+            a, r = divmod(numerator, denominator)
+            yield a
+            numerator, denominator = denominator, r
+
+    @staticmethod
+    def convergents(terms):
+        '''
+        Generate the convergents (h, k) of a continued fraction, for h / k.
+
+        :meta private:
+        '''
+        h0, h1 = 0, 1
+        k0, k1 = 1, 0
+        for a in terms:
+            h0, h1 = h1, a * h1 + h0
+            k0, k1 = k1, a * k1 + k0
+            yield h1, k1
+
+    # ----- Batch of Keys ----- #
+
+    @staticmethod
+    def attack_keys(keys, attacks=None, workers=None, fermat_max_iterations=None):
+        '''
+        Run the attacks over a batch of public keys.
+
+        Each key is a dictionary with the modulus 'n' and the public exponent
+        'e', and optionally a ciphertext 'c' and a 'name'. Hastad's broadcast
+        attack is run on the keys with ciphertexts grouped by e, and the
+        common modulus attack on the keys with ciphertexts grouped by n; both
+        assume that the ciphertexts of a group are of the same message.
+
+        :param keys: the public keys, e.g. from read_keys()
+        :type keys: list of dict
+        :param attacks: the names of the attacks to run; defaults to
+            default_attacks
+        :type attacks: list of str, optional
+        :param workers: the number of processes for the attacks on each key,
+            or None to run in the current process
+        :type workers: int, optional
+        :param fermat_max_iterations: the number of iterations of Fermat's
+            factorization for each key; defaults to fermat_max_iterations
+        :type fermat_max_iterations: int, optional
+
+        :return: a list of dictionaries with the 'attack', the 'names' of
+            the keys, and either 'p', 'q' and 'd' for a recovered private key,
+            or 'm' for a recovered message
+        :rtype: list of dict
+        '''
+        if attacks is None:
+            attacks = RSAAttack.default_attacks
+        for attack in attacks:
+            if attack not in RSAAttack.default_attacks:
+                raise ValueError(f'unknown attack: {attack}')
+        if fermat_max_iterations is None:
+            fermat_max_iterations = RSAAttack.fermat_max_iterations
+        keys = [
+            dict(key, name=key.get('name', str(index))) for index, key in enumerate(keys)
+        ]
+        key_attacks = [ attack for attack in attacks if attack in [ 'wiener', 'fermat' ] ]
+        arguments = [ (key, key_attacks, fermat_max_iterations) for key in keys ]
+        result = []
+        if len(key_attacks) > 0:
+            if workers is None or workers <= 1:
+                key_results = map(RSAAttack.attack_key, arguments)
+                for key_result in key_results:
+                    result.extend(key_result)
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    key_results = executor.map(RSAAttack.attack_key, arguments)
+                    for key_result in key_results:
+                        result.extend(key_result)
+        with_ciphertext = [ key for key in keys if key.get('c') is not None ]
+        if 'hastad' in attacks:
+            result.extend(RSAAttack.attack_hastad(with_ciphertext))
+        if 'common_modulus' in attacks:
+            result.extend(RSAAttack.attack_common_modulus(with_ciphertext))
+        return result
+
+    @staticmethod
+    def attack_directory(directory, attacks=None, workers=None, fermat_max_iterations=None):
+        '''
+        Run the attacks over the public keys in the JSON and PEM files of a
+        directory. See read_keys() and attack_keys().
+
+        :param directory: the directory with the key files
+        :type directory: str
+        :param attacks: the names of the attacks to run
+        :type attacks: list of str, optional
+        :param workers: the number of processes for the attacks on each key
+        :type workers: int, optional
+        :param fermat_max_iterations: the number of iterations of Fermat's
+            factorization for each key
+        :type fermat_max_iterations: int, optional
+
+        :return: the results, as in attack_keys()
+        :rtype: list of dict
+        '''
+        return RSAAttack.attack_keys(
+            RSAAttack.read_keys(directory), attacks=attacks, workers=workers,
+            fermat_max_iterations=fermat_max_iterations
+        )
+
+    @staticmethod
+    def attack_key(arguments):
+        '''
+        Run the attacks on one key, in a worker process.
+
+        :meta private:
+        :param arguments: the tuple (key, attacks, fermat_max_iterations)
+        :type arguments: tuple
+
+        :return: the results for the key
+        :rtype: list of dict
+        '''
+        key, attacks, fermat_max_iterations = arguments
+        n, e = key['n'], key['e']
+        result = []
+        for attack in attacks:
+            if attack == 'wiener':
+                found = RSAAttack.wiener(e, n)
+            else:
+                found = RSAAttack.fermat(e, n, max_iterations=fermat_max_iterations)
+            if found is not None:
+                p, q, d = found
+                result.append({ 'attack': attack, 'names': [ key['name'] ], 'p': p, 'q': q, 'd': d })
+                # one private key is enough
+                break
+        return result
+
+    @staticmethod
+    def attack_hastad(keys):
+        '''
+        Run Hastad's broadcast attack on the keys grouped by e.
+
+        :meta private:
+        '''
+        result = []
+        for e, group in RSAAttack.group_by(keys, 'e').items():
+            # the moduli must be coprime; keep the first key of each modulus
+            group = list(RSAAttack.group_by(group, 'n').values())
+            group = [ same_n[0] for same_n in group ]
+            if len(group) < e:
+                continue
+            group = group[:e]
+            try:
+                m = RSAAttack.hastad_broadcast(
+                    [ key['c'] for key in group ], [ key['n'] for key in group ], e=e
+                )
+            except ValueError:
+                continue
+            result.append({ 'attack': 'hastad', 'names': [ key['name'] for key in group ], 'm': m })
+        return result
+
+    @staticmethod
+    def attack_common_modulus(keys):
+        '''
+        Run the common modulus attack on the keys grouped by n.
+
+        :meta private:
+        '''
+        result = []
+        for n, group in RSAAttack.group_by(keys, 'n').items():
+            found = False
+            for i in range(len(group)):
+                for j in range(i + 1, len(group)):
+                    k1, k2 = group[i], group[j]
+                    if k1['e'] == k2['e']:
+                        continue
+                    try:
+                        m = RSAAttack.common_modulus(k1['c'], k2['c'], k1['e'], k2['e'], n)
+                    except ValueError:
+                        continue
+                    result.append({ 'attack': 'common_modulus', 'names': [ k1['name'], k2['name'] ], 'm': m })
+                    found = True
+                    break
+                if found:
+                    break
+        return result
+
+    @staticmethod
+    def group_by(keys, field):
+        '''
+        Group the keys by the value of a field, keeping the order of the keys.
+
+        :meta private:
+        '''
+        groups = {}
+        for key in keys:
+            groups.setdefault(key[field], []).append(key)
+        return groups
+
+    # ----- Key Files ----- #
+
+    @staticmethod
+    def read_keys(directory):
+        '''
+        Read the public keys from the files in a directory.
+
+        (a) A file ending with .json has a key, or a list of keys, as objects
+            with the fields 'n' and 'e' and an optional ciphertext 'c'; the
+            values are numbers, or strings in decimal or in hexadecimal with
+            the prefix 0x.
+        (b) A file ending with .pem has a public key in PEM format; the
+            ciphertext, if any, is in the file with the same name ending with
+            .c, in the same format as the numbers in JSON.
+
+        The files are read in the order of their names, and each key is named
+        after its file, with the index of the key for lists in JSON.
+
+        :param directory: the directory with the key files
+        :type directory: str
+
+        :return: the keys, as dictionaries with 'name', 'n', 'e' and 'c'
+        :rtype: list of dict
+        '''
+        result = []
+        for filename in sorted(os.listdir(directory)):
+            path = os.path.join(directory, filename)
+            if filename.endswith('.json'):
+                with open(path, 'r') as f:
+                    data = json.load(f)
+                if isinstance(data, list):
+                    items = [ (f'{filename}[{index}]', item) for index, item in enumerate(data) ]
+                else:
+                    items = [ (filename, data) ]
+                for name, item in items:
+                    result.append({
+                        'name': name,
+                        'n': RSAAttack.parse_number(item['n']),
+                        'e': RSAAttack.parse_number(item['e']),
+                        'c': None if item.get('c') is None else RSAAttack.parse_number(item['c']),
+                    })
+            elif filename.endswith('.pem'):
+                # pycryptodome is only needed for PEM files
+                from Crypto.PublicKey import RSA
+                with open(path, 'r') as f:
+                    key = RSA.import_key(f.read())
+                c = None
+                c_path = path[:-len('.pem')] + '.c'
+                if os.path.isfile(c_path):
+                    with open(c_path, 'r') as f:
+                        c = RSAAttack.parse_number(f.read().strip())
+                result.append({ 'name': filename, 'n': int(key.n), 'e': int(key.e), 'c': c })
+        return result
+
+    @staticmethod
+    def parse_number(value):
+        '''
+        Convert a number, or a string in decimal or in hexadecimal with the
+        prefix 0x, to an int.
+
+        :meta private:
+        '''
+        if isinstance(value, str):
+            return int(value, 0)
+        return int(value)
+
+# --- end of file --- #
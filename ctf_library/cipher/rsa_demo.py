@@ -10,30 +10,348 @@
 # Fermat Primes
 # - Ref: https://en.wikipedia.org/wiki/Fermat_number
 
+# Prime Generation (sieve over a window of candidates)
+# - Ref: A. Menezes et al., Handbook of Applied Cryptography, Note 4.51
+# - Ref: https://nvlpubs.nist.gov/nistpubs/FIPS/NIST.FIPS.186-5.pdf (Appendix A.1.3)
+
+# Decryption with the Chinese Remainder Theorem
+# - Ref: https://en.wikipedia.org/wiki/RSA_(cryptosystem)#Using_the_Chinese_remainder_algorithm
+# - Ref: https://www.rfc-editor.org/rfc/rfc8017#section-5.1.2
+
 import math
+import random
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from ctf_library.math.primality import Primality
+from ctf_library.math.prime_sieve import PrimeSieve
 
 class RSADemo:
 
     # Note: This is a demonstration of RSA. Not for production use.
 
     class RSADemoKey:
-        pass
+        '''
+        An RSA key, with the CRT parameters for decryption when p and q are known.
+
+        The public key is (n, e), and the private key is d, or p and q. With
+        p and q, the decryption uses dp = d mod (p - 1), dq = d mod (q - 1)
+        and q_inv = q ^ -1 mod p, computed once here.
+        '''
+
+        def __init__(self, n, e, d=None, p=None, q=None):
+            if (p is None) != (q is None):
+                raise ValueError('both p and q are needed')
+            if p is not None:
+                if p * q != n:
+                    raise ValueError(f'{p} * {q} is not {n}')
+                if d is None:
+                    d = pow(e, -1, math.lcm(p - 1, q - 1))
+            self.n = n
+            self.e = e
+            self.d = d
+            self.p = p
+            self.q = q
+            self.dp = self.dq = self.q_inv = None
+            if p is not None:
+                self.dp = d % (p - 1)
+                self.dq = d % (q - 1)
+                self.q_inv = pow(q, -1, p)
+            return
+
+        def has_private_key(self):
+            '''
+            Check if the key can decrypt.
+
+            :return: True if d is known
+            :rtype: bool
+            '''
+            return self.d is not None
+
+        def plain_block_size(self):
+            '''
+            Return the number of bytes of plain text in a block.
+
+            A block is encrypted as the number with the bytes 0x01, followed
+            by the plain text bytes, so that leading zero bytes are kept;
+            the number must be less than n.
+
+            :return: the number of bytes
+            :rtype: int
+            '''
+            return (self.n.bit_length() - 1) // 8 - 1
+
+        def cipher_block_size(self):
+            '''
+            Return the number of bytes of cipher text in a block, which is
+            the number of bytes of n.
+
+            :return: the number of bytes
+            :rtype: int
+            '''
+            return (self.n.bit_length() + 7) // 8
+
+    @staticmethod
+    def key(p, q, e=-1, phi_function=None, check_primes=True):
+        '''
+        Create a key from the primes p and q. See Helper.compute_private_key().
+
+        :param p: the first prime
+        :type p: int
+        :param q: the second prime
+        :type q: int
+        :param e: the public exponent, or the smallest value to try
+        :type e: int, optional
+        :param phi_function: the function for phi(n); defaults to
+            Helper.euler_totient_function_fast
+        :type phi_function: function, optional
+        :param check_primes: when True check that p and q are primes
+        :type check_primes: bool, optional
+
+        :return: the key
+        :rtype: RSADemo.RSADemoKey
+        '''
+        if phi_function is None:
+            phi_function = RSADemo.Helper.euler_totient_function_fast
+        e, d, n = RSADemo.Helper.compute_private_key(
+            p, q, e, phi_function=phi_function, check_primes=check_primes
+        )
+        return RSADemo.RSADemoKey(n, e, d=d, p=p, q=q)
+
+    @staticmethod
+    def generate_key(bits, e=65537, seed=None):
+        '''
+        Generate a key with a modulus of the given number of bits.
+
+        :param bits: the number of bits of n; p and q have half of the bits
+        :type bits: int
+        :param e: the public exponent
+        :type e: int, optional
+        :param seed: the seed for the random numbers, for a reproducible key;
+            None for a random key
+        :type seed: int or str, optional
+
+        :return: the key, with p < q
+        :rtype: RSADemo.RSADemoKey
+        '''
+        if bits < 16:
+            raise ValueError(f'the modulus is too small: {bits} bits')
+        rng = random.Random(seed)
+        p = RSADemo.Helper.generate_prime(bits - bits // 2, e=e, rng=rng)
+        while True:
+            q = RSADemo.Helper.generate_prime(bits // 2, e=e, rng=rng)
+            if q != p:
+                break
+        p, q = min(p, q), max(p, q)
+        return RSADemo.RSADemoKey(p * q, e, p=p, q=q)
+
+    @staticmethod
+    def generate_keys(count, bits, e=65537, seed=None, workers=None):
+        '''
+        Generate a number of keys, in several processes.
+
+        The key at each index is generated from its own seed, made from the
+        seed and the index, so that the keys are the same for a seed with
+        any number of processes.
+
+        :param count: the number of keys
+        :type count: int
+        :param bits: the number of bits of n
+        :type bits: int
+        :param e: the public exponent
+        :type e: int, optional
+        :param seed: the seed for the random numbers; None for random keys
+        :type seed: int or str, optional
+        :param workers: the number of processes, or None to generate in the
+            current process
+        :type workers: int, optional
+
+        :return: the keys
+        :rtype: list of RSADemo.RSADemoKey
+        '''
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(128)
+        arguments = [ (bits, e, f'{seed}:{index}') for index in range(count) ]
+        if workers is None or workers <= 1:
+            return [ RSADemo.generate_key(*argument) for argument in arguments ]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(RSADemo.generate_key, *zip(*arguments)))
 
     def __init__(self, key):
         self.key = key
         return
     
     def encrypt(self, plain_text):
-        return 'not implemented yet'
+        '''
+        Encrypt the plain text, in blocks of key.plain_block_size() bytes.
+
+        This is textbook RSA without padding, for demonstration only.
+
+        :param plain_text: the plain text; a str is encoded in UTF-8
+        :type plain_text: bytes or str
+
+        :return: the cipher text, with key.cipher_block_size() bytes for
+            each block
+        :rtype: bytes
+        '''
+        if isinstance(plain_text, str):
+            plain_text = plain_text.encode('utf-8')
+        block_size = self.key.plain_block_size()
+        if block_size < 1:
+            raise ValueError(f'the modulus is too small for encryption: {self.key.n}')
+        cipher_size = self.key.cipher_block_size()
+        result = bytearray()
+        for i in range(0, len(plain_text), block_size):
+            m = int.from_bytes(b'\x01' + plain_text[i:i + block_size], 'big')
+            c = RSADemo.Helper.rsa_encrypt_value(m, self.key.e, self.key.n)
+            result += c.to_bytes(cipher_size, 'big')
+        return bytes(result)
     
     def decrypt(self, cipher_text):
-        return 'not implemented yet'
+        '''
+        Decrypt a cipher text from encrypt().
+
+        :param cipher_text: the cipher text
+        :type cipher_text: bytes
+
+        :raise: ValueError if the key has no private key, or the cipher text
+            is not from encrypt() with this key
+
+        :return: the plain text
+        :rtype: bytes
+        '''
+        if not self.key.has_private_key():
+            raise ValueError('the key has no private key')
+        cipher_size = self.key.cipher_block_size()
+        if len(cipher_text) % cipher_size != 0:
+            raise ValueError(f'the cipher text is not in blocks of {cipher_size} bytes')
+        result = bytearray()
+        for i in range(0, len(cipher_text), cipher_size):
+            m = self.decrypt_value(int.from_bytes(cipher_text[i:i + cipher_size], 'big'))
+            block = m.to_bytes((m.bit_length() + 7) // 8, 'big')
+            if block[:1] != b'\x01':
+                raise ValueError('the cipher text is not decrypted to a valid block')
+            result += block[1:]
+        return bytes(result)
+
+    def decrypt_value(self, c):
+        '''
+        Decrypt a value, with the CRT parameters of the key when there are.
+
+        :param c: the cipher value
+        :type c: int
+
+        :return: the plain value
+        :rtype: int
+        '''
+        key = self.key
+        if key.p is not None:
+            return RSADemo.Helper.rsa_decrypt_value_crt(c, key.p, key.q, key.dp, key.dq, key.q_inv)
+        return RSADemo.Helper.rsa_decrypt_value(c, key.d, key.n)
+
+    def decrypt_many(self, cipher_texts, workers=None, chunk_size=16):
+        '''
+        Decrypt a list of cipher texts, in several processes.
+
+        :param cipher_texts: the cipher texts from encrypt()
+        :type cipher_texts: list of bytes
+        :param workers: the number of processes, or None to decrypt in the
+            current process
+        :type workers: int, optional
+        :param chunk_size: the number of cipher texts sent to a process at
+            a time
+        :type chunk_size: int, optional
+
+        :return: the plain texts, in the same order
+        :rtype: list of bytes
+        '''
+        if workers is None or workers <= 1:
+            return [ self.decrypt(cipher_text) for cipher_text in cipher_texts ]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.decrypt, cipher_texts, chunksize=chunk_size))
 
     class Helper:
 
         e_minimum_value = 3
         e_common_choices = [ 3, 17, 65537 ] # Fermat Primes
 
+        prime_sieve_limit = 1 << 14
+        '''
+        The candidates for a prime are sieved with the primes up to this limit.
+        '''
+
+        prime_window_size = 1 << 12
+        '''
+        The number of odd candidates sieved at a time.
+        '''
+
+        @staticmethod
+        def generate_prime(bits, e=None, rng=None):
+            '''
+            Generate a random prime with the given number of bits, with the
+            two highest bits set, so that the product of two such primes has
+            exactly the sum of their bits.
+
+            From a random odd start, a window of odd candidates is sieved with
+            the small primes, and the candidates that are left are tested
+            with Miller-Rabin to base 2 and then Baillie-PSW (see
+            Primality.is_prime_no_small_factor()). This checks a few
+            candidates for each prime, where testing random numbers checks
+            about bits * 0.35 of them.
+
+            :param bits: the number of bits, at least 3
+            :type bits: int
+            :param e: when given, the prime p has gcd(e, p - 1) = 1
+            :type e: int, optional
+            :param rng: the random number generator, for a reproducible prime
+            :type rng: random.Random, optional
+
+            :return: the prime
+            :rtype: int
+            '''
+            if bits < 3:
+                raise ValueError(f'the prime is too small: {bits} bits')
+            if rng is None:
+                rng = random.SystemRandom()
+            low = 3 << (bits - 2)
+            high = 1 << bits
+            primes = [ int(p) for p in PrimeSieve.shared().primes_up_to(RSADemo.Helper.prime_sieve_limit)[1:] ]
+            while True:
+                start = low + rng.randrange(high - low) | 1
+                while start < high:
+                    for offset in RSADemo.Helper.sieve_window(start, primes):
+                        n = start + 2 * int(offset)
+                        if n >= high:
+                            break
+                        if e is not None and math.gcd(e, n - 1) != 1:
+                            continue
+                        if Primality.is_prime_no_small_factor(n):
+                            return n
+                    start += 2 * RSADemo.Helper.prime_window_size
+
+        @staticmethod
+        def sieve_window(start, primes):
+            '''
+            Find the offsets i in a window of odd candidates start + 2 * i that
+            are not multiples of the small primes, except the primes themselves.
+
+            :param start: the first candidate, which is odd
+            :type start: int
+            :param primes: the odd small primes
+            :type primes: list of int
+
+            :return: the offsets in increasing order
+            :rtype: numpy array
+            '''
+            size = RSADemo.Helper.prime_window_size
+            candidates = np.ones(size, dtype=bool)
+            for p in primes:
+                # start + 2 * i = 0 mod p for i = -start / 2 mod p
+                i = (p - start % p) * ((p + 1) // 2) % p
+                if start + 2 * i == p:
+                    i += p
+                candidates[i::p] = False
+            return np.flatnonzero(candidates)
+
         @staticmethod
         def euler_totient_function_fast(p, q):
             # the computation is valid assuming that p, q are primes
@@ -45,7 +363,14 @@ class RSADemo:
             return math.lcm(p - 1, q - 1)
         
         @staticmethod
-        def compute_private_key(p, q, e=-1, phi_function=euler_totient_function_fast):
+        def compute_private_key(p, q, e=-1, phi_function=euler_totient_function_fast,
+                                check_primes=True):
+            # the fast phi functions are only valid when p and q are primes
+            if check_primes:
+                for value in [ p, q ]:
+                    if not Primality.is_prime(value):
+                        raise ValueError(f'{value} is not a prime.')
+
             # compute n and phi from p and q
             n = p * q
             phi = phi_function(p, q)
@@ -84,5 +409,14 @@ class RSADemo:
         @staticmethod
         def rsa_decrypt_value(c, d, n):
             return pow(c, d, n)
+
+        @staticmethod
+        def rsa_decrypt_value_crt(c, p, q, dp, dq, q_inv):
+            # two exponentiations with half-size numbers and exponents,
+            # combined with Garner's formula
+            m1 = pow(c, dp, p)
+            m2 = pow(c, dq, q)
+            h = q_inv * (m1 - m2) % p
+            return m2 + h * q
         
 # --- end of file --- #
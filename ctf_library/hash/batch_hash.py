@@ -0,0 +1,332 @@
+# file: batch_hash.py
+
+# SHA-256 (FIPS 180-4)
+# - Ref: https://nvlpubs.nist.gov/nistpubs/FIPS/NIST.FIPS.180-4.pdf
+# - Ref: https://en.wikipedia.org/wiki/SHA-2#Pseudocode
+#
+# Memory Views
+# - Ref: https://docs.python.org/3/library/stdtypes.html#memoryview
+
+import hashlib
+import itertools
+import numpy as np
+
+class BatchHash:
+    '''
+    Batch Hashing
+
+    Hashes the candidates of a CandidateSpace in batches:
+    (a) the candidates of a batch are written into a preallocated NumPy
+        buffer, one row each, with the digits of the indices computed for
+        the whole batch at once, and the fixed suffix written only once,
+    (b) the rows are hashed by hashlib, with the state after the prefix
+        copied for each row (backend 'hashlib'), or, for SHA-256 when the
+        end of the prefix, the candidate and the suffix fit in one block,
+        by a SHA-256 compression function over NumPy arrays, with one lane
+        per row (backend 'numpy'), and
+    (c) the digests are checked against the target for the whole batch, and
+        the indices of the rows that match are returned.
+    '''
+
+    batch_size = 1 << 14
+    '''
+    The number of candidates in a batch.
+    '''
+
+    sha256_k = np.array([
+        0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
+        0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
+        0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
+        0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
+        0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+        0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
+        0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
+        0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2,
+    ], dtype=np.uint32)
+    '''
+    The round constants of SHA-256.
+    '''
+
+    sha256_iv = np.array([
+        0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a, 0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19,
+    ], dtype=np.uint32)
+    '''
+    The initial hash value of SHA-256.
+    '''
+
+    # ----- Main Entry ----- #
+
+    @staticmethod
+    def search(hash_name, prefix, space, start, end, target, suffix=b'', backend='hashlib', stopped=None):
+        '''
+        Search for the first candidate in [start, end) of a candidate space,
+        where the digest of prefix + candidate + suffix matches the target.
+
+        :param hash_name: the name of the hash for hashlib.new(), e.g. 'sha256'
+        :type hash_name: str
+        :param prefix: the fixed prefix of the input
+        :type prefix: bytes
+        :param space: the candidates, with characters of one byte each
+        :type space: CandidateSpace
+        :param start: the index of the first candidate
+        :type start: int
+        :param end: the end of the range of indices
+        :type end: int
+        :param target: the tuple (offset, mask, value), e.g. from
+            HashSearchCore.hex_target(), or a function that returns True if
+            a digest matches
+        :type target: tuple or function
+        :param suffix: the fixed suffix of the input
+        :type suffix: bytes, optional
+        :param backend: 'hashlib' or 'numpy'; see BatchHash
+        :type backend: str, optional
+        :param stopped: a function that returns True to stop the search,
+            called after each batch
+        :type stopped: function, optional
+
+        :return: the tuple (index, hashes), where index is None if there is
+            no match
+        :rtype: tuple
+        '''
+        if backend == 'numpy' and hash_name != 'sha256':
+            raise ValueError(f'the numpy backend is only for sha256: {hash_name}')
+        if backend not in [ 'hashlib', 'numpy' ]:
+            raise ValueError(f'unknown backend: {backend}')
+        if not space.single:
+            raise ValueError('the candidates must have characters of one byte each')
+        hashes = 0
+        for length, length_start, length_end in BatchHash.length_ranges(space, start, end):
+            if backend == 'numpy':
+                hasher = BatchHash.Sha256Block(prefix, length, suffix)
+            else:
+                hasher = BatchHash.HashlibBlock(hash_name, prefix, length, suffix)
+            for batch_start in range(length_start, length_end, BatchHash.batch_size):
+                batch_end = min(batch_start + BatchHash.batch_size, length_end)
+                rows = hasher.rows(batch_end - batch_start)
+                BatchHash.fill_candidates(space, length, batch_start - space.offsets[length - space.min_length],
+                                          rows[:, :length])
+                indices = BatchHash.match_indices(hasher.digests(rows), target)
+                if len(indices) > 0:
+                    return batch_start + int(indices[0]), hashes + int(indices[0]) + 1
+                hashes += batch_end - batch_start
+                if stopped is not None and stopped():
+                    return None, hashes
+        return None, hashes
+
+    @staticmethod
+    def length_ranges(space, start, end):
+        '''
+        Split [start, end) into the ranges of each length of the candidates.
+
+        :meta private:
+        :return: a generator of the tuples (length, start, end)
+        :rtype: generator
+        '''
+        for i, length in enumerate(range(space.min_length, space.max_length + 1)):
+            length_start, length_end = max(start, space.offsets[i]), min(end, space.offsets[i + 1])
+            if length_start < length_end:
+                yield length, length_start, length_end
+
+    # ----- Candidates ----- #
+
+    @staticmethod
+    def fill_candidates(space, length, index, out):
+        '''
+        Write the candidates of a length, from an index within the length,
+        into the rows of a buffer.
+
+        :param space: the candidates
+        :type space: CandidateSpace
+        :param length: the length of the candidates
+        :type length: int
+        :param index: the index of the first candidate among the candidates
+            of the length
+        :type index: int
+        :param out: the buffer, with one row of length bytes for each candidate
+        :type out: numpy.ndarray
+        '''
+        count = out.shape[0]
+        if length == 0:
+            return
+        if space.repeat and index + count <= np.iinfo(np.int64).max:
+            # the digits of all the indices, from the last position
+            digits = np.arange(index, index + count, dtype=np.int64)
+            charset = np.frombuffer(space.charset, dtype=np.uint8)
+            for i in range(length - 1, -1, -1):
+                out[:, i] = charset[digits % len(charset)]
+                digits //= len(charset)
+            return
+        offset = space.offsets[length - space.min_length]
+        candidates = b''.join(space.candidates(offset + index, offset + index + count))
+        out[:] = np.frombuffer(candidates, dtype=np.uint8).reshape(count, length)
+        return
+
+    # ----- Digests ----- #
+
+    @staticmethod
+    def match_indices(digests, target):
+        '''
+        Find the rows of digests that match a target.
+
+        :param digests: the digests, one row each
+        :type digests: numpy.ndarray
+        :param target: the tuple (offset, mask, value), or a function that
+            returns True if a digest matches
+        :type target: tuple or function
+
+        :return: the indices of the rows that match, in increasing order
+        :rtype: numpy.ndarray
+        '''
+        if callable(target):
+            return np.flatnonzero([ target(digest.tobytes()) for digest in digests ])
+        offset, mask, value = target
+        selected = digests[:, offset:offset + len(mask)]
+        mask = np.frombuffer(mask, dtype=np.uint8)
+        value = np.frombuffer(value, dtype=np.uint8)
+        return np.flatnonzero(((selected & mask) == value).all(axis=1))
+
+    class HashlibBlock:
+        '''
+        The rows of candidate + suffix in a preallocated buffer, hashed by
+        hashlib with the state after the prefix.
+        '''
+
+        def __init__(self, hash_name, prefix, length, suffix):
+            self.copy = hashlib.new(hash_name, prefix).copy
+            self.digest_size = self.copy().digest_size
+            self.width = length + len(suffix)
+            self.buffer = bytearray(BatchHash.batch_size * self.width)
+            self.array = np.frombuffer(self.buffer, dtype=np.uint8).reshape(BatchHash.batch_size, self.width)
+            self.array[:, length:] = np.frombuffer(suffix, dtype=np.uint8)
+            return
+
+        def rows(self, count):
+            '''
+            Return the rows of the first count candidates of the buffer.
+            '''
+            return self.array[:count]
+
+        def digests(self, rows):
+            '''
+            Hash the rows, with one update() of a slice of the buffer each.
+            '''
+            copy, width = self.copy, self.width
+            view = memoryview(self.buffer)
+            digests = []
+            starts = range(0, rows.shape[0] * width, width) if width > 0 else itertools.repeat(0, rows.shape[0])
+            for i in starts:
+                h = copy()
+                h.update(view[i:i + width])
+                digests.append(h.digest())
+            return np.frombuffer(b''.join(digests), dtype=np.uint8).reshape(rows.shape[0], self.digest_size)
+
+    class Sha256Block:
+        '''
+        The last blocks of SHA-256, with the end of the prefix, the candidate,
+        the suffix and the padding, in a preallocated buffer, hashed by the
+        compression function over NumPy arrays. The blocks of the prefix
+        before them are compressed once.
+        '''
+
+        def __init__(self, prefix, length, suffix):
+            full = len(prefix) - len(prefix) % 64
+            rest = prefix[full:]
+            size = len(rest) + length + len(suffix)
+            if size > 55:
+                raise ValueError(f'the end of the prefix, the candidate and the suffix are not in one block: {size} bytes')
+            state = BatchHash.sha256_iv.reshape(8, 1)
+            for i in range(0, full, 64):
+                words = np.frombuffer(prefix[i:i + 64], dtype='>u4').astype(np.uint32).reshape(16, 1)
+                state = BatchHash.sha256_compress(state, words)
+            self.state = state
+            self.start = len(rest)
+            self.length = length
+            self.blocks = np.zeros((BatchHash.batch_size, 64), dtype=np.uint8)
+            self.blocks[:, :len(rest)] = np.frombuffer(rest, dtype=np.uint8)
+            self.blocks[:, len(rest) + length:size] = np.frombuffer(suffix, dtype=np.uint8)
+            self.blocks[:, size] = 0x80
+            self.blocks[:, 56:] = np.frombuffer((8 * (len(prefix) + length + len(suffix))).to_bytes(8, 'big'), dtype=np.uint8)
+            return
+
+        def rows(self, count):
+            '''
+            Return the candidates of the first count blocks of the buffer.
+            '''
+            return self.blocks[:count, self.start:self.start + self.length]
+
+        def digests(self, rows):
+            '''
+            Hash the blocks of the rows.
+            '''
+            count = rows.shape[0]
+            words = self.blocks[:count].view('>u4').astype(np.uint32).T
+            state = BatchHash.sha256_compress(self.state, words)
+            return np.ascontiguousarray(state.T).astype('>u4').view(np.uint8)
+
+    @staticmethod
+    def sha256_compress(state, words):
+        '''
+        The compression function of SHA-256, for many blocks at once.
+
+        :param state: the hash values, with 8 rows of one column, or of one
+            column per block
+        :type state: numpy.ndarray of uint32
+        :param words: the words of the blocks, with 16 rows of one column per
+            block
+        :type words: numpy.ndarray of uint32
+
+        :return: the new hash values, with 8 rows of one column per block
+        :rtype: numpy.ndarray of uint32
+        '''
+        count = words.shape[1]
+        t0, t1, t2 = np.empty(count, np.uint32), np.empty(count, np.uint32), np.empty(count, np.uint32)
+
+        def sigma(x, r1, r2, r3, out, shift=False):
+            # out = rotr(x, r1) ^ rotr(x, r2) ^ rotr(x, r3), or shr(x, r3) when shift is True
+            np.right_shift(x, r1, out=out)
+            np.left_shift(x, 32 - r1, out=t2)
+            out |= t2
+            np.right_shift(x, r2, out=t2)
+            out ^= t2
+            np.left_shift(x, 32 - r2, out=t2)
+            out ^= t2
+            np.right_shift(x, r3, out=t2)
+            out ^= t2
+            if not shift:
+                np.left_shift(x, 32 - r3, out=t2)
+                out ^= t2
+            return out
+
+        # the message schedule
+        w = [ np.ascontiguousarray(words[i]) for i in range(16) ]
+        for t in range(16, 64):
+            x = sigma(w[t - 15], 7, 18, 3, np.empty(count, np.uint32), shift=True)
+            x += w[t - 16]
+            x += w[t - 7]
+            x += sigma(w[t - 2], 17, 19, 10, t0, shift=True)
+            w.append(x)
+
+        # the rounds, with the arrays of the variables rotated instead of copied
+        a, b, c, d, e, f, g, h = [ np.broadcast_to(s, (count,)).copy() for s in state ]
+        for t in range(64):
+            # t1 = h + S1(e) + ch(e, f, g) + k[t] + w[t]
+            sigma(e, 6, 11, 25, t1)
+            t1 += h
+            t1 += w[t]
+            t1 += BatchHash.sha256_k[t]
+            np.bitwise_xor(f, g, out=t0)
+            t0 &= e
+            t0 ^= g
+            t1 += t0
+            d += t1
+            # t1 + S0(a) + maj(a, b, c) is the new a, kept in the array of h
+            t1 += sigma(a, 2, 13, 22, t0)
+            np.bitwise_or(a, b, out=t0)
+            t0 &= c
+            np.bitwise_and(a, b, out=t2)
+            t0 |= t2
+            np.add(t1, t0, out=h)
+            a, b, c, d, e, f, g, h = h, a, b, c, d, e, f, g
+        return np.stack([ a, b, c, d, e, f, g, h ]) + state
+
+# --- end of file --- #
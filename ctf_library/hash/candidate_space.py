@@ -0,0 +1,325 @@
+# file: candidate_space.py
+
+# Mixed Radix
+# - Ref: https://en.wikipedia.org/wiki/Mixed_radix
+#
+# Factorial Number System (the index of a permutation)
+# - Ref: https://en.wikipedia.org/wiki/Factorial_number_system
+
+import bisect
+import itertools
+import math
+import operator
+from collections import OrderedDict
+from ctf_library.hash.hash_search_core import HashSearchCore
+
+class CandidateSpace:
+    '''
+    Candidate Space
+
+    The candidates of a hash search: the strings of length min_length to
+    max_length over a charset, with repeated characters (the product of the
+    charset) or without (the permutations), in the order of the length and
+    then of the characters. The characters are usually one byte each, but
+    may be longer, like the UTF-8 encoding of non-ASCII characters; the
+    length of a candidate is then its number of characters.
+
+    (a) Each candidate has an index, and candidate() converts an index to
+        the candidate with the digits of the index in a mixed radix, in
+        O(length) without enumerating the candidates before it, so that the
+        candidates can be split into integer ranges for the workers.
+    (b) candidates() enumerates a range as bytes: the last characters of the
+        candidates, the tail, are built once for each length, and each
+        candidate is the head of the counter joined to a tail, with no
+        tuple-to-string join.
+    '''
+
+    max_block_size = 1 << 16
+    '''
+    The maximum number of tails that are built for each length.
+    '''
+
+    block_cache_size = 4
+    '''
+    The tails of the most recently used lengths are kept in a least recently
+    used (LRU) cache of this size.
+    '''
+
+    _blocks = OrderedDict()
+
+    def __init__(self, charset, min_length=1, max_length=None, repeat=True):
+        if max_length is None:
+            max_length = min_length
+        if min_length < 0 or max_length < min_length:
+            raise ValueError(f'invalid length range: {min_length} to {max_length}')
+        self.charset = CandidateSpace.charset_symbols(charset)
+        self.single = isinstance(self.charset, bytes)
+        self.min_length = min_length
+        self.max_length = max_length
+        self.repeat = repeat
+        # offsets[i] is the index of the first candidate of length min_length + i
+        self.offsets = [ 0 ]
+        for length in range(min_length, max_length + 1):
+            self.offsets.append(self.offsets[-1] + self.length_size(length))
+        return
+
+    # ----- Size and Index ----- #
+
+    def length_size(self, length):
+        '''
+        Return the number of candidates of a length.
+
+        :param length: the length
+        :type length: int
+
+        :return: the number of candidates
+        :rtype: int
+        '''
+        if self.repeat:
+            return len(self.charset) ** length
+        return math.perm(len(self.charset), length)
+
+    def size(self):
+        '''
+        Return the number of candidates of all the lengths.
+
+        :return: the number of candidates
+        :rtype: int
+        '''
+        return self.offsets[-1]
+
+    def candidate(self, index):
+        '''
+        Convert an index to a candidate.
+
+        :param index: the index, from 0 to size() - 1
+        :type index: int
+
+        :return: the candidate
+        :rtype: bytes
+        '''
+        if index < 0 or index >= self.size():
+            raise ValueError(f'the index is not between 0 and {self.size() - 1}: {index}')
+        i = bisect.bisect_right(self.offsets, index) - 1
+        return self.length_candidate(self.min_length + i, index - self.offsets[i])
+
+    def length_candidate(self, length, index):
+        '''
+        Convert an index to a candidate of a length, where the index is from
+        0 to length_size(length) - 1.
+
+        :meta private:
+        '''
+        return self.join(self.length_symbols(length, index))
+
+    def length_symbols(self, length, index):
+        '''
+        Convert an index to the list of the characters of a candidate of a length.
+
+        :meta private:
+        '''
+        charset = self.charset
+        if self.repeat:
+            symbols = [ None ] * length
+            for i in range(length - 1, -1, -1):
+                index, digit = divmod(index, len(charset))
+                symbols[i] = charset[digit]
+            return symbols
+        # the radix of each position is the number of characters left
+        remaining = list(charset)
+        symbols = []
+        for i in range(length):
+            digit, index = divmod(index, math.perm(len(remaining) - 1, length - 1 - i))
+            symbols.append(remaining.pop(digit))
+        return symbols
+
+    def join(self, symbols):
+        '''
+        Join the characters of a candidate.
+
+        :meta private:
+        '''
+        return bytes(symbols) if self.single else b''.join(symbols)
+
+    def index(self, candidate):
+        '''
+        Convert a candidate to its index; the inverse of candidate().
+
+        :param candidate: the candidate
+        :type candidate: bytes
+
+        :return: the index
+        :rtype: int
+        '''
+        symbols = self.split(candidate)
+        length = len(symbols)
+        if length < self.min_length or length > self.max_length:
+            raise ValueError(f'the length is not between {self.min_length} and {self.max_length}: {length}')
+        remaining = list(self.charset)
+        index = 0
+        for i, c in enumerate(symbols):
+            if c not in remaining:
+                raise ValueError(f'not a candidate: {candidate}')
+            if self.repeat:
+                index = index * len(remaining) + remaining.index(c)
+            else:
+                index += remaining.index(c) * math.perm(len(remaining) - 1, length - 1 - i)
+                remaining.remove(c)
+        return self.offsets[length - self.min_length] + index
+
+    def split(self, candidate):
+        '''
+        Split a candidate into its characters; the characters of more than
+        one byte are matched in the order of the charset.
+
+        :meta private:
+        '''
+        if self.single:
+            return list(candidate)
+        symbols = []
+        position = 0
+        while position < len(candidate):
+            for symbol in self.charset:
+                if candidate.startswith(symbol, position):
+                    break
+            else:
+                raise ValueError(f'not a candidate: {candidate}')
+            symbols.append(symbol)
+            position += len(symbol)
+        return symbols
+
+    # ----- Enumeration ----- #
+
+    def candidates(self, start=0, end=None):
+        '''
+        Enumerate the candidates with the indices in [start, end).
+
+        :param start: the index of the first candidate
+        :type start: int, optional
+        :param end: the end of the range; defaults to size()
+        :type end: int, optional
+
+        :return: an iterator of the candidates
+        :rtype: iterator of bytes
+        '''
+        if end is None:
+            end = self.size()
+        start, end = max(start, 0), min(end, self.size())
+        return itertools.chain.from_iterable(self.blocks(start, end))
+
+    def blocks(self, start, end):
+        '''
+        Generate the candidates in [start, end) as iterators over the tails
+        of each head.
+
+        :meta private:
+        '''
+        for i, length in enumerate(range(self.min_length, self.max_length + 1)):
+            offset = self.offsets[i]
+            length_start, length_end = max(start, offset) - offset, min(end, self.offsets[i + 1]) - offset
+            if length_start >= length_end:
+                continue
+            head_length, tails = self.block(length)
+            block_size = len(tails)
+            for head_index in range(length_start // block_size, (length_end - 1) // block_size + 1):
+                block_start = head_index * block_size
+                selected = tails[max(length_start - block_start, 0):min(length_end - block_start, block_size)]
+                if self.repeat:
+                    head = self.length_candidate(head_length, head_index)
+                    yield map(operator.add, itertools.repeat(head), selected)
+                    continue
+                # the head is the same for all the indices of the block, and
+                # the tails are the positions of the characters left after it
+                head_symbols = self.length_symbols(length, block_start)[:head_length]
+                remaining = [ c for c in self.charset if c not in head_symbols ]
+                if self.single:
+                    selected = map(bytes.translate, selected, itertools.repeat(CandidateSpace.table(remaining)))
+                else:
+                    selected = map(b''.join, map(map, itertools.repeat(remaining.__getitem__), selected))
+                yield map(operator.add, itertools.repeat(self.join(head_symbols)), selected)
+
+    def block(self, length):
+        '''
+        Build the tails of a length once, as many as max_block_size. The
+        tails are kept in the cache of the class, so that they are built
+        once in each worker process, and not for each shard.
+
+        :meta private:
+        :return: the tuple (head length, tails)
+        :rtype: tuple
+        '''
+        cache = CandidateSpace._blocks
+        key = (self.charset, self.repeat, length, CandidateSpace.max_block_size)
+        block = cache.get(key)
+        if block is not None:
+            cache.move_to_end(key)
+        else:
+            tail_length = 0
+            while tail_length < length and \
+                    self.tail_size(length, tail_length + 1) <= CandidateSpace.max_block_size:
+                tail_length += 1
+            join = bytes if self.single else b''.join
+            if self.repeat:
+                tails = list(map(join, itertools.product(self.charset, repeat=tail_length)))
+            else:
+                left = len(self.charset) - (length - tail_length)
+                positions = itertools.permutations(range(left), tail_length)
+                tails = list(map(bytes, positions)) if self.single else list(positions)
+            block = (length - tail_length, tails)
+            cache[key] = block
+            while len(cache) > CandidateSpace.block_cache_size:
+                cache.popitem(last=False)
+        return block
+
+    def tail_size(self, length, tail_length):
+        '''
+        Return the number of tails of a length.
+
+        :meta private:
+        '''
+        n = len(self.charset)
+        if self.repeat:
+            return n ** tail_length
+        return math.perm(n - (length - tail_length), tail_length)
+
+    @staticmethod
+    def clear_block_cache():
+        '''
+        Remove all the cached tails.
+        '''
+        CandidateSpace._blocks.clear()
+        return
+
+    # ----- Helpers ----- #
+
+    @staticmethod
+    def charset_symbols(charset):
+        '''
+        Encode the characters of a charset, with UTF-8 for a str.
+
+        :param charset: the characters
+        :type charset: str or bytes or iterable of str or bytes
+
+        :return: the characters as a bytes when they are one byte each, or
+            as a tuple of bytes otherwise
+        :rtype: bytes or tuple
+        '''
+        if isinstance(charset, (bytes, bytearray)):
+            return bytes(charset)
+        encoded, single = HashSearchCore.symbol_bytes(charset)
+        if single:
+            return encoded
+        if any(len(symbol) == 0 for symbol in encoded):
+            raise ValueError('the characters must not be empty')
+        return tuple(encoded)
+
+    @staticmethod
+    def table(charset):
+        '''
+        Create the table of bytes.translate() that maps each digit to its character.
+
+        :meta private:
+        '''
+        return bytes(charset) + bytes(256 - len(charset))
+
+# --- end of file --- #
@@ -1,13 +1,14 @@
 # file: hash_search.py
 
-from hashlib import sha256
 import string
-import itertools
+from ctf_library.hash.pow_challenge import PowChallenge
 
 class HashSearch:
 
     '''
     A collection of some of the hash search challenges from various CTF.
+
+    Each challenge is a PowChallenge.Spec, which is solved by PowChallenge.
     '''
 
     printable_characters = string.ascii_letters + string.digits + string.punctuation
@@ -16,31 +17,36 @@ class HashSearch:
     #   Give me input where sha256(0dQk5dyK0KuOb9a5 + input).hexdigest().endswith('0'*6)
     #                              ^^^^^^^^^^^^^^^^                               ^^^^^
     #                              -> <prefix>                                    -> <search_target>
+    #   The search is done by PowChallenge, in several processes when
+    #   workers is given.
+    @staticmethod
+    def hash_search_htv_2024(prefix, search_target, search_space='', result_length=4, workers=None):
+        spec = HashSearch.htv_2024_spec(prefix, search_target, search_space, result_length=result_length)
+        return PowChallenge.solve(spec, workers=workers).result
+
     @staticmethod
-    def hash_search_htv_2024(prefix, search_target, search_space='', result_length=4):
-        search_length = len(search_target)
+    def htv_2024_spec(prefix, search_target, search_space='', result_length=4):
         if search_space == '':
             search_space = HashSearch.printable_characters
-        for curr_list in itertools.permutations(search_space, result_length):
-            curr_postfix = ''.join(curr_list)
-            curr_bytes = (prefix + curr_postfix).encode()
-            curr_hash = sha256(curr_bytes).hexdigest()[-search_length:]
-            if curr_hash == search_target:
-                return curr_postfix
-        return None
+        return PowChallenge.Spec(
+            algorithm='sha256', prefix=prefix, hex_suffix=search_target, charset=search_space,
+            min_length=result_length, max_length=result_length
+        )
 
     # Challenge for XMAS CTF 2021:
     #   Provide a hex string X such that sha256(unhexlify(X))[-5:] = e709b
     #                                                                ^^^^^
     #                                                                -> <search_target>
     @staticmethod
-    def hash_search_xmas_ctf_2021(search_target, string_length=4):
-        search_length = len(search_target)
-        for curr_value in range(0, 2**32):
-            curr_bytes = (curr_value).to_bytes(string_length, byteorder='big')
-            curr_hash = sha256(curr_bytes).hexdigest()[-search_length:]
-            if curr_hash == search_target:
-                return curr_bytes.hex()
-        return None
+    def hash_search_xmas_ctf_2021(search_target, string_length=4, workers=None):
+        spec = HashSearch.xmas_ctf_2021_spec(search_target, string_length=string_length)
+        return PowChallenge.solve(spec, workers=workers).result
+
+    @staticmethod
+    def xmas_ctf_2021_spec(search_target, string_length=4):
+        return PowChallenge.Spec(
+            algorithm='sha256', hex_suffix=search_target, charset=bytes(range(256)),
+            min_length=string_length, max_length=string_length, result_format='hex'
+        )
 
 # --- end of file --- #
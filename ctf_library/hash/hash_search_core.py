@@ -0,0 +1,239 @@
+# file: hash_search_core.py
+
+# Hash Objects (copy of the internal state)
+# - Ref: https://docs.python.org/3/library/hashlib.html#hashlib.hash.copy
+#
+# Merkle-Damgard Construction (the state after a prefix)
+# - Ref: https://en.wikipedia.org/wiki/Merkle%E2%80%93Damg%C3%A5rd_construction
+
+import hashlib
+import itertools
+
+class HashSearchCore:
+    '''
+    Hash Search Core
+
+    The inner loop of the hash searches:
+    (a) the fixed prefix of the input is hashed once, and the state of the
+        hash object after the prefix is copied with copy() for each
+        candidate, so that only the candidate is hashed,
+    (b) the target, such as the last hex digits of the digest, is turned
+        into a mask and a value over the digest bytes once, and the raw
+        digest() is compared, instead of slicing hexdigest(); the bytes with
+        a full mask are compared first with bytes.endswith() or
+        bytes.startswith(), and only the digests that pass are checked
+        against the whole mask, and
+    (c) the candidates are bytes, so there is no string join or encode for
+        each candidate.
+    '''
+
+    # ----- Targets ----- #
+
+    @staticmethod
+    def hex_target(search_target, digest_size, position='suffix'):
+        '''
+        Convert hex digits at the start or the end of the hex digest to a
+        mask and a value over the digest bytes.
+
+        :param search_target: the hex digits
+        :type search_target: str
+        :param digest_size: the number of bytes of the digest
+        :type digest_size: int
+        :param position: 'prefix' for the start of the hex digest, or
+            'suffix' for the end
+        :type position: str, optional
+
+        :return: the tuple (offset, mask, value), where the digest matches
+            when digest[offset + i] & mask[i] == value[i] for each i
+        :rtype: tuple
+        '''
+        digits = len(search_target)
+        if digits > 2 * digest_size:
+            raise ValueError(f'the target has more than {2 * digest_size} hex digits: {search_target}')
+        value = int(search_target, 16) if digits > 0 else 0
+        size = (digits + 1) // 2
+        if position == 'suffix':
+            mask = (1 << (4 * digits)) - 1
+            offset = digest_size - size
+        elif position == 'prefix':
+            # the digits are aligned to the start of the bytes
+            shift = 4 * (2 * size - digits)
+            mask = ((1 << (4 * digits)) - 1) << shift
+            value <<= shift
+            offset = 0
+        else:
+            raise ValueError(f'unknown position: {position}')
+        return offset, mask.to_bytes(size, 'big'), value.to_bytes(size, 'big')
+
+    @staticmethod
+    def leading_zero_bits_target(bits, digest_size):
+        '''
+        Convert a number of leading zero bits of the digest, like in hashcash,
+        to a mask and a value over the digest bytes.
+
+        :param bits: the number of leading zero bits
+        :type bits: int
+        :param digest_size: the number of bytes of the digest
+        :type digest_size: int
+
+        :return: the tuple (offset, mask, value); see hex_target()
+        :rtype: tuple
+        '''
+        if bits < 0 or bits > 8 * digest_size:
+            raise ValueError(f'the number of bits is not between 0 and {8 * digest_size}: {bits}')
+        size = (bits + 7) // 8
+        mask = ((1 << bits) - 1) << (8 * size - bits)
+        return 0, mask.to_bytes(size, 'big'), bytes(size)
+
+    @staticmethod
+    def matcher(offset, mask, value):
+        '''
+        Create the fastest function that checks a digest against a mask and
+        a value from hex_target().
+
+        (a) When every bit of the mask is set, the digest bytes are compared
+            with the value.
+        (b) When only the first or the last byte has a partial mask, like
+            for an odd number of hex digits, the other bytes are compared,
+            and then the partial byte.
+        (c) Otherwise, the bytes are compared as integers.
+
+        :param offset: the offset in the digest
+        :type offset: int
+        :param mask: the mask
+        :type mask: bytes
+        :param value: the value, with no bits outside of the mask
+        :type value: bytes
+
+        :return: the function, which returns True if a digest matches
+        :rtype: function
+        '''
+        end = offset + len(mask)
+        partial = [ i for i, m in enumerate(mask) if m != 0xff ]
+        if len(partial) == 0:
+            def match(digest):
+                return digest[offset:end] == value
+        elif partial == [ 0 ]:
+            rest, m, v = value[1:], mask[0], value[0]
+            def match(digest):
+                return digest[offset + 1:end] == rest and digest[offset] & m == v
+        elif partial == [ len(mask) - 1 ]:
+            rest, m, v, last = value[:-1], mask[-1], value[-1], end - 1
+            def match(digest):
+                return digest[offset:last] == rest and digest[last] & m == v
+        else:
+            int_mask = int.from_bytes(mask, 'big')
+            int_value = int.from_bytes(value, 'big')
+            def match(digest):
+                return int.from_bytes(digest[offset:end], 'big') & int_mask == int_value
+        return match
+
+    @staticmethod
+    def prefilter(offset, mask, value, digest_size):
+        '''
+        Find the bytes at the start or the end of a digest that must be equal
+        to the value, so that most digests are rejected with one call of
+        bytes.startswith() or bytes.endswith().
+
+        :param offset: the offset in the digest
+        :type offset: int
+        :param mask: the mask
+        :type mask: bytes
+        :param value: the value
+        :type value: bytes
+        :param digest_size: the number of bytes of the digest
+        :type digest_size: int
+
+        :return: the tuple (position, key), where position is 'prefix' or
+            'suffix'; the key may be empty when no byte has a full mask
+        :rtype: tuple
+        '''
+        if offset + len(mask) == digest_size:
+            k = len(mask)
+            while k > 0 and mask[k - 1] == 0xff:
+                k -= 1
+            return 'suffix', value[k:]
+        if offset == 0:
+            k = 0
+            while k < len(mask) and mask[k] == 0xff:
+                k += 1
+            return 'prefix', value[:k]
+        return 'prefix', b''
+
+    # ----- Search ----- #
+
+    @staticmethod
+    def search(hash_name, prefix, candidates, target, stopped=None, check_interval=1 << 12):
+        '''
+        Search for a candidate where the digest of prefix + candidate matches
+        the target.
+
+        :param hash_name: the name of the hash for hashlib.new(), e.g. 'sha256'
+        :type hash_name: str
+        :param prefix: the fixed prefix of the input
+        :type prefix: bytes
+        :param candidates: the candidates
+        :type candidates: iterable of bytes
+        :param target: the tuple (offset, mask, value), e.g. from hex_target(),
+            or a function that returns True if a digest matches
+        :type target: tuple or function
+        :param stopped: a function that returns True to stop the search
+        :type stopped: function, optional
+        :param check_interval: the number of candidates between calls of stopped()
+        :type check_interval: int, optional
+
+        :return: the tuple (candidate, hashes), where candidate is None if
+            there is no match
+        :rtype: tuple
+        '''
+        copy = hashlib.new(hash_name, prefix).copy
+        if callable(target):
+            match, position, key = target, 'prefix', b''
+        else:
+            match = HashSearchCore.matcher(*target)
+            position, key = HashSearchCore.prefilter(*target, copy().digest_size)
+        candidates = iter(candidates)
+        hashes = 0
+        while True:
+            # the candidates are taken in chunks, so that the loops have no
+            # counter and no check of stopped()
+            chunk = list(itertools.islice(candidates, check_interval))
+            if len(chunk) == 0:
+                break
+            if position == 'suffix':
+                for candidate in chunk:
+                    h = copy()
+                    h.update(candidate)
+                    digest = h.digest()
+                    if digest.endswith(key) and match(digest):
+                        return candidate, hashes + chunk.index(candidate) + 1
+            else:
+                for candidate in chunk:
+                    h = copy()
+                    h.update(candidate)
+                    digest = h.digest()
+                    if digest.startswith(key) and match(digest):
+                        return candidate, hashes + chunk.index(candidate) + 1
+            hashes += len(chunk)
+            if stopped is not None and stopped():
+                break
+        return None, hashes
+
+    @staticmethod
+    def symbol_bytes(symbols):
+        '''
+        Encode the symbols of a search space, and check if they are one byte each.
+
+        :param symbols: the symbols
+        :type symbols: str or iterable of str or bytes
+
+        :return: the tuple (encoded, single), where encoded is a bytes of the
+            symbols when single is True, or a list of bytes otherwise
+        :rtype: tuple
+        '''
+        encoded = [ s.encode() if isinstance(s, str) else bytes(s) for s in symbols ]
+        if all(len(s) == 1 for s in encoded):
+            return b''.join(encoded), True
+        return encoded, False
+
+# --- end of file --- #
@@ -0,0 +1,227 @@
+# file: parallel_hash_search.py
+
+# Proof of Work
+# - Ref: https://en.wikipedia.org/wiki/Proof_of_work
+#
+# Process Pools
+# - Ref: https://docs.python.org/3/library/concurrent.futures.html#processpoolexecutor
+# - Ref: https://docs.python.org/3/library/multiprocessing.html#multiprocessing.Event
+
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+class ParallelHashSearch:
+    '''
+    Parallel Hash Search
+
+    Searches for an input whose hash matches a target, such as the proof of
+    work challenges in PowChallenge:
+    (a) the candidates are partitioned into disjoint shards, and the shards
+        are searched by the processes of a process pool,
+    (b) only a few shards are queued at a time, and a shared event stops
+        all the processes soon after one of them finds a result, and
+    (c) the number of hashes and the time of each process are reported, for
+        the throughput of the search.
+
+    A search is given a shard function and a list of shards. The shard
+    function is called as function(*shard, stopped=stopped) for each shard,
+    and returns the tuple (result, hashes), where result is None when there
+    is no match in the shard, and hashes is the number of hashes computed.
+    It should call stopped() every few thousand hashes, and return early
+    when it is True. The function and the shards are sent to the processes,
+    so the function must be defined at the top level of a module, or be a
+    static method of a class.
+    '''
+
+    stop_check_interval = 1 << 12
+    '''
+    The number of hashes between the checks of the stop event in the shard
+    functions.
+    '''
+
+    range_shard_size = 1 << 16
+    '''
+    The number of candidates in each shard of a range of integers.
+    '''
+
+    _stop_event = None
+
+    class SearchResult:
+        '''
+        The result of a search, with the number of hashes and the time spent
+        by each process.
+        '''
+
+        def __init__(self):
+            self.result = None
+            self.hashes = 0
+            self.seconds = 0.0
+            self.shards = 0
+            self.worker_hashes = {}
+            self.worker_seconds = {}
+            return
+
+        def add_shard(self, worker, hashes, seconds):
+            '''
+            Add the number of hashes and the time of a shard searched by a worker.
+
+            :param worker: the id of the worker process
+            :type worker: int
+            :param hashes: the number of hashes
+            :type hashes: int
+            :param seconds: the time in seconds
+            :type seconds: float
+            '''
+            self.hashes += hashes
+            self.shards += 1
+            self.worker_hashes[worker] = self.worker_hashes.get(worker, 0) + hashes
+            self.worker_seconds[worker] = self.worker_seconds.get(worker, 0.0) + seconds
+            return
+
+        def hashes_per_second(self):
+            '''
+            Return the number of hashes per second of the whole search.
+
+            :return: the hashes per second
+            :rtype: float
+            '''
+            return self.hashes / self.seconds if self.seconds > 0 else 0.0
+
+        def worker_hashes_per_second(self):
+            '''
+            Return the number of hashes per second of each worker, over the
+            time spent on its shards.
+
+            :return: a dictionary of the hashes per second by worker id
+            :rtype: dict
+            '''
+            return {
+                worker: hashes / self.worker_seconds[worker] if self.worker_seconds[worker] > 0 else 0.0
+                for worker, hashes in self.worker_hashes.items()
+            }
+
+    # ----- Main Entry ----- #
+
+    @staticmethod
+    def search(function, shards, workers=None):
+        '''
+        Search the shards with the shard function, and stop at the first result.
+
+        :param function: the shard function; see ParallelHashSearch
+        :type function: function
+        :param shards: the shards, as tuples of the arguments of the function
+        :type shards: iterable of tuple
+        :param workers: the number of processes, or None to search in the
+            current process
+        :type workers: int, optional
+
+        :return: the search result, with the result found in result, or None
+            if there is no result in any shard
+        :rtype: ParallelHashSearch.SearchResult
+        '''
+        search_result = ParallelHashSearch.SearchResult()
+        start_time = time.perf_counter()
+        shards = iter(shards)
+        if workers is None or workers <= 1:
+            for shard in shards:
+                result, hashes, worker, seconds = ParallelHashSearch.run_shard(function, shard)
+                search_result.add_shard(worker, hashes, seconds)
+                if result is not None:
+                    search_result.result = result
+                    break
+            search_result.seconds = time.perf_counter() - start_time
+            return search_result
+
+        # only a few shards are queued at a time, so that the processes do
+        # not start new shards after a result is found
+        stop_event = multiprocessing.Event()
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=ParallelHashSearch.set_stop_event,
+                                 initargs=(stop_event,)) as executor:
+            def submit():
+                shard = next(shards, None)
+                if shard is not None:
+                    pending.append(executor.submit(ParallelHashSearch.run_shard, function, shard))
+            for _ in range(2 * workers):
+                submit()
+            while len(pending) > 0:
+                result, hashes, worker, seconds = pending.popleft().result()
+                search_result.add_shard(worker, hashes, seconds)
+                if result is not None:
+                    search_result.result = result
+                    stop_event.set()
+                    for future in pending:
+                        future.cancel()
+                    # the running shards stop at their next check
+                    for future in pending:
+                        if not future.cancelled():
+                            _, hashes, worker, seconds = future.result()
+                            search_result.add_shard(worker, hashes, seconds)
+                    break
+                submit()
+        search_result.seconds = time.perf_counter() - start_time
+        return search_result
+
+    @staticmethod
+    def set_stop_event(stop_event):
+        '''
+        Keep the stop event in a worker process.
+
+        :meta private:
+        '''
+        ParallelHashSearch._stop_event = stop_event
+        return
+
+    @staticmethod
+    def stopped():
+        '''
+        Check if the search is stopped, because a result has been found.
+
+        :return: True if the search is stopped
+        :rtype: bool
+        '''
+        stop_event = ParallelHashSearch._stop_event
+        return stop_event is not None and stop_event.is_set()
+
+    @staticmethod
+    def run_shard(function, shard):
+        '''
+        Search one shard, in a worker process or in the current process.
+
+        :meta private:
+        :return: the tuple (result, hashes, worker id, seconds)
+        :rtype: tuple
+        '''
+        if ParallelHashSearch.stopped():
+            return None, 0, os.getpid(), 0.0
+        start_time = time.perf_counter()
+        result, hashes = function(*shard, stopped=ParallelHashSearch.stopped)
+        return result, hashes, os.getpid(), time.perf_counter() - start_time
+
+    @staticmethod
+    def range_shards(start, end, shard_size=None):
+        '''
+        Split the range of integers [start, end) into shards of shard_size
+        integers, as tuples (start, end).
+
+        :param start: the first integer
+        :type start: int
+        :param end: the end of the range
+        :type end: int
+        :param shard_size: the number of integers in a shard; defaults to
+            range_shard_size
+        :type shard_size: int, optional
+
+        :return: a generator of the shards
+        :rtype: generator
+        '''
+        if shard_size is None:
+            shard_size = ParallelHashSearch.range_shard_size
+        for shard_start in range(start, end, shard_size):
+            yield shard_start, min(shard_start + shard_size, end)
+
+# --- end of file --- #
@@ -0,0 +1,296 @@
+# file: pow_challenge.py
+
+# Proof of Work
+# - Ref: https://en.wikipedia.org/wiki/Proof_of_work
+#
+# Hashcash
+# - Ref: https://en.wikipedia.org/wiki/Hashcash
+# - Ref: http://www.hashcash.org/docs/hashcash.html#stamp_format__version_1_
+
+import hashlib
+import itertools
+import operator
+import string
+import time
+from ctf_library.hash.batch_hash import BatchHash
+from ctf_library.hash.candidate_space import CandidateSpace
+from ctf_library.hash.hash_search_core import HashSearchCore
+from ctf_library.hash.parallel_hash_search import ParallelHashSearch
+
+class PowChallenge:
+    '''
+    Proof of Work Challenges
+
+    A challenge is described by a PowChallenge.Spec: the hash algorithm,
+    the bytes before and after the answer, the target of the digest, and
+    the characters and lengths of the answer. The spec is compiled into an
+    engine, which:
+    (a) turns a hex prefix, a hex suffix or a number of leading zero bits
+        into a mask over the digest bytes, so that most digests are rejected
+        with a comparison of bytes and only the partial bytes are checked
+        with the mask; a target predicate is called for every digest,
+    (b) hashes the bytes before the answer once (see HashSearchCore), and
+    (c) searches the answers from the shortest length, with the indices of
+        the CandidateSpace split into integer ranges for the processes of
+        ParallelHashSearch.
+    '''
+
+    printable_characters = string.ascii_letters + string.digits + string.punctuation
+    '''
+    The default characters of the answer.
+    '''
+
+    hashcash_characters = string.ascii_letters + string.digits + '+/'
+    '''
+    The characters of the counter of a hashcash stamp (base64).
+    '''
+
+    class Spec:
+        '''
+        A proof of work challenge: find an answer where the digest of
+        prefix + answer + suffix matches the target.
+
+        The target is one of hex_prefix (the start of the hex digest),
+        hex_suffix (the end of the hex digest), leading_zero_bits, or
+        predicate, a function of the digest bytes; a predicate is sent to the
+        worker processes, so it must be defined at the top level of a module.
+
+        The answers are strings of length min_length to max_length over the
+        characters in charset, with repeated characters when repeat is True;
+        the characters of a str are encoded with UTF-8 (see CandidateSpace).
+        The answer is returned as text decoded with UTF-8 when result_format
+        is 'text', as hex digits when 'hex', or as bytes when 'bytes'; 'text'
+        needs characters that are UTF-8 text.
+
+        The digests are computed one candidate at a time by HashSearchCore
+        when backend is 'core', or in batches by BatchHash when backend is
+        'hashlib' or 'numpy', for the characters of one byte each; see
+        BatchHash.
+        '''
+
+        def __init__(self, algorithm='sha256', prefix=b'', suffix=b'',
+                     hex_prefix=None, hex_suffix=None, leading_zero_bits=None, predicate=None,
+                     charset=None, min_length=1, max_length=None, repeat=True, result_format='text',
+                     backend='core'):
+            targets = [ hex_prefix, hex_suffix, leading_zero_bits, predicate ]
+            if sum(target is not None for target in targets) != 1:
+                raise ValueError('exactly one of hex_prefix, hex_suffix, leading_zero_bits and predicate is needed')
+            if result_format not in [ 'text', 'hex', 'bytes' ]:
+                raise ValueError(f'unknown result format: {result_format}')
+            if backend not in [ 'core', 'hashlib', 'numpy' ]:
+                raise ValueError(f'unknown backend: {backend}')
+            if charset is None:
+                charset = PowChallenge.printable_characters
+            if max_length is None:
+                max_length = min_length
+            if min_length < 0 or max_length < min_length:
+                raise ValueError(f'invalid length range: {min_length} to {max_length}')
+            self.algorithm = algorithm
+            self.prefix = prefix.encode() if isinstance(prefix, str) else bytes(prefix)
+            self.suffix = suffix.encode() if isinstance(suffix, str) else bytes(suffix)
+            self.hex_prefix = hex_prefix
+            self.hex_suffix = hex_suffix
+            self.leading_zero_bits = leading_zero_bits
+            self.predicate = predicate
+            self.charset = CandidateSpace.charset_symbols(charset)
+            if result_format == 'text' and not PowChallenge.Spec.is_text(self.charset):
+                raise ValueError("the characters are not UTF-8 text: use result_format 'bytes' or 'hex'")
+            self.min_length = min_length
+            self.max_length = max_length
+            self.repeat = repeat
+            self.result_format = result_format
+            self.backend = backend
+            return
+
+        @staticmethod
+        def is_text(charset):
+            '''
+            Check that every answer over the characters decodes with UTF-8:
+            the characters of one byte are ASCII, and the longer ones are
+            UTF-8 characters.
+
+            :meta private:
+            '''
+            if isinstance(charset, bytes):
+                return charset.isascii()
+            try:
+                for symbol in charset:
+                    symbol.decode('utf-8')
+            except UnicodeDecodeError:
+                return False
+            return True
+
+    class Engine:
+        '''
+        A compiled spec, with the target as a mask over the digest bytes,
+        and the answers as a CandidateSpace.
+        '''
+
+        def __init__(self, spec):
+            try:
+                digest_size = hashlib.new(spec.algorithm).digest_size
+            except ValueError:
+                raise ValueError(f'unknown hash algorithm: {spec.algorithm}') from None
+            if digest_size == 0:
+                raise ValueError(f'hash algorithm without a fixed digest size: {spec.algorithm}')
+            self.spec = spec
+            self.digest_size = digest_size
+            if spec.hex_prefix is not None:
+                self.target = HashSearchCore.hex_target(spec.hex_prefix, digest_size, position='prefix')
+            elif spec.hex_suffix is not None:
+                self.target = HashSearchCore.hex_target(spec.hex_suffix, digest_size, position='suffix')
+            elif spec.leading_zero_bits is not None:
+                self.target = HashSearchCore.leading_zero_bits_target(spec.leading_zero_bits, digest_size)
+            else:
+                self.target = spec.predicate
+            self.space = CandidateSpace(spec.charset, spec.min_length, spec.max_length, repeat=spec.repeat)
+            if spec.backend != 'core' and not self.space.single:
+                raise ValueError(f'the {spec.backend} backend needs characters of one byte each')
+            if spec.backend == 'numpy':
+                if spec.algorithm != 'sha256':
+                    raise ValueError(f'the numpy backend is only for sha256: {spec.algorithm}')
+                size = len(spec.prefix) % 64 + spec.max_length + len(spec.suffix)
+                if size > 55:
+                    raise ValueError(f'the numpy backend needs the input after the full blocks of the prefix in one block: {size} bytes')
+            return
+
+        def strategy(self):
+            '''
+            Return the way the digests are checked: 'bytes' when the target
+            is whole bytes of the digest, 'mask' when some bits of a byte are
+            checked, or 'predicate'.
+
+            :return: the strategy
+            :rtype: str
+            '''
+            if callable(self.target):
+                return 'predicate'
+            _, mask, _ = self.target
+            return 'bytes' if all(m == 0xff for m in mask) else 'mask'
+
+        def shards(self):
+            '''
+            Split the indices of the answers into shards, as tuples (start, end).
+
+            :return: a generator of the shards
+            :rtype: generator
+            '''
+            return ParallelHashSearch.range_shards(0, self.space.size())
+
+        def search_shard(self, start, end, stopped=None):
+            '''
+            Search the answers with the indices in [start, end).
+
+            :return: the tuple (answer or None, hashes)
+            :rtype: tuple
+            '''
+            spec = self.spec
+            if spec.backend != 'core':
+                index, hashes = BatchHash.search(
+                    spec.algorithm, spec.prefix, self.space, start, end, self.target,
+                    suffix=spec.suffix, backend=spec.backend, stopped=stopped
+                )
+                return (None if index is None else self.space.candidate(index)), hashes
+            candidates = self.space.candidates(start, end)
+            if len(spec.suffix) > 0:
+                candidates = map(operator.add, candidates, itertools.repeat(spec.suffix))
+            candidate, hashes = HashSearchCore.search(
+                spec.algorithm, spec.prefix, candidates, self.target,
+                stopped=stopped, check_interval=ParallelHashSearch.stop_check_interval
+            )
+            if candidate is None:
+                return None, hashes
+            return candidate[:len(candidate) - len(spec.suffix)], hashes
+
+        def format(self, answer):
+            '''
+            Convert an answer to the result format of the spec.
+
+            :meta private:
+            '''
+            if answer is None or self.spec.result_format == 'bytes':
+                return answer
+            if self.spec.result_format == 'hex':
+                return answer.hex()
+            return answer.decode('utf-8')
+
+    # ----- Main Entry ----- #
+
+    @staticmethod
+    def compile(spec):
+        '''
+        Compile a spec into an engine.
+
+        :param spec: the spec
+        :type spec: PowChallenge.Spec
+
+        :return: the engine
+        :rtype: PowChallenge.Engine
+        '''
+        return PowChallenge.Engine(spec)
+
+    @staticmethod
+    def solve(spec, workers=None):
+        '''
+        Find an answer of a challenge, from the shortest length.
+
+        :param spec: the spec
+        :type spec: PowChallenge.Spec
+        :param workers: the number of processes, or None to search in the
+            current process
+        :type workers: int, optional
+
+        :return: the search result, with the answer in the result format of
+            the spec in result, or None if there is no answer
+        :rtype: ParallelHashSearch.SearchResult
+        '''
+        engine = PowChallenge.compile(spec)
+        shards = ((engine, start, end) for start, end in engine.shards())
+        search_result = ParallelHashSearch.search(PowChallenge.search_shard, shards, workers=workers)
+        search_result.result = engine.format(search_result.result)
+        return search_result
+
+    @staticmethod
+    def search_shard(engine, start, end, stopped=None):
+        '''
+        Search one shard with an engine, in a worker process.
+
+        :meta private:
+        '''
+        return engine.search_shard(start, end, stopped=stopped)
+
+    # ----- Challenges ----- #
+
+    @staticmethod
+    def hashcash_spec(resource, bits=20, date=None, rand=None, max_length=8):
+        '''
+        Create the spec of a hashcash version 1 stamp, where the SHA-1 digest
+        of the stamp starts with a number of zero bits. The stamp is the
+        prefix of the spec followed by the answer, which is the counter.
+
+        :param resource: the resource, such as an email address
+        :type resource: str
+        :param bits: the number of leading zero bits
+        :type bits: int, optional
+        :param date: the date as YYMMDD; defaults to today
+        :type date: str, optional
+        :param rand: the random string in base64; defaults to a string from
+            the current time
+        :type rand: str, optional
+        :param max_length: the maximum length of the counter
+        :type max_length: int, optional
+
+        :return: the spec
+        :rtype: PowChallenge.Spec
+        '''
+        if date is None:
+            date = time.strftime('%y%m%d', time.gmtime())
+        if rand is None:
+            rand = format(time.time_ns() & 0xffffffffffff, 'x')
+        return PowChallenge.Spec(
+            algorithm='sha1', prefix=f'1:{bits}:{date}:{resource}::{rand}:',
+            leading_zero_bits=bits, charset=PowChallenge.hashcash_characters,
+            min_length=1, max_length=max_length
+        )
+
+# --- end of file --- #
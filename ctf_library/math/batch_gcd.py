@@ -0,0 +1,297 @@
+# file: batch_gcd.py
+
+# Batch GCD (Product Tree and Remainder Tree)
+# - Ref: D. J. Bernstein, How to find smooth parts of integers
+#        https://cr.yp.to/factorization/smoothparts-20040510.pdf
+# - Ref: N. Heninger et al., Mining Your Ps and Qs (USENIX Security 2012)
+#        https://factorable.net/weakkeys12.extended.pdf
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+from ctf_library.math.mathlib import MathLib
+
+class BatchGCD:
+    '''
+    Batch GCD over Many RSA Moduli
+
+    Finds the moduli that share a prime factor with some other modulus,
+    in quasi-linear time instead of a gcd for every pair:
+    (a) the product tree multiplies the moduli in pairs up to the product P,
+    (b) the remainder tree reduces P modulo n * n for each modulus n, and
+    (c) gcd((P mod n * n) / n, n) is the product of the primes that n shares
+        with the other moduli.
+
+    The tree levels can be computed in several processes.
+    '''
+
+    parallel_min_nodes = 64
+    '''
+    The levels of the trees with fewer nodes than this are computed in the
+    current process, as they are not worth sending to other processes.
+    '''
+
+    parallel_chunks = 16
+    '''
+    The number of chunks a level of the trees is split into for the processes.
+    '''
+
+    # ----- Main Entry ----- #
+
+    @staticmethod
+    def batch_gcd(moduli, workers=None):
+        '''
+        For each modulus, find the gcd with the product of all the other moduli.
+
+        :param moduli: the moduli, all greater than 1
+        :type moduli: iterable of int
+        :param workers: the number of processes; None or 1 to compute in the
+            current process
+        :type workers: int, optional
+
+        :return: a list with one gcd for each modulus, which is 1 when the
+            modulus shares no factor with the other moduli
+        :rtype: list
+        '''
+        moduli = list(moduli)
+        if len(moduli) == 0:
+            return []
+        executor = None
+        if workers is not None and workers > 1:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            tree = BatchGCD.product_tree(moduli, executor=executor)
+            remainders = BatchGCD.remainder_tree(tree, executor=executor)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        quotients = [ r // n for r, n in zip(remainders, moduli) ]
+        return [ int(g) for g in MathLib.gcd_many(quotients, moduli) ]
+
+    @staticmethod
+    def find_shared_factors(moduli, workers=None):
+        '''
+        Find the moduli that share a factor with some other modulus, and
+        split each of them into two factors.
+
+        When all the factors of a modulus are shared (e.g. a modulus appears
+        twice), the batch gcd is the modulus itself, and the factor is found
+        with the gcd against each of the other moduli instead.
+
+        :param moduli: the moduli, all greater than 1
+        :type moduli: iterable of int
+        :param workers: the number of processes for the batch gcd
+        :type workers: int, optional
+
+        :return: a list of (index, n, p, q) where moduli[index] = n = p * q
+        :rtype: list
+        '''
+        moduli = list(moduli)
+        gcds = BatchGCD.batch_gcd(moduli, workers=workers)
+        result = []
+        for i, (n, g) in enumerate(zip(moduli, gcds)):
+            if g == 1:
+                continue
+            if g == n:
+                g = BatchGCD.proper_factor(n, i, moduli)
+                if g is None:
+                    # only copies of n share its factors
+                    continue
+            result.append((i, n, g, n // g))
+        return result
+
+    @staticmethod
+    def proper_factor(n, index, moduli):
+        '''
+        Find a factor of n from its gcd with each of the other moduli.
+
+        :meta private:
+        :param n: the modulus, equal to moduli[index]
+        :type n: int
+        :param index: the index of n in moduli
+        :type index: int
+        :param moduli: all the moduli
+        :type moduli: list
+
+        :return: a factor of n other than 1 and n, or None if none is found
+        :rtype: int
+        '''
+        for j, m in enumerate(moduli):
+            if j == index:
+                continue
+            g = MathLib.gcd(n, m)
+            if 1 < g < n:
+                return g
+        return None
+
+    @staticmethod
+    def recover_keys(moduli, e=65537, workers=None):
+        '''
+        Recover the RSA private keys of the moduli that share a prime with
+        some other modulus.
+
+        :param moduli: the RSA moduli
+        :type moduli: iterable of int
+        :param e: the public exponent of the keys
+        :type e: int, optional
+        :param workers: the number of processes for the batch gcd
+        :type workers: int, optional
+
+        :return: a list of (index, n, p, q, e, d) for each recovered key
+        :rtype: list
+        '''
+        # imported here, so that the math package does not depend on cipher
+        from ctf_library.cipher.rsa_demo import RSADemo
+        result = []
+        for index, n, p, q in BatchGCD.find_shared_factors(moduli, workers=workers):
+            try:
+                key_e, d, _ = RSADemo.Helper.compute_private_key(p, q, e=e)
+            except ValueError:
+                # n is not a product of two primes
+                continue
+            if key_e != e:
+                # e is not a valid public exponent for p and q
+                continue
+            result.append((index, n, min(p, q), max(p, q), e, d))
+        return result
+
+    @staticmethod
+    def recover_keys_from_file(filename, e=65537, workers=None):
+        '''
+        Recover the RSA private keys from the moduli in a file, as in
+        recover_keys(). See read_moduli() for the file format.
+
+        :param filename: the file with the moduli
+        :type filename: str
+        :param e: the public exponent of the keys
+        :type e: int, optional
+        :param workers: the number of processes for the batch gcd
+        :type workers: int, optional
+
+        :return: a list of (index, n, p, q, e, d) for each recovered key,
+            where index is the position of n among the moduli in the file
+        :rtype: list
+        '''
+        return BatchGCD.recover_keys(BatchGCD.read_moduli(filename), e=e, workers=workers)
+
+    @staticmethod
+    def read_moduli(filename):
+        '''
+        Read the moduli from a file with one modulus per line, in decimal or
+        in hexadecimal with the prefix 0x. Blank lines and lines starting
+        with # are skipped.
+
+        :param filename: the file with the moduli
+        :type filename: str
+
+        :return: a generator of the moduli, read one line at a time
+        :rtype: generator
+        '''
+        with open(filename, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line == '' or line.startswith('#'):
+                    continue
+                yield int(line, 0)
+
+    # ----- Product Tree and Remainder Tree ----- #
+
+    @staticmethod
+    def product_tree(values, executor=None):
+        '''
+        Build the product tree of the values.
+
+        :param values: the values at the leaves
+        :type values: list
+        :param executor: the executor for computing the levels in parallel
+        :type executor: concurrent.futures.Executor, optional
+
+        :return: the levels of the tree, from the leaves to the root; each
+            node is the product of its two children, and the last node of a
+            level with an odd number of nodes is moved up unchanged
+        :rtype: list
+        '''
+        tree = [ list(values) ]
+        while len(tree[-1]) > 1:
+            tree.append(BatchGCD.map_level(BatchGCD.multiply_pairs, tree[-1], executor))
+        return tree
+
+    @staticmethod
+    def remainder_tree(tree, executor=None):
+        '''
+        Compute the root of a product tree modulo the square of each leaf.
+
+        :param tree: the product tree from product_tree()
+        :type tree: list
+        :param executor: the executor for computing the levels in parallel
+        :type executor: concurrent.futures.Executor, optional
+
+        :return: the list of (root mod leaf * leaf), one for each leaf
+        :rtype: list
+        '''
+        remainders = tree[-1]
+        for level in reversed(tree[:-1]):
+            # each child is reduced from the remainder of its parent
+            pairs = [ (remainders[i // 2], node) for i, node in enumerate(level) ]
+            remainders = BatchGCD.map_level(BatchGCD.reduce_pairs, pairs, executor)
+        return remainders
+
+    @staticmethod
+    def map_level(function, items, executor):
+        '''
+        Apply a function that works on a list of items to one level of a
+        tree, splitting the level into chunks for the executor.
+
+        :meta private:
+        :param function: the function, mapping a list to a list
+        :type function: function
+        :param items: the items in the level
+        :type items: list
+        :param executor: the executor, or None to compute in this process
+        :type executor: concurrent.futures.Executor
+
+        :return: the concatenated results of the chunks
+        :rtype: list
+        '''
+        if executor is None or len(items) < BatchGCD.parallel_min_nodes:
+            return function(items)
+        # chunks have an even size so that pairs are not split
+        chunk_size = max(2, math.ceil(len(items) / BatchGCD.parallel_chunks / 2) * 2)
+        chunks = [ items[i:i + chunk_size] for i in range(0, len(items), chunk_size) ]
+        result = []
+        for part in executor.map(function, chunks):
+            result.extend(part)
+        return result
+
+    @staticmethod
+    def multiply_pairs(values):
+        '''
+        Multiply each pair of adjacent values.
+
+        :meta private:
+        :param values: the values
+        :type values: list
+
+        :return: the products, with the last value unchanged when the number
+            of values is odd
+        :rtype: list
+        '''
+        result = [ values[i] * values[i + 1] for i in range(0, len(values) - 1, 2) ]
+        if len(values) % 2 == 1:
+            result.append(values[-1])
+        return result
+
+    @staticmethod
+    def reduce_pairs(pairs):
+        '''
+        Reduce each remainder modulo the square of the node.
+
+        :meta private:
+        :param pairs: the list of (remainder, node)
+        :type pairs: list
+
+        :return: the list of (remainder mod node * node)
+        :rtype: list
+        '''
+        return [ r % (n * n) for r, n in pairs ]
+
+# --- end of file --- #
@@ -5,10 +5,18 @@
 # Ref: https://www.math.cmu.edu/~mradclif/teaching/127S19/Notes/ChineseRemainderTheorem.pdf
 # Ref: http://homepages.math.uic.edu/~leon/mcs425-s08/handouts/chinese_remainder.pdf
 # Ref: https://crypto.stanford.edu/pbc/notes/numbertheory/crt.html
+#
+# --- Non-Coprime Moduli
+# Ref: https://en.wikipedia.org/wiki/Chinese_remainder_theorem#Generalization_to_non-coprime_moduli
+#
+# --- Product Tree
+# Ref: D. J. Bernstein, Scaled remainder trees, https://cr.yp.to/arith/scaledmod-20040820.pdf
+# Ref: https://en.wikipedia.org/wiki/Chinese_remainder_theorem#Computation
 
 import math
+from concurrent.futures import ProcessPoolExecutor
 from ctf_library.math.mathlib import MathLib
-from ctf_library.math.modular_arithmetic import ModularArithmetic
+from ctf_library.math.batch_gcd import BatchGCD
 
 class ChineseRemainderTheorem:
 
@@ -79,18 +87,22 @@ class ChineseRemainderTheorem:
 
             x = a mod n
 
+        The moduli do not need to be coprime; see solve_general().
+
         :param coef_list: a list of tuple (m, a, n)
         :type coef_list: list of tuple
         :param verbose: when True print some debugging information
         :type verbose: bool, optional
 
+        :raise: ValueError if there is no solution
+
         :return: the tuple (a, n)
         :rtype: tuple
         '''
         reduced_coef_list = [
             ChineseRemainderTheorem.reduce(coef, verbose=verbose) for coef in coef_list
         ]
-        result = ChineseRemainderTheorem.solve(reduced_coef_list, verbose=verbose)
+        result = ChineseRemainderTheorem.solve_general(reduced_coef_list, verbose=verbose)
         return result
     
     @staticmethod
@@ -98,29 +110,268 @@ class ChineseRemainderTheorem:
         '''
         Reduce m * x = a mod n to x = a_prime mod n_prime
 
+        With g = gcd(m, n), there is a solution only when g divides a, and
+        then the solutions are x = (a / g) * (m / g)^-1 mod (n / g).
+
         :param coef: the tuple (m, a, n)
         :type coef: tuple
         :param verbose: when True print some debugging information
         :type verbose: bool, optional
 
+        :raise: ValueError if there is no solution
+
         :return: the tuple a_prime, n_prime
         :rtype: tuple
         '''
         (m, a, n) = coef
-        gcd = math.gcd(*coef)
+        if n < 1:
+            raise ValueError(f'modulus must be positive: {n}')
+        gcd = math.gcd(m, n)
         if verbose:
             print(f'{gcd=}')
-        if gcd > 1:
-            m, a, n = m // gcd, a // gcd, n // gcd
-        if m == 1:
-            a_prime = a
-            n_prime = n
-        else:
-            m_inv = ModularArithmetic.mod_inv(m, n)
-            if verbose:
-                print(f'{m_inv=}')
-            a_prime = (a * m_inv) % n
-            n_prime = n
+        if a % gcd != 0:
+            raise ValueError(f'{m} * x = {a} mod {n} has no solution')
+        m, a, n = m // gcd, a // gcd, n // gcd
+        m_inv = pow(m, -1, n)
+        if verbose:
+            print(f'{m_inv=}')
+        a_prime = (a * m_inv) % n
+        n_prime = n
         return (a_prime, n_prime)
-    
+
+    @staticmethod
+    def solve_linear_congruence(coef):
+        '''
+        Find all the solutions of m * x = a mod n in [0, n).
+
+        When g = gcd(m, n) divides a, there are g solutions, which are
+        a_prime + k * n_prime for k in [0, g), with (a_prime, n_prime) from
+        reduce().
+
+        :param coef: the tuple (m, a, n)
+        :type coef: tuple
+
+        :return: the solutions in increasing order; an empty list if there
+            is no solution
+        :rtype: list
+        '''
+        (m, a, n) = coef
+        try:
+            a_prime, n_prime = ChineseRemainderTheorem.reduce(coef)
+        except ValueError:
+            if n < 1:
+                raise
+            return []
+        return list(range(a_prime, n, n_prime))
+
+    # ----- Non-Coprime Moduli ----- #
+
+    @staticmethod
+    def solve_pair_general(coef_pair, verbose=False):
+        '''
+        Combine x = a1 mod n1 and x = a2 mod n2 where n1 and n2 may have
+        common factors.
+
+        With g = gcd(n1, n2), there is a solution only when a1 = a2 mod g,
+        and then it is unique mod lcm(n1, n2).
+
+        :param coef_pair: the list [ (a1, n1), (a2, n2) ]
+        :type coef_pair: list
+        :param verbose: when True print some debugging information
+        :type verbose: bool, optional
+
+        :raise: ValueError if the congruences are not consistent
+
+        :return: the list [ a, lcm(n1, n2) ]
+        :rtype: list
+        '''
+        (a1, n1), (a2, n2) = coef_pair
+        g = math.gcd(n1, n2)
+        if (a2 - a1) % g != 0:
+            raise ValueError(f'x = {a1} mod {n1} and x = {a2} mod {n2} are not consistent')
+        # x = a1 + n1 * t, where (n1 / g) * t = (a2 - a1) / g mod (n2 / g)
+        m2 = n2 // g
+        t = (a2 - a1) // g * pow(n1 // g, -1, m2) % m2
+        n = n1 * m2
+        a = (a1 + n1 * t) % n
+        if verbose:
+            print('[1]:', a1, n1)
+            print('[2]:', a2, n2)
+            print('gcd:', g)
+            print('result:', a, n)
+        return [a, n]
+
+    @staticmethod
+    def solve_general(coef_list, verbose=False, workers=None):
+        '''
+        Solve x = ai mod ni for all i, where the moduli may have common factors.
+
+        The moduli that are coprime to all the other moduli are combined
+        with a product tree (see solve_many()), and the rest are combined
+        in pairs with solve_pair_general(), so that a system with only a few
+        shared factors is about as fast as a system of coprime moduli.
+
+        :param coef_list: the list [ (a1, n1), (a2, n2), ..., (ak, nk) ]
+        :type coef_list: list
+        :param verbose: when True print some debugging information
+        :type verbose: bool, optional
+        :param workers: the number of processes for the tree levels, or None
+            to compute in the current process
+        :type workers: int, optional
+
+        :raise: ValueError if the congruences are not consistent
+
+        :return: the list [ a, n ] where n is the lcm of the moduli; an empty
+            list if coef_list is empty
+        :rtype: list
+        '''
+        if len(coef_list) < 1:
+            return []
+        for _, n in coef_list:
+            if n < 1:
+                raise ValueError(f'modulus must be positive: {n}')
+        executor = ChineseRemainderTheorem.executor(workers)
+        try:
+            tree, remainders = ChineseRemainderTheorem.trees(coef_list, executor)
+            # n is coprime to the other moduli when N / n mod n is invertible
+            coprime, shared = [], []
+            for coef, r in zip(coef_list, remainders):
+                n = coef[1]
+                (coprime if math.gcd(r // n, n) == 1 else shared).append(coef)
+            if verbose:
+                print(f'{len(coprime)} coprime moduli; {len(shared)} moduli with common factors')
+            result = []
+            if len(shared) == 0:
+                result.append(ChineseRemainderTheorem.solve_tree(coef_list, tree, remainders, executor))
+            elif len(coprime) > 0:
+                tree, remainders = ChineseRemainderTheorem.trees(coprime, executor)
+                result.append(ChineseRemainderTheorem.solve_tree(coprime, tree, remainders, executor))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        # pair the rest level by level, so that the numbers grow evenly
+        while len(shared) > 1:
+            merged = [
+                ChineseRemainderTheorem.solve_pair_general(shared[i:i + 2], verbose=verbose)
+                for i in range(0, len(shared) - 1, 2)
+            ]
+            if len(shared) % 2 == 1:
+                merged.append(shared[-1])
+            shared = merged
+        result.extend(shared)
+        if len(result) == 2:
+            return ChineseRemainderTheorem.solve_pair_general(result, verbose=verbose)
+        a, n = result[0]
+        return [a % n, n]
+
+    # ----- Many Congruences (Product Tree) ----- #
+
+    @staticmethod
+    def solve_many(coef_list, workers=None):
+        '''
+        Solve x = ai mod ni for many pairwise coprime moduli with a product tree.
+
+        With N the product of the moduli and Ni = N / ni,
+
+            x = sum(ci * Ni) mod N, where ci = ai * Ni^-1 mod ni
+
+        (a) the product tree of the moduli gives N,
+        (b) the remainder tree gives N mod ni * ni, and Ni mod ni is
+            (N mod ni * ni) / ni, so that every inverse is of a small number,
+        (c) the sum is computed up the product tree: a node with children
+            (s1, P1) and (s2, P2) has s = s1 * P2 + s2 * P1.
+
+        Each level of the trees costs about one multiplication of numbers of
+        the size of N, so the solution costs O(M(N) log k) for k congruences,
+        where solve() computes an extended gcd of large numbers in each step.
+
+        :param coef_list: the list [ (a1, n1), (a2, n2), ..., (ak, nk) ]
+        :type coef_list: list
+        :param workers: the number of processes for the tree levels, or None
+            to compute in the current process
+        :type workers: int, optional
+
+        :raise: ValueError if the moduli are not pairwise coprime
+
+        :return: the list [ a, n ]; an empty list if coef_list is empty
+        :rtype: list
+        '''
+        if len(coef_list) < 1:
+            return []
+        executor = ChineseRemainderTheorem.executor(workers)
+        try:
+            tree, remainders = ChineseRemainderTheorem.trees(coef_list, executor)
+            return ChineseRemainderTheorem.solve_tree(coef_list, tree, remainders, executor)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    @staticmethod
+    def executor(workers):
+        '''
+        Create a process pool for the tree levels, or None for no workers.
+
+        :meta private:
+        '''
+        if workers is None or workers <= 1:
+            return None
+        return ProcessPoolExecutor(max_workers=workers)
+
+    @staticmethod
+    def trees(coef_list, executor):
+        '''
+        Build the product tree of the moduli, and the product of all the
+        moduli modulo the square of each modulus.
+
+        :meta private:
+        :return: the tuple (product tree, remainders)
+        :rtype: tuple
+        '''
+        tree = BatchGCD.product_tree([ n for _, n in coef_list ], executor=executor)
+        return tree, BatchGCD.remainder_tree(tree, executor=executor)
+
+    @staticmethod
+    def solve_tree(coef_list, tree, remainders, executor):
+        '''
+        Compute the sum of solve_many() up the product tree.
+
+        :meta private:
+        :return: the list [ a, n ]
+        :rtype: list
+        '''
+        values = []
+        for (a, n), r in zip(coef_list, remainders):
+            try:
+                values.append(a * pow(r // n, -1, n) % n)
+            except ValueError:
+                raise ValueError(f'{n} is not co-prime to the other moduli') from None
+        for level in tree[:-1]:
+            values = BatchGCD.map_level(
+                ChineseRemainderTheorem.combine_pairs, list(zip(values, level)), executor
+            )
+        n = tree[-1][0]
+        return [values[0] % n, n]
+
+    @staticmethod
+    def combine_pairs(items):
+        '''
+        Combine each pair of adjacent (sum, product) nodes into the sum of
+        their parent node.
+
+        :meta private:
+        :param items: the list of (sum, product)
+        :type items: list
+
+        :return: the sums of the parent nodes, with the last sum unchanged
+            when the number of items is odd
+        :rtype: list
+        '''
+        result = [
+            items[i][0] * items[i + 1][1] + items[i + 1][0] * items[i][1]
+            for i in range(0, len(items) - 1, 2)
+        ]
+        if len(items) % 2 == 1:
+            result.append(items[-1][0])
+        return result
+
 # --- end of file --- #
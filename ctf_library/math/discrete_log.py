@@ -0,0 +1,434 @@
+# file: discrete_log.py
+
+# Discrete Logarithm
+# - Ref: https://en.wikipedia.org/wiki/Discrete_logarithm
+#
+# Baby-Step Giant-Step
+# - Ref: https://en.wikipedia.org/wiki/Baby-step_giant-step
+#
+# Pollard's Rho Algorithm for Logarithms
+# - Ref: https://en.wikipedia.org/wiki/Pollard%27s_rho_algorithm_for_logarithms
+# - Ref: A. Menezes et al., Handbook of Applied Cryptography, Algorithm 3.60
+#
+# Pohlig-Hellman Algorithm
+# - Ref: https://en.wikipedia.org/wiki/Pohlig%E2%80%93Hellman_algorithm
+
+import math
+import random
+import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from ctf_library.math.chinese_remainder_theorem import ChineseRemainderTheorem
+from ctf_library.math.factorization import Factorization
+
+class DiscreteLog:
+    '''
+    Discrete Logarithm Modulo n
+
+    Finds x where g ^ x = h mod n:
+    (a) discrete_log() finds the order of g and uses Pohlig-Hellman, which
+        splits the order into prime powers with Factorization, solves the
+        logarithm in each subgroup, and combines the results with
+        ChineseRemainderTheorem.solve(),
+    (b) each subgroup of prime order is solved with baby-step giant-step
+        for small orders, and with Pollard's rho for large orders,
+    (c) baby-step giant-step keeps its table in numpy arrays with a memory
+        limit, and can run the giant steps in several processes.
+    '''
+
+    bsgs_memory_limit = 1 << 26
+    '''
+    The memory limit in bytes for the baby-step table (64 MB). When the
+    table for ceil(sqrt(order)) baby steps does not fit, fewer baby steps
+    and more giant steps are taken.
+    '''
+
+    bsgs_table_entry_size = 16
+    '''
+    The bytes for each entry of the baby-step table: a 64-bit key and a
+    64-bit exponent.
+    '''
+
+    giant_step_batch_size = 4096
+    '''
+    The number of giant steps looked up in the table at a time.
+    '''
+
+    giant_step_task_size = 1 << 18
+    '''
+    The number of giant steps in each task for the worker processes.
+    '''
+
+    rho_threshold = 1 << 44
+    '''
+    Subgroups of prime order above this are solved with Pollard's rho
+    instead of baby-step giant-step. The baby steps for 2 ^ 44 fill the
+    default memory limit.
+    '''
+
+    _key_mask = (1 << 64) - 1
+
+    _worker_table = None
+
+    # ----- Main Entry ----- #
+
+    @staticmethod
+    def discrete_log(h, g, n, order=None, factorization=None, workers=None):
+        '''
+        Find the smallest x >= 0 where g ^ x = h mod n.
+
+        :param h: the power
+        :type h: int
+        :param g: the base, coprime to n
+        :type g: int
+        :param n: the modulus
+        :type n: int
+        :param order: the order of g, or a multiple of it; found from n if None
+        :type order: int, optional
+        :param factorization: the prime factorization of order, as a dictionary
+        :type factorization: dict, optional
+        :param workers: the number of processes for baby-step giant-step
+        :type workers: int, optional
+
+        :raise: ValueError if g is not coprime to n
+
+        :return: x, or None if h is not a power of g
+        :rtype: int
+        '''
+        if n < 1:
+            raise ValueError(f'modulus must be positive: {n}')
+        g, h = g % n, h % n
+        if math.gcd(g, n) != 1:
+            raise ValueError(f'{g} is not coprime to {n}')
+        if n == 1:
+            return 0
+        if order is None:
+            order = Factorization.carmichael_lambda_function(n)
+            factorization = None
+        if factorization is None:
+            factorization = Factorization.factorint(order)
+        order, factorization = DiscreteLog.multiplicative_order(g, n, order, factorization)
+        return DiscreteLog.pohlig_hellman(h, g, n, order, factorization=factorization, workers=workers)
+
+    @staticmethod
+    def multiplicative_order(g, n, order, factorization=None):
+        '''
+        Find the order of g modulo n from a multiple of the order.
+
+        :param g: the element, coprime to n
+        :type g: int
+        :param n: the modulus
+        :type n: int
+        :param order: a multiple of the order of g, such as the order of the group
+        :type order: int
+        :param factorization: the prime factorization of order, as a dictionary
+        :type factorization: dict, optional
+
+        :return: the order of g and its prime factorization
+        :rtype: tuple
+        '''
+        if factorization is None:
+            factorization = Factorization.factorint(order)
+        if pow(g, order, n) != 1 % n:
+            raise ValueError(f'{order} is not a multiple of the order of {g} mod {n}')
+        result = {}
+        for p, e in factorization.items():
+            # remove the factors of p that are not needed
+            while e > 0 and pow(g, order // p, n) == 1 % n:
+                order //= p
+                e -= 1
+            if e > 0:
+                result[p] = e
+        return order, result
+
+    # ----- Pohlig-Hellman ----- #
+
+    @staticmethod
+    def pohlig_hellman(h, g, n, order, factorization=None, workers=None):
+        '''
+        Find the smallest x >= 0 where g ^ x = h mod n, with the
+        Pohlig-Hellman algorithm.
+
+        :param h: the power
+        :type h: int
+        :param g: the base, coprime to n
+        :type g: int
+        :param n: the modulus
+        :type n: int
+        :param order: the order of g
+        :type order: int
+        :param factorization: the prime factorization of order, as a dictionary;
+            found with Factorization.factorint() if None
+        :type factorization: dict, optional
+        :param workers: the number of processes for baby-step giant-step
+        :type workers: int, optional
+
+        :return: x, or None if h is not a power of g
+        :rtype: int
+        '''
+        g, h = g % n, h % n
+        if pow(h, order, n) != 1 % n:
+            return None
+        if factorization is None:
+            factorization = Factorization.factorint(order)
+        congruences = []
+        for p, e in sorted(factorization.items()):
+            pe = p ** e
+            # g_i and h_i are in the subgroup of order p ^ e
+            g_i = pow(g, order // pe, n)
+            h_i = pow(h, order // pe, n)
+            x_i = DiscreteLog.log_prime_power(h_i, g_i, n, p, e, workers=workers)
+            if x_i is None:
+                return None
+            congruences.append((x_i, pe))
+        if len(congruences) == 0:
+            return 0
+        x, _ = ChineseRemainderTheorem.solve(congruences)
+        return x
+
+    @staticmethod
+    def log_prime_power(h, g, n, p, e, workers=None):
+        '''
+        Find x where g ^ x = h mod n, where g has order p ^ e, one base p
+        digit of x at a time.
+
+        :meta private:
+        :return: x with 0 <= x < p ^ e, or None if h is not a power of g
+        :rtype: int
+        '''
+        # gamma has order p
+        gamma = pow(g, p ** (e - 1), n)
+        g_inv = pow(g, -1, n)
+        x = 0
+        for k in range(e):
+            # h_k = (g ^ -x * h) ^ (p ^ (e - 1 - k)) is in the subgroup of order p
+            h_k = pow(pow(g_inv, x, n) * h % n, p ** (e - 1 - k), n)
+            d = DiscreteLog.log_prime_order(h_k, gamma, n, p, workers=workers)
+            if d is None:
+                return None
+            x += d * p ** k
+        return x
+
+    @staticmethod
+    def log_prime_order(h, g, n, p, workers=None):
+        '''
+        Find x where g ^ x = h mod n, where g has prime order p.
+
+        :meta private:
+        :return: x with 0 <= x < p, or None if h is not a power of g
+        :rtype: int
+        '''
+        if h == 1 % n:
+            return 0
+        if p > DiscreteLog.rho_threshold:
+            x = DiscreteLog.pollard_rho_log(h, g, n, p)
+            if x is not None:
+                return x
+        return DiscreteLog.bsgs(h, g, n, p, workers=workers)
+
+    # ----- Baby-Step Giant-Step ----- #
+
+    @staticmethod
+    def bsgs(h, g, n, order, memory_limit=None, workers=None):
+        '''
+        Find the smallest x >= 0 where g ^ x = h mod n, with the baby-step
+        giant-step algorithm.
+
+        The baby steps g ^ j are kept in a sorted numpy array of 64-bit keys
+        (the low 64 bits of g ^ j), and the giant steps h * g ^ (-m * i) are
+        looked up in batches with a binary search. Matches are checked with
+        pow(), so keys that collide in their low 64 bits do no harm.
+
+        :param h: the power
+        :type h: int
+        :param g: the base, coprime to n
+        :type g: int
+        :param n: the modulus
+        :type n: int
+        :param order: the order of g, or an upper bound of x
+        :type order: int
+        :param memory_limit: the memory limit in bytes for the table;
+            bsgs_memory_limit if None
+        :type memory_limit: int, optional
+        :param workers: the number of processes for the giant steps; None or
+            1 to compute in the current process
+        :type workers: int, optional
+
+        :return: x with 0 <= x < order, or None if there is no such x
+        :rtype: int
+        '''
+        g, h = g % n, h % n
+        if memory_limit is None:
+            memory_limit = DiscreteLog.bsgs_memory_limit
+        m = max(1, math.isqrt(order - 1) + 1)
+        m = min(m, max(1, memory_limit // DiscreteLog.bsgs_table_entry_size))
+        giant_count = -(-order // m)
+
+        # baby steps g ^ j for 0 <= j < m, written straight into the array,
+        # without a list of m Python ints
+        def baby_steps():
+            value = 1 % n
+            for _ in range(m):
+                yield value & DiscreteLog._key_mask
+                value = value * g % n
+        keys = np.fromiter(baby_steps(), dtype=np.uint64, count=m)
+        # a stable sort keeps the smallest j first among equal keys
+        exponents = np.argsort(keys, kind='stable')
+        keys = keys[exponents]
+
+        if workers is None or workers <= 1 or giant_count < 2 * DiscreteLog.giant_step_batch_size:
+            return DiscreteLog.giant_steps(h, g, n, order, m, 0, giant_count, keys, exponents)
+
+        # the table is sent once to each process, and the giant steps are
+        # split into tasks of giant_step_task_size steps; only a few tasks
+        # are queued at a time, so little work is left when x is found
+        task_size = DiscreteLog.giant_step_task_size
+        starts = iter(range(0, giant_count, task_size))
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=DiscreteLog.set_worker_table,
+                                 initargs=(keys, exponents)) as executor:
+            def submit():
+                start = next(starts, None)
+                if start is not None:
+                    end = min(start + task_size, giant_count)
+                    pending.append(executor.submit(DiscreteLog.giant_steps, h, g, n, order, m, start, end))
+            for _ in range(2 * workers):
+                submit()
+            # the tasks are in order, so the first task with a result has
+            # the smallest x
+            while len(pending) > 0:
+                x = pending.popleft().result()
+                if x is not None:
+                    for future in pending:
+                        future.cancel()
+                    return x
+                submit()
+        return None
+
+    @staticmethod
+    def set_worker_table(keys, exponents):
+        '''
+        Keep the table of baby steps in a worker process.
+
+        :meta private:
+        '''
+        DiscreteLog._worker_table = (keys, exponents)
+        return
+
+    @staticmethod
+    def giant_steps(h, g, n, order, m, start, end, keys=None, exponents=None):
+        '''
+        Take the giant steps h * g ^ (-m * i) for start <= i < end, and look
+        them up in the table of baby steps, or the table of the worker
+        process if None.
+
+        :meta private:
+        :return: the smallest x = i * m + j with g ^ x = h mod n, or None
+        :rtype: int
+        '''
+        if keys is None:
+            keys, exponents = DiscreteLog._worker_table
+        factor = pow(g, -m, n)
+        value = h * pow(factor, start, n) % n
+        i = start
+        batch_size = DiscreteLog.giant_step_batch_size
+        while i < end:
+            batch = []
+            for _ in range(min(batch_size, end - i)):
+                batch.append(value)
+                value = value * factor % n
+            batch_keys = np.array([ v & DiscreteLog._key_mask for v in batch ], dtype=np.uint64)
+            positions = np.searchsorted(keys, batch_keys)
+            positions[positions == len(keys)] = 0
+            for k in np.flatnonzero(keys[positions] == batch_keys):
+                # check every baby step with the same key, smallest j first
+                position = int(positions[k])
+                while position < len(keys) and keys[position] == batch_keys[k]:
+                    x = (i + int(k)) * m + int(exponents[position])
+                    if x < order and pow(g, x, n) == h:
+                        return x
+                    position += 1
+            i += len(batch)
+        return None
+
+    # ----- Pollard's Rho ----- #
+
+    @staticmethod
+    def pollard_rho_log(h, g, n, order, seed=None, max_iterations=None, attempts=8):
+        '''
+        Find x where g ^ x = h mod n with Pollard's rho algorithm, in about
+        sqrt(order) steps and constant memory.
+
+        The walk multiplies by h, squares, or multiplies by g depending on
+        the value mod 3, keeping each value as g ^ a * h ^ b. Two equal
+        values give a linear congruence for x, which has a single solution
+        when the order is a prime.
+
+        :param h: the power
+        :type h: int
+        :param g: the base
+        :type g: int
+        :param n: the modulus
+        :type n: int
+        :param order: the order of g, preferably a prime
+        :type order: int
+        :param seed: the seed for the random starting points
+        :type seed: int, optional
+        :param max_iterations: stop each attempt after this many steps;
+            8 * sqrt(order) if None
+        :type max_iterations: int, optional
+        :param attempts: the number of random starting points to try
+        :type attempts: int, optional
+
+        :return: x with 0 <= x < order, or None if none is found
+        :rtype: int
+        '''
+        g, h = g % n, h % n
+        if h == 1 % n:
+            return 0
+        if max_iterations is None:
+            max_iterations = 8 * (math.isqrt(order) + 1)
+        rng = random.Random(seed)
+
+        def step(y, a, b):
+            s = y % 3
+            if s == 0:
+                return y * h % n, a, (b + 1) % order
+            elif s == 1:
+                return y * y % n, 2 * a % order, 2 * b % order
+            return y * g % n, (a + 1) % order, b
+
+        for _ in range(attempts):
+            a0, b0 = rng.randrange(order), rng.randrange(order)
+            y0 = pow(g, a0, n) * pow(h, b0, n) % n
+            tortoise = (y0, a0, b0)
+            hare = step(*tortoise)
+            hare = step(*hare)
+            for _ in range(max_iterations):
+                if tortoise[0] == hare[0]:
+                    break
+                tortoise = step(*tortoise)
+                hare = step(*step(*hare))
+            else:
+                continue
+            # g ^ a1 * h ^ b1 = g ^ a2 * h ^ b2, so (b1 - b2) * x = a2 - a1 mod order
+            _, a1, b1 = tortoise
+            _, a2, b2 = hare
+            r = (b1 - b2) % order
+            if r == 0:
+                continue
+            d = math.gcd(r, order)
+            rhs = (a2 - a1) % order
+            if rhs % d != 0:
+                continue
+            reduced = order // d
+            x0 = rhs // d * pow(r // d, -1, reduced) % reduced
+            # try each of the d solutions
+            for k in range(d):
+                x = x0 + k * reduced
+                if pow(g, x, n) == h:
+                    return x
+        return None
+
+# --- end of file --- #
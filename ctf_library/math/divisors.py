@@ -0,0 +1,133 @@
+# file: divisors.py
+
+# Divisors
+# - Ref: https://en.wikipedia.org/wiki/Divisor
+#
+# Divisor Function (number and sum of divisors)
+# - Ref: https://en.wikipedia.org/wiki/Divisor_function
+
+import heapq
+
+class Divisors:
+    '''
+    Divisors from the Prime Factorization
+
+    All functions take the prime factorization of a positive number as a
+    dictionary mapping each prime factor to its exponent, such as the result
+    of Factorization.factorint().
+    '''
+
+    @staticmethod
+    def iter_divisors(factorization):
+        '''
+        Generate the divisors in no particular order, one at a time,
+        without keeping the list of divisors in memory.
+
+        :param factorization: the prime factorization
+        :type factorization: dict
+
+        :return: a generator of the divisors
+        :rtype: generator
+        '''
+        primes = list(factorization.keys())
+        exponents = list(factorization.values())
+        count = len(primes)
+        # a mixed-radix counter over the exponents, with the running product
+        # for each position so that only the changed positions are recomputed
+        current = [ 0 ] * count
+        products = [ 1 ] * (count + 1)
+        while True:
+            yield products[count]
+            i = count - 1
+            while i >= 0 and current[i] == exponents[i]:
+                current[i] = 0
+                i -= 1
+            if i < 0:
+                return
+            current[i] += 1
+            products[i + 1] = products[i] * primes[i] ** current[i]
+            for j in range(i + 1, count):
+                products[j + 1] = products[j]
+
+    @staticmethod
+    def iter_sorted_divisors(factorization):
+        '''
+        Generate the divisors in ascending order, one at a time.
+
+        Each divisor is reached from a smaller divisor by multiplying one
+        prime, taking the primes in ascending order, and a heap yields the
+        smallest divisor reached so far.
+
+        :param factorization: the prime factorization
+        :type factorization: dict
+
+        :return: a generator of the divisors in ascending order
+        :rtype: generator
+        '''
+        items = sorted(factorization.items())
+        # heap entries are (divisor, index of largest prime, exponent of that prime)
+        heap = [ (1, -1, 0) ]
+        while len(heap) > 0:
+            d, last, exponent = heapq.heappop(heap)
+            yield d
+            if last >= 0 and exponent < items[last][1]:
+                heapq.heappush(heap, (d * items[last][0], last, exponent + 1))
+            for j in range(last + 1, len(items)):
+                heapq.heappush(heap, (d * items[j][0], j, 1))
+
+    @staticmethod
+    def divisors(factorization, sort=True):
+        '''
+        Return the list of divisors.
+
+        :param factorization: the prime factorization
+        :type factorization: dict
+        :param sort: when True, the divisors are sorted in ascending order
+        :type sort: bool, optional
+
+        :return: the list of divisors
+        :rtype: list
+        '''
+        result = list(Divisors.iter_divisors(factorization))
+        if sort:
+            result.sort()
+        return result
+
+    @staticmethod
+    def count(factorization):
+        '''
+        Return the number of divisors, d(n).
+
+        :param factorization: the prime factorization
+        :type factorization: dict
+
+        :return: the number of divisors
+        :rtype: int
+        '''
+        result = 1
+        for e in factorization.values():
+            result *= e + 1
+        return result
+
+    @staticmethod
+    def sum(factorization, k=1):
+        '''
+        Return the sum of the k-th powers of the divisors, sigma_k(n).
+
+        :param factorization: the prime factorization
+        :type factorization: dict
+        :param k: the power of the divisors; 0 gives the number of divisors
+        :type k: int, optional
+
+        :return: the sum of the k-th powers of the divisors
+        :rtype: int
+        '''
+        if k == 0:
+            return Divisors.count(factorization)
+        result = 1
+        for p, e in factorization.items():
+            pk = p ** k
+            result *= (pk ** (e + 1) - 1) // (pk - 1)
+        return result
+
+# --- end of file --- #
@@ -1,6 +1,12 @@
 # file: factorization.py
 
 import math
+from collections import OrderedDict
+from ctf_library.math.divisors import Divisors
+from ctf_library.math.factorization_engine import FactorizationEngine
+from ctf_library.math.fermat_factorization import FermatFactorization
+from ctf_library.math.multiplicative_functions import MultiplicativeFunctions
+from ctf_library.math.prime_sieve import PrimeSieve
 
 class Factorization:
 
@@ -11,8 +17,20 @@ class Factorization:
     Use sympy.factorint(n)
     '''
 
+    # The factorizations of numbers beyond the shared PrimeSieve are kept in a
+    # least recently used (LRU) cache of this size.
+    factorization_cache_size = 4096
+    _factorization_cache = OrderedDict()
+
     # ----- Prime Factorization ----- #
 
+    # Prime Factorization
+    # - Return a list of the prime factors in ascending order, repeated
+    #   according to their multiplicity.
+    # - Numbers covered by the shared PrimeSieve are factorized by looking up
+    #   the smallest prime factor. Extend the table with
+    #   PrimeSieve.shared().extend(limit) before factorizing many numbers.
+    # - Other numbers are factorized by FactorizationEngine.
     @staticmethod
     def prime_factorization(number):
         factors = []
@@ -20,16 +38,42 @@ class Factorization:
         if number < 0:
             factors.append(-1)
             number *= -1
-            
-        factor = 2
-        while factor <= number:     
-            if number % factor == 0:      
-                factors.append(factor)
-                number //= factor
-            else:
-                factor += 1
+
+        if number < 2:
+            return factors
+
+        for p, k in Factorization.factorint(number).items():
+            factors.extend([p] * k)
                 
         return factors
+
+    # Prime Factorization (as a dictionary)
+    # - Return a dictionary mapping each prime factor to its exponent.
+    # - A negative number has the factor -1, and the factorization of 0 is
+    #   { 0: 1 }, following sympy.factorint().
+    # - Raise TimeoutError if the factorization does not finish in timeout seconds.
+    # - The result is cached, so computing several functions of the same number
+    #   factorizes it only once.
+    @staticmethod
+    def factorint(number, timeout=None):
+        if abs(number) <= PrimeSieve.shared().limit:
+            # table lookups are faster than the cache
+            return FactorizationEngine.factorint(number)
+        cache = Factorization._factorization_cache
+        result = cache.get(number)
+        if result is not None:
+            cache.move_to_end(number)
+        else:
+            result = FactorizationEngine.factorint(number, timeout=timeout)
+            cache[number] = result
+            while len(cache) > Factorization.factorization_cache_size:
+                cache.popitem(last=False)
+        return dict(result)
+
+    @staticmethod
+    def clear_factorization_cache():
+        Factorization._factorization_cache.clear()
+        return
     
     @staticmethod
     def max_prime_factor(number):
@@ -57,25 +101,38 @@ class Factorization:
             result.append(-1)
             number *= -1
 
-        divisor = 1
-        while divisor <= number:
-            if number % divisor == 0:
-                quotient = number // divisor
-                if quotient > divisor:
-                    result.append(quotient)
-                    result.append(divisor)
-                elif quotient == divisor:
-                    # a perfect square
-                    result.append(divisor)
-                    break
-                else:
-                    # terminates when quotient is less than divisor
-                    break
-            divisor += 1
-
-        result.sort()
+        # build the divisors from the prime factors instead of testing every
+        # candidate up to sqrt(number)
+        result.extend(Divisors.divisors(Factorization.factorint(number)))
 
         return result
+
+    # Divisors (as a generator)
+    # - Generate the positive divisors of abs(number), without keeping the list
+    #   of divisors in memory.
+    # - The divisors are in ascending order when sort is True.
+    @staticmethod
+    def iter_divisors(number, sort=False):
+        if number == 0:
+            return iter([])
+        factorization = Factorization.factorint(abs(number))
+        if sort:
+            return Divisors.iter_sorted_divisors(factorization)
+        return Divisors.iter_divisors(factorization)
+
+    # Number of Divisors d(n) of abs(number)
+    @staticmethod
+    def divisor_count(number):
+        if number == 0:
+            return 0
+        return Divisors.count(Factorization.factorint(abs(number)))
+
+    # Sum of the k-th Powers of the Divisors sigma_k(n) of abs(number)
+    @staticmethod
+    def divisor_sum(number, k=1):
+        if number == 0:
+            return 0
+        return Divisors.sum(Factorization.factorint(abs(number)), k=k)
     
     # ----- Fermat's Factorization ----- #
 
@@ -111,14 +168,10 @@ class Factorization:
             # special case when n is a perfect square
             return a
         
-        a = math.isqrt(n) + 1   # original algorith uses ceil(sqrt(n))
-        b2 = a * a - n
-        # set a (very loose) upper limit for a so that it will terminate
-        # (TODO: Is this limit correct? Please check.)
-        while a < n and math.isqrt(b2) * math.isqrt(b2) != b2:
-            a += 1
-            b2 = a * a - n
-        return a - math.isqrt(b2)
+        # search up to a = (n + 1) / 2, where the trivial factor 1 is found
+        # for an odd n; an n that is 2 mod 4 has no factor from this method
+        factor = FermatFactorization.factor(n)
+        return factor if factor is not None else 1
     
     # Factorization using Fermat's Factorization Method
     #
@@ -173,33 +226,50 @@ class Factorization:
     #
     # Limitation: There is no limit for a so this function may loop forever,
     #             particularly in cases when n is even.
+    #             Use FermatFactorization.search() for a bounded search.
     #
     @staticmethod
     def fermat_factorization_basic(n):
         a = math.isqrt(n) + 1   # original algorith uses ceil(sqrt(n))
         b2 = a * a - n
+        b = math.isqrt(b2)
         # no other termination condition. this loop may not end.
-        while math.isqrt(b2) * math.isqrt(b2) != b2:
+        while b * b != b2:
+            # (a + 1) ^ 2 - n = a ^ 2 - n + 2a + 1
+            b2 += 2 * a + 1
             a += 1
-            b2 = a * a - n
-        return a - math.isqrt(b2)
+            b = math.isqrt(b2)
+        return a - b
 
     # ----- Other Factor Related Functions ----- #
 
+    # - The functions below work on abs(number), and return 1 for 0 (the
+    #   empty product). Use MultiplicativeFunctions to compute several
+    #   functions from one factorization, or tables of them over a range.
+
     # Euler's totient function
     # Ref: https://en.wikipedia.org/wiki/Euler%27s_totient_function
     @staticmethod
     def euler_totient_function(number):
-        factors = Factorization.prime_factorization(number)
-        phi_n = 1
-        for p in set(factors):
-            phi_n *= p ** (factors.count(p) - 1) * (p - 1)
-        return phi_n
+        return MultiplicativeFunctions.euler_phi(Factorization.factorint_positive(number))
     
     # Carmichael Lambda Function
     # Ref: https://en.wikipedia.org/wiki/Carmichael_function
     @staticmethod
     def carmichael_lambda_function(number):
-        raise Exception('not implemented yet')
+        return MultiplicativeFunctions.carmichael_lambda(Factorization.factorint_positive(number))
+
+    # Mobius Function
+    # Ref: https://en.wikipedia.org/wiki/M%C3%B6bius_function
+    @staticmethod
+    def mobius_function(number):
+        return MultiplicativeFunctions.mobius(Factorization.factorint_positive(number))
+
+    # Prime factorization of abs(number), and {} for 0
+    @staticmethod
+    def factorint_positive(number):
+        if number == 0:
+            return {}
+        return Factorization.factorint(abs(number))
 
 # --- end of file --- #
@@ -0,0 +1,412 @@
+# file: factorization_engine.py
+
+# Integer Factorization
+# - Ref: https://en.wikipedia.org/wiki/Integer_factorization
+#
+# Pollard's Rho Algorithm (with Brent's Cycle Detection)
+# - Ref: https://en.wikipedia.org/wiki/Pollard%27s_rho_algorithm
+# - Ref: https://maths-people.anu.edu.au/~brent/pd/rpb051i.pdf
+#
+# Lenstra Elliptic-Curve Factorization (ECM)
+# - Ref: https://en.wikipedia.org/wiki/Lenstra_elliptic-curve_factorization
+# - Ref: https://en.wikipedia.org/wiki/Montgomery_curve
+# - Ref: https://members.loria.fr/PZimmermann/papers/ecm-submitted.pdf
+
+import math
+import random
+import time
+from ctf_library.math.mathlib import MathLib
+from ctf_library.math.prime_sieve import PrimeSieve
+from ctf_library.math.primality import Primality
+
+class FactorizationEngine:
+    '''
+    A tiered integer factorization engine.
+
+    Numbers are factorized in the following order:
+    (a) trial division by the small primes in the shared PrimeSieve,
+    (b) primality check with Primality.is_prime(),
+    (c) Pollard's rho algorithm with Brent's cycle detection,
+    (d) Lenstra elliptic-curve factorization (ECM).
+
+    Composite factors found by (c) and (d) are split recursively.
+    '''
+
+    trial_division_limit = 1 << 12
+    '''
+    Trial division is done with the primes up to this limit.
+    '''
+
+    rho_iterations = 1 << 16
+    '''
+    The number of iterations for each attempt of Pollard's rho algorithm
+    before switching to ECM.
+    '''
+
+    rho_attempts = 4
+    '''
+    The number of attempts of Pollard's rho algorithm before switching to ECM.
+    '''
+
+    ecm_b1_start = 2000
+    '''
+    The stage 1 bound for the first curves in ECM. The bound grows when
+    more curves are tried.
+    '''
+
+    ecm_curves_per_bound = 8
+    '''
+    The number of curves tried in ECM before the stage 1 bound grows.
+    '''
+
+    # ----- Main Entry ----- #
+
+    @staticmethod
+    def factorint(n, timeout=None, seed=None):
+        '''
+        Find the prime factorization of n.
+
+        Following the convention of sympy.factorint(), a negative n has the
+        factor -1, and the factorization of 0 is { 0: 1 }.
+
+        :param n: the number to factorize
+        :type n: int
+        :param timeout: give up after this many seconds; no limit when None
+        :type timeout: float, optional
+        :param seed: seed for the random choices in the algorithms
+        :type seed: int, optional
+
+        :raise: TimeoutError when the factorization does not finish in time
+
+        :return: a dictionary mapping each prime factor to its exponent,
+            in ascending order of the prime factors
+        :rtype: dict
+        '''
+        deadline = None if timeout is None else time.monotonic() + timeout
+        rng = random.Random(seed)
+        result = {}
+
+        if n < 0:
+            result[-1] = 1
+            n = -n
+        if n == 0:
+            result[0] = 1
+            return result
+        if Primality.is_prime(n):
+            # short-circuit before trial division
+            result[n] = 1
+            return result
+
+        n = FactorizationEngine.trial_division(n, result)
+
+        pending = [ (n, 1) ] if n > 1 else []
+        while len(pending) > 0:
+            m, multiplicity = pending.pop()
+            if Primality.is_prime(m):
+                result[m] = result.get(m, 0) + multiplicity
+                continue
+            root, k = FactorizationEngine.perfect_power(m)
+            if k > 1:
+                pending.append((root, multiplicity * k))
+                continue
+            d = FactorizationEngine.find_factor(m, deadline=deadline, rng=rng)
+            pending.append((d, multiplicity))
+            pending.append((m // d, multiplicity))
+
+        return dict(sorted(result.items()))
+
+    @staticmethod
+    def find_factor(n, deadline=None, rng=None):
+        '''
+        Find a non-trivial factor of a composite n that has no small factors.
+
+        :meta private:
+        :param n: an odd composite number that is not a perfect power
+        :type n: int
+        :param deadline: the time.monotonic() value to give up at
+        :type deadline: float, optional
+        :param rng: the source of random numbers
+        :type rng: random.Random, optional
+
+        :raise: TimeoutError when no factor is found before the deadline
+
+        :return: a factor d of n where 1 < d < n
+        :rtype: int
+        '''
+        if rng is None:
+            rng = random.Random()
+        for _ in range(FactorizationEngine.rho_attempts):
+            d = FactorizationEngine.pollard_rho_brent(
+                n, c=rng.randrange(1, n), y=rng.randrange(n),
+                max_iterations=FactorizationEngine.rho_iterations, deadline=deadline
+            )
+            if d is not None:
+                return d
+        b1 = FactorizationEngine.ecm_b1_start
+        while True:
+            for _ in range(FactorizationEngine.ecm_curves_per_bound):
+                d = FactorizationEngine.ecm_one_curve(
+                    n, rng.randrange(6, n - 1), b1, 50 * b1, deadline=deadline
+                )
+                if d is not None:
+                    return d
+            b1 = b1 * 5 // 2
+
+    # ----- Trial Division ----- #
+
+    @staticmethod
+    def trial_division(n, result, limit=None):
+        '''
+        Remove the prime factors up to limit from n, and record them in result.
+
+        When the remaining cofactor is covered by the shared PrimeSieve, it is
+        factorized completely by table lookups.
+
+        :meta private:
+        :param n: a positive number
+        :type n: int
+        :param result: a dictionary mapping prime factors to exponents,
+            updated in place
+        :type result: dict
+        :param limit: the largest prime to try; trial_division_limit when None
+        :type limit: int, optional
+
+        :return: the remaining cofactor of n
+        :rtype: int
+        '''
+        if limit is None:
+            limit = FactorizationEngine.trial_division_limit
+        sieve = PrimeSieve.shared()
+        for p in sieve.primes_up_to(limit):
+            if n <= sieve.limit:
+                break
+            if p * p > n:
+                # the cofactor is a prime
+                result[n] = result.get(n, 0) + 1
+                return 1
+            if n % p == 0:
+                k = 0
+                while n % p == 0:
+                    n //= p
+                    k += 1
+                result[p] = result.get(p, 0) + k
+        if n <= sieve.limit:
+            for p in sieve.factorize(n):
+                result[p] = result.get(p, 0) + 1
+            return 1
+        return n
+
+    # ----- Perfect Powers ----- #
+
+    @staticmethod
+    def perfect_power(n):
+        '''
+        Check if n is a perfect power.
+
+        :meta private:
+        :param n: a number greater than 1
+        :type n: int
+
+        :return: (root, k) where root ** k == n with the largest k;
+            (n, 1) if n is not a perfect power
+        :rtype: tuple
+        '''
+        for k in PrimeSieve.shared().primes_up_to(n.bit_length()):
+            root = MathLib.iroot(n, k)
+            if root ** k == n:
+                # keep going on the root to find the largest exponent
+                inner_root, inner_k = FactorizationEngine.perfect_power(root)
+                return (inner_root, inner_k * k)
+        return (n, 1)
+
+    # ----- Pollard's Rho ----- #
+
+    @staticmethod
+    def pollard_rho_brent(n, c=1, y=2, max_iterations=None, deadline=None, batch_size=128):
+        '''
+        Find a factor of n using Pollard's rho algorithm with Brent's cycle
+        detection, iterating y -> y * y + c mod n.
+
+        :param n: an odd composite number
+        :type n: int
+        :param c: the constant of the polynomial
+        :type c: int, optional
+        :param y: the starting value
+        :type y: int, optional
+        :param max_iterations: give up after this many iterations
+        :type max_iterations: int, optional
+        :param deadline: the time.monotonic() value to give up at
+        :type deadline: float, optional
+        :param batch_size: the number of products accumulated between gcd
+        :type batch_size: int, optional
+
+        :raise: TimeoutError when the deadline is reached
+
+        :return: a factor d of n where 1 < d < n, or None if the attempt fails
+        :rtype: int
+        '''
+        if n % 2 == 0:
+            return 2
+        g, r, q = 1, 1, 1
+        iterations = 0
+        x = ys = y
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(batch_size, r - k)):
+                    y = (y * y + c) % n
+                    q = q * (x - y) % n
+                g = math.gcd(q, n)
+                k += batch_size
+            iterations += r
+            r *= 2
+            if g == 1:
+                if max_iterations is not None and iterations >= max_iterations:
+                    return None
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeoutError(f'factorization timed out: {n}')
+        if g == n:
+            # the batch went past the factor, redo it one step at a time
+            while True:
+                ys = (ys * ys + c) % n
+                g = math.gcd(x - ys, n)
+                if g > 1:
+                    break
+        return g if g != n else None
+
+    # ----- Elliptic-Curve Method ----- #
+
+    # Points on the Montgomery curve B * y^2 = x^3 + A * x^2 + x are kept in
+    # projective x-only coordinates (X : Z). a24 is (A + 2) / 4 mod n.
+
+    @staticmethod
+    def ecm_one_curve(n, sigma, b1, b2, deadline=None):
+        '''
+        Try to find a factor of n with one curve in the elliptic-curve method,
+        using the Suyama parametrization.
+
+        :param n: an odd composite number
+        :type n: int
+        :param sigma: the curve parameter, 6 <= sigma < n - 1
+        :type sigma: int
+        :param b1: the stage 1 bound
+        :type b1: int
+        :param b2: the stage 2 bound
+        :type b2: int
+        :param deadline: the time.monotonic() value to give up at
+        :type deadline: float, optional
+
+        :raise: TimeoutError when the deadline is reached
+
+        :return: a factor d of n where 1 < d < n, or None if the curve fails
+        :rtype: int
+        '''
+        u = (sigma * sigma - 5) % n
+        v = 4 * sigma % n
+        x = pow(u, 3, n)
+        z = pow(v, 3, n)
+        denominator = 16 * x * v % n
+        g = math.gcd(denominator, n)
+        if g != 1:
+            return g if g != n else None
+        a24 = pow(v - u, 3, n) * (3 * u + v) * pow(denominator, -1, n) % n
+
+        # stage 1: multiply the point by every prime power up to b1
+        # stage 2 walks b1 < p <= b2 without a table of primes, so the shared
+        # sieve is only grown to b1
+        primes = PrimeSieve.shared().primes_up_to(b1)
+        for count, p in enumerate(primes):
+            q = p
+            while q * p <= b1:
+                q *= p
+            x, z = FactorizationEngine.ecm_ladder(q, x, z, a24, n)
+            if count % 256 == 255 and deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f'factorization timed out: {n}')
+        g = math.gcd(z, n)
+        if g != 1:
+            return g if g != n else None
+
+        # stage 2: look for a prime p with b1 < p <= b2 that is the order of
+        # the point, using baby steps j * Q and giant steps m * D * Q
+        # where p = m * D - j or p = m * D + j
+        d = 210
+        baby = {}
+        x2, z2 = FactorizationEngine.ecm_double(x, z, a24, n)
+        prev_x, prev_z = x, z
+        curr_x, curr_z = FactorizationEngine.ecm_add(x2, z2, x, z, x, z, n)
+        baby[1] = (x, z)
+        for j in range(3, d // 2, 2):
+            baby[j] = (curr_x, curr_z)
+            curr_x, curr_z, prev_x, prev_z = (
+                *FactorizationEngine.ecm_add(curr_x, curr_z, x2, z2, prev_x, prev_z, n),
+                curr_x, curr_z
+            )
+        baby = [ point for j, point in baby.items() if math.gcd(j, d) == 1 ]
+
+        step_x, step_z = FactorizationEngine.ecm_ladder(d, x, z, a24, n)
+        m = max(2, b1 // d)
+        giant_x, giant_z = FactorizationEngine.ecm_ladder(m * d, x, z, a24, n)
+        prev_x, prev_z = FactorizationEngine.ecm_ladder((m - 1) * d, x, z, a24, n)
+        product = 1
+        while m * d - d // 2 <= b2:
+            for bx, bz in baby:
+                product = product * (giant_x * bz - bx * giant_z) % n
+            giant_x, giant_z, prev_x, prev_z = (
+                *FactorizationEngine.ecm_add(giant_x, giant_z, step_x, step_z, prev_x, prev_z, n),
+                giant_x, giant_z
+            )
+            m += 1
+            if m % 64 == 0 and deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f'factorization timed out: {n}')
+        g = math.gcd(product, n)
+        return g if 1 < g < n else None
+
+    @staticmethod
+    def ecm_double(x, z, a24, n):
+        '''
+        Return 2P for the point P = (x : z).
+
+        :meta private:
+        '''
+        s = (x + z) * (x + z) % n
+        d = (x - z) * (x - z) % n
+        t = s - d
+        return s * d % n, t * (d + a24 * t) % n
+
+    @staticmethod
+    def ecm_add(x1, z1, x2, z2, x0, z0, n):
+        '''
+        Return P1 + P2 for the points P1 = (x1 : z1) and P2 = (x2 : z2),
+        given their difference P1 - P2 = (x0 : z0).
+
+        :meta private:
+        '''
+        u = (x1 - z1) * (x2 + z2)
+        v = (x1 + z1) * (x2 - z2)
+        w = u + v
+        t = u - v
+        return z0 * w * w % n, x0 * t * t % n
+
+    @staticmethod
+    def ecm_ladder(k, x, z, a24, n):
+        '''
+        Return kP for the point P = (x : z) and k >= 1, using the Montgomery ladder.
+
+        :meta private:
+        '''
+        x1, z1 = x, z
+        x2, z2 = FactorizationEngine.ecm_double(x, z, a24, n)
+        for bit in bin(k)[3:]:
+            if bit == '1':
+                x1, z1 = FactorizationEngine.ecm_add(x2, z2, x1, z1, x, z, n)
+                x2, z2 = FactorizationEngine.ecm_double(x2, z2, a24, n)
+            else:
+                x2, z2 = FactorizationEngine.ecm_add(x1, z1, x2, z2, x, z, n)
+                x1, z1 = FactorizationEngine.ecm_double(x1, z1, a24, n)
+        return x1, z1
+
+# --- end of file --- #
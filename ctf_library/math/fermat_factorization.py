@@ -0,0 +1,290 @@
+# file: fermat_factorization.py
+
+# Fermat's Factorization
+# - Ref: https://en.wikipedia.org/wiki/Fermat%27s_factorization_method
+#
+# Sieve Improvement (Quadratic Residue Filtering)
+# - Ref: https://en.wikipedia.org/wiki/Fermat%27s_factorization_method#Sieve_improvement
+#
+# Lehman's Method
+# - Ref: https://en.wikipedia.org/wiki/Fermat%27s_factorization_method#Lehman%27s_improvement
+# - Ref: R. S. Lehman, Factoring Large Integers, Math. Comp. 28 (1974)
+#
+# Hart's One Line Factoring
+# - Ref: https://wrap.warwick.ac.uk/54707/1/WRAP_Hart_S1446788712000146a.pdf
+
+import math
+import time
+from ctf_library.math.mathlib import MathLib
+
+class FermatFactorization:
+    '''
+    Fermat's Factorization with Bounds and Checkpoints
+
+    Searches for a such that a * a - n is a perfect square b * b, giving
+    n = (a - b) * (a + b). The search:
+    (a) updates b * b incrementally as a grows,
+    (b) skips a when a * a - n is not a square modulo 64, 63, 65 and 11,
+    (c) stops after a number of iterations or seconds, and
+    (d) saves its progress in a checkpoint, which can be resumed later or
+        split for searching in several processes.
+    '''
+
+    residue_moduli = [ 64, 63, 65, 11 ]
+    '''
+    The moduli used to skip the values of a where a * a - n cannot be a square.
+    '''
+
+    time_check_interval = 4096
+    '''
+    The number of iterations between checks of the time limit.
+    '''
+
+    class Checkpoint:
+        '''
+        The progress of a search for a factor of n.
+
+        The values of a in the range [a, a_end) are still to be searched.
+        When the search finds a factor, it is kept in factor.
+        '''
+
+        def __init__(self, n, a=None, a_end=None, iterations=0, factor=None):
+            if n < 1:
+                raise ValueError(f'n must be positive: {n}')
+            self.n = n
+            if a is None:
+                # start at ceil(sqrt(n))
+                a = MathLib.isqrt(n)
+                if a * a < n:
+                    a += 1
+            if a_end is None:
+                # n = 1 * n is found at a = (n + 1) / 2 for odd n
+                a_end = (n + 1) // 2 + 1
+            self.a = a
+            self.a_end = a_end
+            self.iterations = iterations
+            self.factor = factor
+            return
+
+        def finished(self):
+            '''
+            Check if the search has found a factor or has searched the whole range.
+
+            :return: True if there is nothing more to search
+            :rtype: bool
+            '''
+            return self.factor is not None or self.a >= self.a_end
+
+        def split(self, count):
+            '''
+            Split the remaining range into count checkpoints with disjoint
+            ranges, which can be searched independently.
+
+            :param count: the number of checkpoints
+            :type count: int
+
+            :return: the list of checkpoints
+            :rtype: list
+            '''
+            size = max(0, self.a_end - self.a)
+            result = []
+            for i in range(count):
+                start = self.a + size * i // count
+                end = self.a + size * (i + 1) // count
+                result.append(FermatFactorization.Checkpoint(self.n, a=start, a_end=end))
+            return result
+
+        def to_dict(self):
+            '''
+            Return the checkpoint as a dictionary, e.g. for saving as JSON.
+
+            :return: the checkpoint as a dictionary
+            :rtype: dict
+            '''
+            return {
+                'n': self.n, 'a': self.a, 'a_end': self.a_end,
+                'iterations': self.iterations, 'factor': self.factor,
+            }
+
+        @staticmethod
+        def from_dict(data):
+            '''
+            Create a checkpoint from a dictionary created by to_dict().
+
+            :param data: the checkpoint as a dictionary
+            :type data: dict
+
+            :return: the checkpoint
+            :rtype: FermatFactorization.Checkpoint
+            '''
+            return FermatFactorization.Checkpoint(
+                data['n'], a=data['a'], a_end=data['a_end'],
+                iterations=data['iterations'], factor=data['factor']
+            )
+
+    # ----- Fermat's Factorization ----- #
+
+    @staticmethod
+    def factor(n, max_iterations=None, timeout=None):
+        '''
+        Find a factor of n with Fermat's Factorization.
+
+        :param n: a positive number that is not 2 mod 4
+        :type n: int
+        :param max_iterations: stop after this many values of a
+        :type max_iterations: int, optional
+        :param timeout: stop after this many seconds
+        :type timeout: float, optional
+
+        :return: the smaller factor a - b, which is 1 when n is a prime;
+            None if the search stops before finding a factor
+        :rtype: int
+        '''
+        checkpoint = FermatFactorization.search(
+            n, max_iterations=max_iterations, timeout=timeout
+        )
+        return checkpoint.factor
+
+    @staticmethod
+    def search(n=None, max_iterations=None, timeout=None, checkpoint=None):
+        '''
+        Search for a factor of n with Fermat's Factorization, starting from
+        a new search or resuming from a checkpoint.
+
+        :param n: a positive number; may be omitted when checkpoint is given
+        :type n: int, optional
+        :param max_iterations: stop after this many values of a
+        :type max_iterations: int, optional
+        :param timeout: stop after this many seconds
+        :type timeout: float, optional
+        :param checkpoint: the checkpoint to resume from; it is updated in place
+        :type checkpoint: FermatFactorization.Checkpoint, optional
+
+        :return: the checkpoint, with the smaller factor a - b in
+            checkpoint.factor if one is found
+        :rtype: FermatFactorization.Checkpoint
+        '''
+        if checkpoint is None:
+            checkpoint = FermatFactorization.Checkpoint(n)
+        n = checkpoint.n
+        if checkpoint.finished():
+            return checkpoint
+        if n % 4 == 2:
+            # n is not a difference of two squares
+            checkpoint.a = checkpoint.a_end
+            return checkpoint
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        tables = [
+            (m, FermatFactorization.residue_table(n, m))
+            for m in FermatFactorization.residue_moduli
+        ]
+        (m1, t1), (m2, t2), (m3, t3), (m4, t4) = tables
+
+        a = checkpoint.a
+        a_stop = checkpoint.a_end
+        if max_iterations is not None:
+            a_stop = min(a_stop, a + max_iterations)
+        b2 = a * a - n
+        while a < a_stop:
+            if t1[a % m1] and t2[a % m2] and t3[a % m3] and t4[a % m4]:
+                b = math.isqrt(b2)
+                if b * b == b2:
+                    checkpoint.factor = a - b
+                    break
+            b2 += 2 * a + 1
+            a += 1
+            if deadline is not None and a % FermatFactorization.time_check_interval == 0:
+                if time.monotonic() > deadline:
+                    break
+        checkpoint.iterations += a - checkpoint.a
+        checkpoint.a = a
+        return checkpoint
+
+    @staticmethod
+    def residue_table(n, m):
+        '''
+        Return a table t where t[a % m] is 0 when a * a - n cannot be a square.
+
+        :meta private:
+        :param n: the number to factorize
+        :type n: int
+        :param m: the modulus
+        :type m: int
+
+        :return: the table
+        :rtype: bytearray
+        '''
+        squares = set((x * x) % m for x in range(m))
+        return bytearray(1 if (a * a - n) % m in squares else 0 for a in range(m))
+
+    # ----- Lehman's Method ----- #
+
+    @staticmethod
+    def lehman(n):
+        '''
+        Find a factor of n with Lehman's method, in O(n ^ (1/3)) steps.
+
+        :param n: a number greater than 1
+        :type n: int
+
+        :return: a prime factor of n that is at most n ^ (1/3), or some
+            non-trivial factor of n; 1 if n is a prime
+        :rtype: int
+        '''
+        if n < 2:
+            raise ValueError(f'n must be greater than 1: {n}')
+        cube_root = MathLib.iroot(n, 3)
+        for p in range(2, cube_root + 1):
+            if n % p == 0:
+                return p
+        sixth_root = MathLib.iroot(n, 6)
+        for k in range(1, cube_root + 1):
+            four_kn = 4 * k * n
+            root = MathLib.isqrt(four_kn)
+            a_min = root if root * root == four_kn else root + 1
+            a_max = root + sixth_root // (4 * MathLib.isqrt(k)) + 1
+            for a in range(a_min, a_max + 1):
+                b2 = a * a - four_kn
+                b = MathLib.isqrt(b2)
+                if b * b == b2:
+                    g = math.gcd(a + b, n)
+                    if 1 < g < n:
+                        return g
+        return 1
+
+    # ----- Hart's One Line Factoring ----- #
+
+    @staticmethod
+    def hart_one_line(n, max_iterations=None):
+        '''
+        Find a factor of n with Hart's One Line Factoring, which is fast
+        when n is a product of two primes close to a small ratio.
+
+        :param n: an odd composite number
+        :type n: int
+        :param max_iterations: stop after this many iterations
+        :type max_iterations: int, optional
+
+        :return: a non-trivial factor of n, or None if none is found
+        :rtype: int
+        '''
+        root = MathLib.isqrt(n)
+        if root * root == n:
+            return root
+        i = 0
+        while max_iterations is None or i < max_iterations:
+            i += 1
+            ni = n * i
+            s = MathLib.isqrt(ni)
+            if s * s != ni:
+                s += 1
+            m = s * s % n
+            t = MathLib.isqrt(m)
+            if t * t == m:
+                g = math.gcd(s - t, n)
+                if 1 < g < n:
+                    return g
+        return None
+
+# --- end of file --- #
@@ -16,8 +16,17 @@
 # Matrix Determinant
 # Ref: https://en.wikipedia.org/wiki/Determinant
 # Ref: https://byjus.com/maths/determinant-of-a-matrix/
+#
+# Bareiss Algorithm (fraction-free determinant)
+# Ref: https://en.wikipedia.org/wiki/Bareiss_algorithm
+#
+# Gauss-Jordan Elimination Modulo m
+# Ref: https://en.wikipedia.org/wiki/Gaussian_elimination#Finding_the_inverse_of_a_matrix
+# - See also modular_linear_algebra.py
 
 import numpy as np
+from ctf_library.math.mathlib import MathLib
+from ctf_library.math.modular_linear_algebra import ModularLinearAlgebra
 
 class IntegerMatrixMath:
 
@@ -55,25 +64,69 @@ class IntegerMatrixMath:
     
     # Return the modular inverse of the given matrix.
     #
-    # (TODO: Do those check? Or just catch ValueError?)
+    # Gauss-Jordan elimination of [ matrix | I ] modulo m, which reduces to
+    # [ I | inverse ] when the inverse exists. A pivot that is not invertible
+    # mod m (e.g. 13 mod 26) is combined with the other rows using xgcd; see
+    # ModularLinearAlgebra.row_reduce().
+    #
     # Modular inverse does not exist if
     #   (a) determinant is zero
     #   (b) determinant and module are not co-prime.
+    # and ValueError is raised.
     @staticmethod
     def matrix_modular_inverse(matrix, modulo):
-        matrix_cofactor = IntegerMatrixMath.matrix_cofactor(matrix)
-        matrix_adjucate = matrix_cofactor.transpose()
-        det_modular_inverse = pow(IntegerMatrixMath.matrix_det(matrix), -1, modulo)
-        matrix_inverse = (matrix_adjucate * det_modular_inverse) % modulo
-        return matrix_inverse
+        matrix = np.asarray(matrix)
+        n_row, n_col = matrix.shape
+        if n_row != n_col:
+            raise ValueError(f'Matrix is not square: {n_row} != {n_col}')
+        identity = ModularLinearAlgebra.identity(n_row, modulo)
+        augmented = np.hstack([ ModularLinearAlgebra.as_matrix(matrix, modulo), identity ])
+        reduced, pivots = ModularLinearAlgebra.row_reduce(augmented, modulo)
+        if pivots != list(range(n_row)) or not np.array_equal(reduced[:, :n_col], identity):
+            raise ValueError(f'Matrix is not invertible mod {modulo}')
+        return reduced[:, n_col:]
     
     # Return the determinant of the matrix, in integer
     @staticmethod
     def matrix_det(matrix):
-        return int(round(np.linalg.det(matrix)))
+        return IntegerMatrixMath.matrix_det_bareiss(matrix)
+    
+    # Return the determinant of the matrix with the Bareiss algorithm.
+    #
+    # Every value during the elimination is the determinant of a minor of the
+    # matrix, so the divisions are exact and the values stay small. The values
+    # are Python int, so the result is exact for any size of the entries.
+    @staticmethod
+    def matrix_det_bareiss(matrix):
+        m = MathLib.as_object_array(np.asarray(matrix)).copy()
+        n_row, n_col = m.shape
+        if n_row != n_col:
+            raise ValueError(f'Matrix is not square: {n_row} != {n_col}')
+        if n_row == 0:
+            return 1
+        sign = 1
+        prev_pivot = 1
+        for k in range(n_row - 1):
+            if m[k, k] == 0:
+                # swap with a row below that has a non-zero pivot
+                nonzero = np.flatnonzero(m[k+1:, k] != 0)
+                if len(nonzero) == 0:
+                    return 0
+                i = k + 1 + int(nonzero[0])
+                m[[k, i]] = m[[i, k]]
+                sign = -sign
+            m[k+1:, k+1:] = (m[k+1:, k+1:] * m[k, k] - m[k+1:, k][:, None] * m[k, k+1:]) // prev_pivot
+            prev_pivot = m[k, k]
+        return sign * int(m[n_row-1, n_row-1])
     
     # --- Reference implementation. Do not use.
     
+    @staticmethod
+    def matrix_det_ref(matrix):
+        # This is a reference implementation that will give a wrong answer
+        # when the determinant does not fit in the 53-bit mantissa of a float.
+        return int(round(np.linalg.det(matrix)))
+    
     @staticmethod
     def matrix_cofactor_ref(matrix):
         # This is a reference implementation that will give a non-integer answer.
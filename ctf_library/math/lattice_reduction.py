@@ -0,0 +1,514 @@
+# file: lattice_reduction.py
+
+# Lenstra-Lenstra-Lovasz (LLL) Lattice Basis Reduction
+# - Ref: https://en.wikipedia.org/wiki/Lenstra%E2%80%93Lenstra%E2%80%93Lov%C3%A1sz_lattice_basis_reduction_algorithm
+# - Ref: H. Cohen, A Course in Computational Algebraic Number Theory,
+#        Algorithm 2.6.7 (Integral LLL)
+#
+# Floating-Point LLL (L2)
+# - Ref: P. Q. Nguyen and D. Stehle, Floating-Point LLL Revisited,
+#        https://doi.org/10.1007/11426639_13
+#
+# Deep Insertion and Block Korkine-Zolotarev (BKZ) Reduction
+# - Ref: C. P. Schnorr and M. Euchner, Lattice Basis Reduction: Improved Practical
+#        Algorithms and Solving Subset Sum Problems,
+#        https://doi.org/10.1007/BF01581144
+
+import math
+import numpy as np
+from fractions import Fraction
+from ctf_library.math.mathlib import MathLib
+from ctf_library.math.integer_matrix_math import IntegerMatrixMath
+
+class LatticeReduction:
+    '''
+    Lattice Basis Reduction
+
+    The rows of a matrix are the basis vectors of a lattice. The functions
+    return a reduced basis of the same lattice, as a numpy array of Python
+    int:
+    (a) lll() works with exact integers only (integral LLL),
+    (b) lll_fp() keeps the basis and its Gram matrix exact, and the
+        Gram-Schmidt coefficients in numpy floats, whose cost does not grow
+        with the size of the numbers; it is faster than lll() for long
+        vectors (hundreds of bits), and slower for short ones, where the
+        integers of lll() stay small;
+        deep_insertion=True inserts a vector before the first position
+        where it is shorter, instead of swapping adjacent vectors,
+    (c) bkz() improves an LLL-reduced basis by finding the shortest vector
+        of each block of vectors with enumeration.
+
+    The basis vectors must be linearly independent.
+    '''
+
+    default_delta = Fraction(99, 100)
+    '''
+    The Lovasz constant delta, between 1/4 and 1. A larger delta gives a
+    shorter basis and takes longer.
+    '''
+
+    size_reduction_eta = 0.51
+    '''
+    The largest Gram-Schmidt coefficient after size reduction in lll_fp(),
+    a little above 1/2 for the floating-point errors.
+    '''
+
+    max_size_reduction_loops = 100
+    '''
+    lll_fp() falls back to lll() when size reduction of a vector does not
+    converge in this many loops, which means that the floating-point
+    precision is not enough for the basis.
+    '''
+
+    float_gram_bits = 1000
+    '''
+    The largest bit length of the Gram matrix in lll_fp() for the conversion
+    to float64, which can hold numbers up to 2 ^ 1024.
+    '''
+
+    deep_insertion_depth = 8
+    '''
+    With deep insertion, a vector is only inserted at the first or the last
+    deep_insertion_depth positions before it, as in Schnorr and Euchner;
+    insertion at every position takes much longer for little gain.
+    '''
+
+    # ----- Basis ----- #
+
+    @staticmethod
+    def as_basis(basis):
+        '''
+        Convert a basis to a 2-dimensional numpy array of Python int.
+
+        :meta private:
+        '''
+        basis = MathLib.as_object_array(np.asarray(basis)).copy()
+        if basis.ndim != 2:
+            raise ValueError(f'not a matrix: shape {basis.shape}')
+        return basis
+
+    @staticmethod
+    def gram_matrix(basis):
+        '''
+        Compute the Gram matrix of a basis, the inner products of every pair
+        of basis vectors.
+
+        :param basis: the basis vectors as rows
+        :type basis: numpy array or list of lists
+
+        :return: the Gram matrix
+        :rtype: numpy array of Python int
+        '''
+        basis = LatticeReduction.as_basis(basis)
+        return basis.dot(basis.T)
+
+    @staticmethod
+    def volume_squared(basis):
+        '''
+        Compute the square of the volume of the lattice, the determinant of
+        the Gram matrix. It is not changed by the reduction.
+
+        :param basis: the basis vectors as rows
+        :type basis: numpy array or list of lists
+
+        :return: the square of the volume
+        :rtype: int
+        '''
+        return IntegerMatrixMath.matrix_det(LatticeReduction.gram_matrix(basis))
+
+    @staticmethod
+    def is_lll_reduced(basis, delta=None, eta=Fraction(1, 2)):
+        '''
+        Check if a basis is LLL-reduced, with exact arithmetic.
+
+        :param basis: the basis vectors as rows
+        :type basis: numpy array or list of lists
+        :param delta: the Lovasz constant; default_delta if None
+        :type delta: Fraction or float, optional
+        :param eta: the largest Gram-Schmidt coefficient; lll_fp() gives at
+            most size_reduction_eta
+        :type eta: Fraction or float, optional
+
+        :return: True if every Gram-Schmidt coefficient is at most eta and
+            every pair of adjacent vectors satisfies the Lovasz condition
+        :rtype: bool
+        '''
+        delta = Fraction(LatticeReduction.default_delta if delta is None else delta)
+        eta = Fraction(eta)
+        b = LatticeReduction.as_basis(basis)
+        n = len(b)
+        d = [ 1 ] + [ 0 ] * n
+        lam = [ [ 0 ] * n for _ in range(n) ]
+        for k in range(n):
+            LatticeReduction.integral_gram_schmidt_row(b, k, d, lam)
+            for j in range(k):
+                if eta.denominator * abs(lam[k][j]) > eta.numerator * d[j + 1]:
+                    return False
+            if k > 0 and not LatticeReduction.lovasz_integral(k, d, lam, delta):
+                return False
+        return True
+
+    # ----- Integral LLL ----- #
+
+    @staticmethod
+    def integral_gram_schmidt_row(b, k, d, lam):
+        '''
+        Compute d[k + 1] and lam[k][j] for j < k, where d[i] is the Gram
+        determinant of the first i vectors, and lam[k][j] = d[j + 1] * mu[k][j].
+
+        :meta private:
+        '''
+        for j in range(k + 1):
+            u = int(b[k].dot(b[j]))
+            for i in range(j):
+                u = (d[i + 1] * u - lam[k][i] * lam[j][i]) // d[i]
+            if j < k:
+                lam[k][j] = u
+            else:
+                if u == 0:
+                    raise ValueError('the basis vectors are linearly dependent')
+                d[k + 1] = u
+        return
+
+    @staticmethod
+    def lovasz_integral(k, d, lam, delta):
+        '''
+        Check the Lovasz condition for vectors k - 1 and k,
+        |b*_k| ^ 2 >= (delta - mu ^ 2) |b*_(k-1)| ^ 2, in integers.
+
+        :meta private:
+        '''
+        p, q = delta.numerator, delta.denominator
+        return q * d[k + 1] * d[k - 1] >= p * d[k] * d[k] - q * lam[k][k - 1] * lam[k][k - 1]
+
+    @staticmethod
+    def lll(basis, delta=None):
+        '''
+        Reduce a lattice basis with the integral LLL algorithm, which uses
+        exact integer arithmetic only.
+
+        :param basis: the basis vectors as rows
+        :type basis: numpy array or list of lists
+        :param delta: the Lovasz constant; default_delta if None
+        :type delta: Fraction or float, optional
+
+        :raise: ValueError if the basis vectors are linearly dependent
+
+        :return: the LLL-reduced basis
+        :rtype: numpy array of Python int
+        '''
+        delta = Fraction(LatticeReduction.default_delta if delta is None else delta)
+        b = LatticeReduction.as_basis(basis)
+        n = len(b)
+        if n == 0:
+            return b
+        d = [ 1 ] + [ 0 ] * n
+        lam = [ [ 0 ] * n for _ in range(n) ]
+
+        def reduce(k, l):
+            # make |mu[k][l]| <= 1/2
+            if 2 * abs(lam[k][l]) > d[l + 1]:
+                q = (2 * lam[k][l] + d[l + 1]) // (2 * d[l + 1])
+                b[k] -= q * b[l]
+                lam[k][l] -= q * d[l + 1]
+                for i in range(l):
+                    lam[k][i] -= q * lam[l][i]
+
+        def swap(k, k_max):
+            b[[k - 1, k]] = b[[k, k - 1]]
+            for j in range(k - 1):
+                lam[k][j], lam[k - 1][j] = lam[k - 1][j], lam[k][j]
+            v = lam[k][k - 1]
+            new_d = (d[k - 1] * d[k + 1] + v * v) // d[k]
+            for i in range(k + 1, k_max + 1):
+                t = lam[i][k]
+                lam[i][k] = (d[k + 1] * lam[i][k - 1] - v * t) // d[k]
+                lam[i][k - 1] = (new_d * t + v * lam[i][k]) // d[k + 1]
+            d[k] = new_d
+
+        LatticeReduction.integral_gram_schmidt_row(b, 0, d, lam)
+        k, k_max = 1, 0
+        while k < n:
+            if k > k_max:
+                k_max = k
+                LatticeReduction.integral_gram_schmidt_row(b, k, d, lam)
+            reduce(k, k - 1)
+            if not LatticeReduction.lovasz_integral(k, d, lam, delta):
+                swap(k, k_max)
+                k = max(1, k - 1)
+                continue
+            for l in range(k - 2, -1, -1):
+                reduce(k, l)
+            k += 1
+        return b
+
+    # ----- Floating-Point LLL ----- #
+
+    @staticmethod
+    def lll_fp(basis, delta=None, deep_insertion=False):
+        '''
+        Reduce a lattice basis with floating-point LLL.
+
+        The basis and its Gram matrix are exact, and the Gram-Schmidt
+        coefficients are computed in numpy float64 from the exact Gram
+        matrix, as in the L2 algorithm. A Gram matrix that does not fit in
+        float64 is scaled down by a power of two before the conversion.
+
+        :param basis: the basis vectors as rows
+        :type basis: numpy array or list of lists
+        :param delta: the Lovasz constant; default_delta if None
+        :type delta: Fraction or float, optional
+        :param deep_insertion: insert a vector before the first vector where
+            the Lovasz condition fails, which gives a shorter basis
+        :type deep_insertion: bool, optional
+
+        :raise: ValueError if the basis vectors are linearly dependent (from
+            lll(), which is used when the precision of float64 is not enough)
+
+        :return: the LLL-reduced basis
+        :rtype: numpy array of Python int
+        '''
+        delta = float(LatticeReduction.default_delta if delta is None else delta)
+        eta = LatticeReduction.size_reduction_eta
+        b = LatticeReduction.as_basis(basis)
+        n = len(b)
+        if n == 0:
+            return b
+        g = b.dot(b.T)
+        # g is divided by 2 ^ shift[0] for the conversion to float64; mu does
+        # not change, and r changes by the same factor, when g is scaled
+        shift = [ 0 ]
+        # mu has ones on the diagonal, and mu_inverse is its inverse; row j
+        # of each depends on the first j + 1 vectors only
+        mu = np.eye(n)
+        mu_inverse = np.eye(n)
+        r = np.zeros((n, n))
+
+        def gram_schmidt_row(k):
+            # r[k][j] = <b_k, b*_j> and mu[k][j] = r[k][j] / r[j][j]; the
+            # row of r solves the unit triangular system mu[:k, :k] r = g[k];
+            # returns False when float64 is not precise enough
+            new_shift = max(0, int(max(g.diagonal()[:k + 1])).bit_length() - LatticeReduction.float_gram_bits)
+            if new_shift != shift[0]:
+                r[:k] *= 2.0 ** (shift[0] - new_shift)
+                shift[0] = new_shift
+            row = LatticeReduction.to_float(g[k, :k + 1], new_shift)
+            if k > 0:
+                # the squared norms of b*_j underflow to zero after the
+                # scaling when they are much smaller than the largest vector
+                diagonal = r.diagonal()[:k]
+                if not (np.all(np.isfinite(diagonal)) and np.all(diagonal != 0)):
+                    return False
+                r[k, :k] = mu_inverse[:k, :k].dot(row[:k])
+                mu[k, :k] = r[k, :k] / diagonal
+                mu_inverse[k, :k] = -mu[k, :k].dot(mu_inverse[:k, :k])
+            r[k, k] = row[k] - mu[k, :k].dot(r[k, :k])
+            return True
+
+        def size_reduce(k):
+            for _ in range(LatticeReduction.max_size_reduction_loops):
+                if not gram_schmidt_row(k):
+                    return False
+                if g[k, k] == 0:
+                    raise ValueError('the basis vectors are linearly dependent')
+                # Python floats are faster than numpy for single elements
+                row = mu[k, :k].tolist()
+                largest = max(map(abs, row)) if k > 0 else 0.0
+                if largest <= eta:
+                    # r[k][k] can be inaccurate, or even negative, when b*_k
+                    # is much shorter than b_k; the Lovasz condition fails
+                    # then, and the swap makes the vectors shorter
+                    return True
+                if not math.isfinite(largest):
+                    return False
+                for j in range(k - 1, -1, -1):
+                    x = round(row[j])
+                    if x == 0:
+                        continue
+                    b[k] -= x * b[j]
+                    # update row k, then column k, of the Gram matrix
+                    g[k] -= x * g[j]
+                    g[:, k] -= x * g[:, j]
+                    row[j] -= x
+                    for i, v in enumerate(mu[j, :j].tolist()):
+                        row[i] -= x * v
+            return False
+
+        k = 0
+        while k < n:
+            if not size_reduce(k):
+                return LatticeReduction.lll(b, delta=Fraction(delta).limit_denominator(1000))
+            # the Lovasz condition for each position from start to k - 1
+            # c is the squared norm of b_k projected orthogonally to the
+            # vectors before position i
+            start = 0 if deep_insertion else max(k - 1, 0)
+            c = r[k, k] + np.dot(mu[k, start:k] * mu[k, start:k], r.diagonal()[start:k])
+            insert = k
+            depth = LatticeReduction.deep_insertion_depth
+            for i in range(start, k):
+                if (i < depth or i >= k - depth) and c < delta * r[i, i]:
+                    insert = i
+                    break
+                c -= mu[k, i] * mu[k, i] * r[i, i]
+            if insert == k:
+                k += 1
+                continue
+            # move vector k to position insert; the rows from there on change
+            order = [ k ] + list(range(insert, k))
+            b[insert:k + 1] = b[order]
+            g[insert:k + 1] = g[order]
+            g[:, insert:k + 1] = g[:, order]
+            k = insert
+        return b
+
+    @staticmethod
+    def to_float(values, shift):
+        '''
+        Convert Python int to float64, divided by 2 ^ shift.
+
+        :meta private:
+        '''
+        if shift == 0:
+            return values.astype(float)
+        # the numbers below 2 ^ shift keep their precision too
+        result = np.empty(len(values))
+        for i, v in enumerate(values):
+            t = max(0, abs(v).bit_length() - 64)
+            result[i] = math.ldexp(float(v >> t), t - shift)
+        return result
+
+    # ----- BKZ ----- #
+
+    @staticmethod
+    def gram_schmidt(basis):
+        '''
+        Compute the Gram-Schmidt coefficients mu and the squared norms of the
+        Gram-Schmidt vectors in float64, from the Cholesky decomposition of
+        the exact Gram matrix. As in lll_fp(), a Gram matrix that does not
+        fit in float64 is divided by a power of two; mu does not change, and
+        the squared norms are all divided by the same factor.
+
+        :meta private:
+        '''
+        g = LatticeReduction.gram_matrix(basis)
+        largest = max((int(v) for v in g.diagonal()), default=0)
+        shift = max(0, largest.bit_length() - LatticeReduction.float_gram_bits)
+        g = np.array([ LatticeReduction.to_float(row, shift) for row in g ]).reshape(g.shape)
+        lower = np.linalg.cholesky(g)
+        diagonal = np.diag(lower)
+        return lower / diagonal, diagonal * diagonal
+
+    @staticmethod
+    def shortest_vector_in_block(mu, norms, start, end, bound):
+        '''
+        Find the integer coefficients u of the shortest non-zero vector
+        sum(u[i] * b[start + i]) projected orthogonally to the vectors
+        before start, with Schnorr-Euchner enumeration.
+
+        :meta private:
+        :return: the coefficients and the squared norm of the projection,
+            or None if there is no vector shorter than bound
+        :rtype: tuple
+        '''
+        size = end - start
+        u = [ 0 ] * size
+        best = [ None, bound ]
+
+        def search(level, partial):
+            i = start + level
+            center = -sum(u[j - start] * mu[j, i] for j in range(i + 1, end))
+            x0 = round(center)
+            t = 0
+            while True:
+                candidates = [ x0 ] if t == 0 else sorted([ x0 - t, x0 + t ], key=lambda x: abs(x - center))
+                found = False
+                for x in candidates:
+                    norm = partial + (x - center) ** 2 * norms[i]
+                    if norm >= best[1]:
+                        continue
+                    found = True
+                    u[level] = x
+                    if level > 0:
+                        search(level - 1, norm)
+                    elif any(u):
+                        best[0], best[1] = list(u), norm
+                if not found:
+                    break
+                t += 1
+            u[level] = 0
+
+        search(size - 1, 0.0)
+        return None if best[0] is None else (best[0], best[1])
+
+    @staticmethod
+    def insert_vector(b, start, u):
+        '''
+        Replace the vectors from start with vectors of the same lattice,
+        where the first one is sum(u[i] * b[start + i]), using unimodular
+        transformations of adjacent pairs. The gcd of u must be 1.
+
+        :meta private:
+        '''
+        u = list(u)
+        for i in range(len(u) - 1, 0, -1):
+            p, q = u[i - 1], u[i]
+            if q == 0:
+                continue
+            g, s, t = MathLib.xgcd(p, q)
+            # [ p/g q/g ; -t s ] has determinant (s * p + t * q) / g = 1
+            b[start + i - 1], b[start + i] = \
+                (p // g) * b[start + i - 1] + (q // g) * b[start + i], \
+                -t * b[start + i - 1] + s * b[start + i]
+            u[i - 1] = g
+        if u[0] == -1:
+            b[start] = -b[start]
+        return
+
+    @staticmethod
+    def bkz(basis, block_size=10, delta=None, max_tours=8):
+        '''
+        Reduce a lattice basis with a simple BKZ: after LLL, the shortest
+        vector of each block of block_size vectors (projected orthogonally
+        to the vectors before the block) is found by enumeration, and put at
+        the start of the block when it is shorter than the first vector of
+        the block.
+
+        The enumeration takes time exponential in block_size, so the block
+        size should be small (up to about 20).
+
+        :param basis: the basis vectors as rows
+        :type basis: numpy array or list of lists
+        :param block_size: the number of vectors in each block
+        :type block_size: int, optional
+        :param delta: the Lovasz constant; default_delta if None
+        :type delta: Fraction or float, optional
+        :param max_tours: the largest number of passes over the blocks
+        :type max_tours: int, optional
+
+        :raise: ValueError if the basis vectors are linearly dependent
+
+        :return: the reduced basis
+        :rtype: numpy array of Python int
+        '''
+        delta = float(LatticeReduction.default_delta if delta is None else delta)
+        b = LatticeReduction.lll_fp(basis, delta=delta)
+        n = len(b)
+        for _ in range(max_tours):
+            changed = False
+            for start in range(n - 1):
+                end = min(start + block_size, n)
+                mu, norms = LatticeReduction.gram_schmidt(b)
+                result = LatticeReduction.shortest_vector_in_block(mu, norms, start, end, delta * norms[start])
+                if result is None:
+                    continue
+                u, _ = result
+                if abs(u[0]) == 1 and not any(u[1:]):
+                    continue
+                LatticeReduction.insert_vector(b, start, u)
+                b = LatticeReduction.lll_fp(b, delta=delta)
+                changed = True
+            if not changed:
+                break
+        return b
+
+# --- end of file --- #
@@ -27,7 +27,14 @@
 # 2. Other References:
 #    - Ref: https://fossies.org/linux/mpmath/mpmath/libmp/libintmath.py
 
+# Integer k-th Root
+# - Ref: https://en.wikipedia.org/wiki/Nth_root#Using_Newton's_method
+
+# Binary GCD (Stein's Algorithm)
+# - Ref: https://en.wikipedia.org/wiki/Binary_GCD_algorithm
+
 import math
+import numpy as np
 
 class MathLib:
     '''
@@ -38,7 +45,11 @@ class MathLib:
     (b) Extended GCD (xgcd),
     (c) Least Common Multiple (lcm),
     (d) Exponentiation (pow),
-    (e) Integer Square Root (isqrt)
+    (e) Integer Square Root (isqrt),
+    (f) Integer k-th Root (iroot)
+
+    The functions gcd, xgcd, lcm and isqrt also have batch versions
+    (gcd_many, xgcd_many, lcm_many, isqrt_many) that work on whole arrays.
     '''
 
     # --- Greatest Common Divisor (GCD) Related
@@ -380,5 +391,241 @@ class MathLib:
             if newr >= r:
                 return r
             r = newr      
+
+    # --- Integer k-th Root
+
+    @staticmethod
+    def iroot(n, k):
+        '''
+        Find the integer k-th root of n, which is the largest integer x
+        for which x ** k does not exceed n, using the Newton's Method.
+
+        Alternative: Use gmpy2.iroot().
+
+        :param n: the value
+        :param k: the degree of the root
+        :type n: int
+        :type k: int
+
+        :return: the integer k-th root of n
+        :rtype: int
+        '''
+        if k < 1:
+            raise ValueError(f'degree of root must be positive: {k}')
+        if n < 0:
+            raise ValueError('root not defined for negative numbers')
+        if k == 1 or n < 2:
+            return n
+        if k == 2:
+            return MathLib.isqrt(n)
+        # start from a power of two that is not less than the root
+        x = 1 << -(-n.bit_length() // k)
+        while True:
+            y = ((k - 1) * x + n // x ** (k - 1)) // k
+            if y >= x:
+                return x
+            x = y
+
+    # --- Batch Versions
+    #     - Accept numpy arrays (int64 or object) or Python lists, and return
+    #       numpy arrays. The arguments are broadcast against each other.
+    #     - Values that fit in 62 bits are processed with vectorized numpy
+    #       operations in int64. Larger values fall back to Python int in an
+    #       object array.
+
+    _int64_limit = 1 << 62
+    '''
+    Values below this limit (in absolute value) are processed in int64 by
+    the batch functions.
+    '''
+
+    @staticmethod
+    def as_int64_array(values):
+        '''
+        Convert the values to an int64 numpy array if all of them fit in 62 bits.
+
+        :meta private:
+        :param values: the values
+        :type values: numpy array, list or int
+
+        :return: the int64 array, or None if some values are too large
+        :rtype: numpy array
+        '''
+        if not isinstance(values, np.ndarray) or values.dtype.kind not in 'iu':
+            try:
+                values = np.asarray(values, dtype=np.int64)
+            except OverflowError:
+                return None
+        elif values.dtype.kind == 'u' and values.size > 0 and int(values.max()) >= MathLib._int64_limit:
+            return None
+        else:
+            values = values.astype(np.int64, copy=False)
+        if values.size > 0 and int(np.abs(values).max()) >= MathLib._int64_limit:
+            return None
+        return values
+
+    @staticmethod
+    def as_object_array(values):
+        '''
+        Convert the values to a numpy array of Python int.
+
+        :meta private:
+        :param values: the values
+        :type values: numpy array, list or int
+
+        :return: the object array
+        :rtype: numpy array
+        '''
+        if isinstance(values, np.ndarray):
+            # astype(object) converts numpy integers to Python int
+            return values if values.dtype == object else values.astype(object)
+        return np.asarray(values, dtype=object)
+
+    @staticmethod
+    def gcd_many(a, b):
+        '''
+        Find the Greatest Common Divisor (GCD) of each pair of numbers in a and b.
+
+        :param a: first numbers
+        :param b: second numbers
+        :type a: numpy array or list
+        :type b: numpy array or list
+
+        :return: the GCD of each pair, always positive
+        :rtype: numpy array
+        '''
+        a64, b64 = MathLib.as_int64_array(a), MathLib.as_int64_array(b)
+        if a64 is not None and b64 is not None:
+            return np.gcd(a64, b64)
+        return np.frompyfunc(math.gcd, 2, 1)(MathLib.as_object_array(a), MathLib.as_object_array(b))
+
+    @staticmethod
+    def gcd_binary_many(a, b):
+        '''
+        Find the Greatest Common Divisor (GCD) of each pair of numbers in a and b
+        using a vectorized binary GCD algorithm.
+
+        :meta private:
+        :param a: first numbers, fit in 62 bits
+        :param b: second numbers, fit in 62 bits
+        :type a: numpy array or list
+        :type b: numpy array or list
+
+        :return: the GCD of each pair, always positive
+        :rtype: numpy array of int64
+        '''
+        a, b = np.broadcast_arrays(np.abs(np.asarray(a, dtype=np.int64)),
+                                   np.abs(np.asarray(b, dtype=np.int64)))
+        result = np.where(a == 0, b, a)
+        index = np.flatnonzero((a != 0) & (b != 0))
+        u, v = a.ravel()[index], b.ravel()[index]
+        # x & -x is the lowest set bit of x, so dividing by it removes all the
+        # factors of two; the common factors of two are restored at the end
+        shift = (u | v) & -(u | v)
+        u = u // (u & -u)
+        v = v // (v & -v)
+        done_u = np.empty_like(u)
+        active = np.arange(len(u))
+        while len(active) > 0:
+            # both u and v are odd, so their difference is even
+            low, high = np.minimum(u, v), np.maximum(u, v)
+            diff = high - low
+            finished = diff == 0
+            done_u[active[finished]] = low[finished]
+            keep = ~finished
+            active, diff, low = active[keep], diff[keep], low[keep]
+            u, v = low, diff // (diff & -diff)
+        result = result.copy()
+        result.ravel()[index] = done_u * shift
+        return result
+
+    @staticmethod
+    def xgcd_many(a, b):
+        '''
+        For each pair of numbers a and b, find g, x and y where g = gcd(a, b)
+        and g = ax + by, with the same results as xgcd().
+
+        :param a: first numbers
+        :param b: second numbers
+        :type a: numpy array or list
+        :type b: numpy array or list
+
+        :return: (g, x, y) as three arrays
+        :rtype: tuple
+        '''
+        a64, b64 = MathLib.as_int64_array(a), MathLib.as_int64_array(b)
+        if a64 is None or b64 is None:
+            a, b = np.broadcast_arrays(MathLib.as_object_array(a), MathLib.as_object_array(b))
+            g, x, y = [ np.empty(a.size, dtype=object) for _ in range(3) ]
+            for i, (u, v) in enumerate(zip(a.flat, b.flat)):
+                g[i], x[i], y[i] = MathLib.xgcd(u, v)
+            return g.reshape(a.shape), x.reshape(a.shape), y.reshape(a.shape)
+        a, b = np.broadcast_arrays(a64, b64)
+        shape = a.shape
+        a, b = a.ravel().copy(), b.ravel().copy()
+        prevx, x = np.ones_like(a), np.zeros_like(a)
+        prevy, y = np.zeros_like(a), np.ones_like(a)
+        active = np.flatnonzero(b != 0)
+        while len(active) > 0:
+            aa, bb = a[active], b[active]
+            q = aa // bb
+            x[active], prevx[active] = prevx[active] - q * x[active], x[active]
+            y[active], prevy[active] = prevy[active] - q * y[active], y[active]
+            a[active], b[active] = bb, aa % bb
+            active = active[b[active] != 0]
+        return a.reshape(shape), prevx.reshape(shape), prevy.reshape(shape)
+
+    @staticmethod
+    def lcm_many(a, b):
+        '''
+        Find the Least Common Multiple (LCM) of each pair of numbers in a and b.
+
+        :param a: first numbers
+        :param b: second numbers
+        :type a: numpy array or list
+        :type b: numpy array or list
+
+        :return: the LCM of each pair, always positive
+        :rtype: numpy array
+        '''
+        a64, b64 = MathLib.as_int64_array(a), MathLib.as_int64_array(b)
+        if a64 is not None and b64 is not None:
+            # the product of two values below 2 ** 31 fits in int64
+            if a64.size == 0 or b64.size == 0 or max(
+                int(np.abs(a64).max()), int(np.abs(b64).max())
+            ) < (1 << 31):
+                return np.lcm(a64, b64)
+        return np.frompyfunc(math.lcm, 2, 1)(MathLib.as_object_array(a), MathLib.as_object_array(b))
+
+    @staticmethod
+    def isqrt_many(n):
+        '''
+        Find the integer square root of each number in n.
+
+        :param n: the values
+        :type n: numpy array or list
+
+        :raise: ValueError if some values are negative
+
+        :return: the integer square root of each value
+        :rtype: numpy array
+        '''
+        n64 = MathLib.as_int64_array(n)
+        if n64 is None:
+            n = MathLib.as_object_array(n)
+            if n.size > 0 and min(n.flat) < 0:
+                raise ValueError('square root not defined for negative numbers')
+            return np.frompyfunc(math.isqrt, 1, 1)(n)
+        if n64.size > 0 and n64.min() < 0:
+            raise ValueError('square root not defined for negative numbers')
+        # the float estimate is off by at most one for values below 2 ** 62;
+        # the squares are compared in uint64 so that (r + 1) ** 2 cannot overflow
+        r = np.sqrt(n64.astype(np.float64)).astype(np.int64)
+        n_u = n64.astype(np.uint64)
+        r_u = r.astype(np.uint64)
+        r = r - (r_u * r_u > n_u)
+        r_u = r.astype(np.uint64)
+        r = r + ((r_u + 1) * (r_u + 1) <= n_u)
+        return r
     
 # --- end of file --- #
@@ -0,0 +1,213 @@
+# file: mathlib_benchmark.py
+
+# Benchmark of the MathLib Algorithm Variants
+# - Ref: https://docs.python.org/3/library/timeit.html
+
+import sys
+import json
+import random
+import argparse
+import timeit
+from ctf_library.math.mathlib import MathLib
+
+class MathLibBenchmark:
+    '''
+    Benchmark of the MathLib Algorithm Variants
+
+    MathLib has several implementations of gcd, pow and isqrt. The benchmark
+    times each variant on random inputs of each bit length, so that the
+    fastest variant for each input size can be chosen (see MathLibDispatch).
+    '''
+
+    # [ <function>, [ [ <variant name>, <maximum bit length or None> ], ... ] ]
+    # - The recursive variants recurse once per step, so they are not run on
+    #   inputs where the number of steps would exceed the recursion limit.
+    # - isqrt_newtons_method() starts from n and takes one step per bit, so
+    #   it is not run on large inputs.
+    variants = {
+        'gcd': [
+            [ 'gcd', None ],
+            [ 'gcd_euclidean', None ],
+            [ 'gcd_euclidean_recursive', 512 ],
+        ],
+        'pow': [
+            [ 'pow', None ],
+            [ 'pow_exponentiation_by_squaring', None ],
+            [ 'pow_exponentiation_by_squaring_recursive', None ],
+        ],
+        'isqrt': [
+            [ 'isqrt', None ],
+            [ 'isqrt_newtons_method', 1024 ],
+            [ 'isqrt_newtons_method_faster', None ],
+            [ 'isqrt_newtons_method_faster_02', None ],
+            [ 'isqrt_hybrid', None ],
+        ],
+    }
+
+    default_bit_lengths = [ 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192 ]
+    '''
+    The bit lengths of the inputs, from 8 to 8192 bits.
+    '''
+
+    pow_exponent = 17
+    '''
+    The exponent for pow. The bit length applies to the base; a small fixed
+    exponent keeps the result size proportional to the base.
+    '''
+
+    @staticmethod
+    def make_inputs(function_name, bits, count, rng):
+        '''
+        Generate random arguments for a function.
+
+        :param function_name: 'gcd', 'pow' or 'isqrt'
+        :type function_name: str
+        :param bits: the bit length of the inputs
+        :type bits: int
+        :param count: the number of argument tuples
+        :type count: int
+        :param rng: the random number generator
+        :type rng: random.Random
+
+        :return: a list of argument tuples
+        :rtype: list
+        '''
+        def number():
+            return rng.getrandbits(bits) | (1 << (bits - 1))
+        if function_name == 'gcd':
+            return [ (number(), number()) for _ in range(count) ]
+        elif function_name == 'pow':
+            return [ (number(), MathLibBenchmark.pow_exponent) for _ in range(count) ]
+        elif function_name == 'isqrt':
+            return [ (number(),) for _ in range(count) ]
+        raise ValueError(f'unknown function: {function_name}')
+
+    @staticmethod
+    def time_variant(function, inputs, repeat=3):
+        '''
+        Time a function on a list of argument tuples.
+
+        :param function: the function to time
+        :type function: function
+        :param inputs: the argument tuples
+        :type inputs: list
+        :param repeat: the number of runs; the fastest run is taken
+        :type repeat: int, optional
+
+        :return: the average time per call in seconds
+        :rtype: float
+        '''
+        def run():
+            for args in inputs:
+                function(*args)
+        return min(timeit.repeat(run, number=1, repeat=repeat)) / len(inputs)
+
+    @staticmethod
+    def run(function_names=None, bit_lengths=None, count=200, repeat=3, seed=1, verbose=False):
+        '''
+        Time all the variants of the functions at each bit length.
+
+        :param function_names: the functions to benchmark; all if None
+        :type function_names: list, optional
+        :param bit_lengths: the bit lengths; default_bit_lengths if None
+        :type bit_lengths: list, optional
+        :param count: the number of inputs for each bit length
+        :type count: int, optional
+        :param repeat: the number of runs for each variant
+        :type repeat: int, optional
+        :param seed: the seed for the random inputs
+        :type seed: int, optional
+        :param verbose: print the timings as they are measured
+        :type verbose: bool, optional
+
+        :return: the timings as { function: { bits: { variant: seconds } } }
+        :rtype: dict
+        '''
+        if function_names is None:
+            function_names = list(MathLibBenchmark.variants.keys())
+        if bit_lengths is None:
+            bit_lengths = MathLibBenchmark.default_bit_lengths
+        rng = random.Random(seed)
+        results = {}
+        for function_name in function_names:
+            results[function_name] = {}
+            for bits in bit_lengths:
+                inputs = MathLibBenchmark.make_inputs(function_name, bits, count, rng)
+                timings = {}
+                for variant, max_bits in MathLibBenchmark.variants[function_name]:
+                    if max_bits is not None and bits > max_bits:
+                        continue
+                    timings[variant] = MathLibBenchmark.time_variant(
+                        getattr(MathLib, variant), inputs, repeat=repeat
+                    )
+                    if verbose:
+                        print(f'{function_name:<6} {bits:>5} {variant:<42} {timings[variant] * 1e6:>10.3f} us')
+                results[function_name][bits] = timings
+        return results
+
+    @staticmethod
+    def fastest(results):
+        '''
+        Find the fastest variant of each function at each bit length.
+
+        :param results: the timings from run()
+        :type results: dict
+
+        :return: the fastest variants as { function: [ [ bits, variant ], ... ] },
+            sorted by bit length
+        :rtype: dict
+        '''
+        fastest = {}
+        for function_name, by_bits in results.items():
+            fastest[function_name] = [
+                [ bits, min(timings, key=timings.get) ]
+                for bits, timings in sorted(by_bits.items())
+            ]
+        return fastest
+
+class MathLibBenchmarkMain:
+
+    @staticmethod
+    def main(argv=None):
+        parser = argparse.ArgumentParser(
+            prog='mathlib_benchmark',
+            description='Benchmark the MathLib algorithm variants'
+        )
+        parser.add_argument('--function', action='append', choices=list(MathLibBenchmark.variants.keys()),
+                            help='function to benchmark (default: all)')
+        parser.add_argument('--min-bits', type=int, default=8,
+                            help='smallest bit length (default: 8)')
+        parser.add_argument('--max-bits', type=int, default=8192,
+                            help='largest bit length (default: 8192)')
+        parser.add_argument('--count', type=int, default=200,
+                            help='number of inputs for each bit length (default: 200)')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='number of runs for each variant (default: 3)')
+        parser.add_argument('--output',
+                            help='save the thresholds for MathLibDispatch to this JSON file')
+        args = parser.parse_args(argv)
+        bit_lengths = [
+            bits for bits in MathLibBenchmark.default_bit_lengths
+            if args.min_bits <= bits <= args.max_bits
+        ]
+        results = MathLibBenchmark.run(
+            function_names=args.function, bit_lengths=bit_lengths,
+            count=args.count, repeat=args.repeat, verbose=True
+        )
+        fastest = MathLibBenchmark.fastest(results)
+        print()
+        for function_name, items in fastest.items():
+            for bits, variant in items:
+                print(f'fastest {function_name:<6} {bits:>5} bits: {variant}')
+        if args.output is not None:
+            # imported here as mathlib_dispatch imports this module
+            from ctf_library.math.mathlib_dispatch import MathLibDispatch
+            with open(args.output, 'w') as f:
+                json.dump(MathLibDispatch.thresholds_from_results(results), f, indent=2)
+            print(f'thresholds saved to {args.output}')
+        return 0
+
+if __name__ == '__main__':
+    sys.exit(MathLibBenchmarkMain.main())
+
+# --- end of file --- #
@@ -0,0 +1,218 @@
+# file: mathlib_dispatch.py
+
+# Algorithm Selection by Input Size
+# - Ref: https://en.wikipedia.org/wiki/Algorithm_selection
+
+import json
+from ctf_library.math.mathlib import MathLib
+from ctf_library.math.mathlib_benchmark import MathLibBenchmark
+
+class MathLibDispatch:
+    '''
+    Choose the Fastest MathLib Variant by Input Size
+
+    The functions gcd, pow and isqrt call the MathLib variant that is the
+    fastest for the bit length of the input, according to a table of
+    thresholds. The default table was measured with MathLibBenchmark; call
+    calibrate() to measure the table on the current host, or load() to use
+    a table saved by the mathlib_benchmark command.
+    '''
+
+    # [ <function>, [ [ <maximum bit length or None>, <variant name> ], ... ] ]
+    # - An input uses the first entry whose maximum bit length is not less
+    #   than the bit length of the input. The last entry has no maximum.
+    default_thresholds = {
+        'gcd': [
+            [ None, 'gcd_euclidean' ],
+        ],
+        'pow': [
+            [ 32, 'pow_exponentiation_by_squaring' ],
+            [ None, 'pow_exponentiation_by_squaring_recursive' ],
+        ],
+        'isqrt': [
+            [ 32, 'isqrt_hybrid' ],
+            [ None, 'isqrt_newtons_method_faster' ],
+        ],
+    }
+
+    thresholds = default_thresholds
+    '''
+    The table of thresholds in use.
+    '''
+
+    tie_tolerance = 0.05
+    '''
+    When calibrating, a variant that is within this fraction of the fastest
+    time keeps its place, so that noise in the timings does not split the
+    table into many small ranges.
+    '''
+
+    # ----- Dispatched Functions ----- #
+
+    @staticmethod
+    def gcd(a, b):
+        '''
+        Find the Greatest Common Divisor (GCD) of two numbers.
+
+        :param a: first number
+        :param b: second number
+        :type a: int
+        :type b: int
+
+        :return: The Greatest Common Divisor (GCD) of a and b.
+            The value returns is always positive.
+        :rtype: int
+        '''
+        bits = max(abs(a).bit_length(), abs(b).bit_length())
+        return abs(MathLibDispatch.select('gcd', bits)(a, b))
+
+    @staticmethod
+    def pow(x, n):
+        '''
+        Find the value of x to the power of n.
+
+        :param x: base
+        :param n: exponent
+        :type x: int
+        :type n: int
+
+        :return: The value of x to the power of n.
+        :rtype: int
+        '''
+        return MathLibDispatch.select('pow', abs(x).bit_length())(x, n)
+
+    @staticmethod
+    def isqrt(n):
+        '''
+        Find the integer square root of n, which is the largest integer x
+        for which x * x does not exceed n.
+
+        :param n: the value
+        :type n: int
+
+        :return: the integer square root of n
+        :rtype: int
+        '''
+        return MathLibDispatch.select('isqrt', n.bit_length())(n)
+
+    @staticmethod
+    def select(function_name, bits):
+        '''
+        Return the MathLib variant of a function for inputs of a bit length.
+
+        :meta private:
+        :param function_name: 'gcd', 'pow' or 'isqrt'
+        :type function_name: str
+        :param bits: the bit length of the input
+        :type bits: int
+
+        :return: the MathLib function
+        :rtype: function
+        '''
+        for max_bits, variant in MathLibDispatch.thresholds[function_name]:
+            if max_bits is None or bits <= max_bits:
+                return getattr(MathLib, variant)
+        raise ValueError(f'no variant of {function_name} for {bits} bits')
+
+    # ----- Calibration ----- #
+
+    @staticmethod
+    def calibrate(bit_lengths=None, count=200, repeat=3):
+        '''
+        Measure the thresholds on the current host with MathLibBenchmark and
+        use them from now on.
+
+        :param bit_lengths: the bit lengths to measure; see MathLibBenchmark.run()
+        :type bit_lengths: list, optional
+        :param count: the number of inputs for each bit length
+        :type count: int, optional
+        :param repeat: the number of runs for each variant
+        :type repeat: int, optional
+
+        :return: the new table of thresholds
+        :rtype: dict
+        '''
+        results = MathLibBenchmark.run(bit_lengths=bit_lengths, count=count, repeat=repeat)
+        MathLibDispatch.thresholds = MathLibDispatch.thresholds_from_results(results)
+        return MathLibDispatch.thresholds
+
+    @staticmethod
+    def thresholds_from_results(results):
+        '''
+        Build a table of thresholds from the timings of MathLibBenchmark.run().
+
+        The variant chosen at a measured bit length is used for the inputs
+        longer than the previous measured bit length. The variant chosen at
+        the largest bit length is used for all longer inputs.
+
+        :meta private:
+        :param results: the timings as { function: { bits: { variant: seconds } } }
+        :type results: dict
+
+        :return: the table of thresholds
+        :rtype: dict
+        '''
+        thresholds = {}
+        for function_name, by_bits in results.items():
+            table = []
+            current = None
+            for bits, timings in sorted(by_bits.items(), key=lambda item: int(item[0])):
+                best = min(timings, key=timings.get)
+                limit = timings[best] * (1 + MathLibDispatch.tie_tolerance)
+                if current not in timings or timings[current] > limit:
+                    current = best
+                if len(table) > 0 and table[-1][1] == current:
+                    table[-1][0] = int(bits)
+                else:
+                    table.append([ int(bits), current ])
+            table[-1][0] = None
+            # a variant with a maximum bit length is never used above it
+            for variant, max_bits in MathLibBenchmark.variants[function_name]:
+                if variant == table[-1][1] and max_bits is not None:
+                    table[-1][0] = max_bits
+                    table.append([ None, function_name ])
+            thresholds[function_name] = table
+        return thresholds
+
+    @staticmethod
+    def reset():
+        '''
+        Use the default table of thresholds.
+        '''
+        MathLibDispatch.thresholds = MathLibDispatch.default_thresholds
+        return
+
+    @staticmethod
+    def save(filename):
+        '''
+        Save the table of thresholds in use to a JSON file.
+
+        :param filename: the file name
+        :type filename: str
+        '''
+        with open(filename, 'w') as f:
+            json.dump(MathLibDispatch.thresholds, f, indent=2)
+        return
+
+    @staticmethod
+    def load(filename):
+        '''
+        Load a table of thresholds from a JSON file, and use it from now on.
+        The functions that are not in the file use the default thresholds.
+
+        :param filename: the file name
+        :type filename: str
+
+        :return: the table of thresholds
+        :rtype: dict
+        '''
+        with open(filename, 'r') as f:
+            thresholds = json.load(f)
+        for function_name, table in thresholds.items():
+            for _, variant in table:
+                if not hasattr(MathLib, variant):
+                    raise ValueError(f'unknown variant of {function_name}: {variant}')
+        MathLibDispatch.thresholds = { **MathLibDispatch.default_thresholds, **thresholds }
+        return MathLibDispatch.thresholds
+
+# --- end of file --- #
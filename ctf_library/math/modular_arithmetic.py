@@ -15,12 +15,17 @@
 # Modular Square Root
 # - Tonelli–Shanks algorithm
 #   Ref: https://en.wikipedia.org/wiki/Tonelli%E2%80%93Shanks_algorithm
+# - See also modular_sqrt.py
 
 # Linear Equations
 # - Ref: https://www.britannica.com/science/linear-equation
 # - Ref: https://www.cuemath.com/algebra/linear-equations/
+# - See also modular_linear_algebra.py
 
+import numpy as np
 from ctf_library.math.mathlib import MathLib
+from ctf_library.math.modular_linear_algebra import ModularLinearAlgebra
+from ctf_library.math.modular_sqrt import ModularSqrt
 
 class ModularArithmetic:
 
@@ -34,9 +39,24 @@ class ModularArithmetic:
             base, exponent, modulo
         )
 
+    # Modular Square Root
+    # - Returns [ r, -r % modulo ], [ 0 ] or [] in the order of
+    #   mod_sqrt_tonelli_shanks(), which uses the non-residue cached by
+    #   ModularSqrt for each prime.
+    # - Use ModularSqrt.mod_sqrt() for the sorted roots, with a faster
+    #   method than Tonelli–Shanks when it can.
     @staticmethod
     def mod_sqrt(number, modulo):
         return ModularArithmetic.mod_sqrt_tonelli_shanks(number, modulo)
+
+    # Modular Square Root (any modulus)
+    # - Returns the sorted list of all the square roots modulo a prime power
+    #   or a composite number (e.g. n = p * q in Rabin's cryptosystem).
+    # - Use ModularSqrt.iter_mod_sqrt_composite() to generate the roots one
+    #   at a time, or to pass the factorization of the modulus.
+    @staticmethod
+    def mod_sqrt_composite(number, modulo):
+        return ModularSqrt.mod_sqrt_composite(number, modulo)
     
     # ----- Modulo Inverse related ----- #
 
@@ -121,12 +141,9 @@ class ModularArithmetic:
             print('s:', s)
         
         # find z such that z is a quadratic non-residues
-        found = False
-        for i in range(2, p):
-            if ModularArithmetic.legendres_symbol(i, p) == -1:
-                z, found = i, True
-                break
-        if not found:
+        # - the smallest non-residue is cached for each p by ModularSqrt
+        z = ModularSqrt.find_non_residue_cached(p)
+        if z is None:
             return result
         if verbose:
             print('z:', z)
@@ -146,9 +163,12 @@ class ModularArithmetic:
                 # add -r mod p
                 result.append(-r % p)
                 return result
+            # find the least i such that t ^ (2 ^ i) = 1 by repeated squaring
             found = False
+            t2 = t
             for i in range(1, m):
-                if pow(t, 2**i, p) == 1:
+                t2 = (t2 * t2) % p
+                if t2 == 1:
                     found = True
                     break
             if not found:
@@ -156,9 +176,11 @@ class ModularArithmetic:
             if verbose:
                 print('i:', i)
             
-            b = pow(c, 2**(m-i-1), p)
+            b = c
+            for _ in range(m - i - 1):
+                b = (b * b) % p
             m = i
-            c = pow(b, 2, p)
+            c = (b * b) % p
             t = (t * c) % p
             r = (r * b) % p
         
@@ -166,7 +188,6 @@ class ModularArithmetic:
     
     # ----- Linear Equations ----- #
 
-    # TODO: create test cases for this
     @staticmethod
     def mod_solve_linear_equation(m, modulo, verbose=False):
         '''
@@ -184,6 +205,9 @@ class ModularArithmetic:
             
             x(1), x(2), ..., x(k)
 
+        The modulo may be composite; see ModularLinearAlgebra for the null
+        space and for equations with more than one solution.
+
         :param m: the coef matrix consists of m and c;
             (a) the dimensions of the coef matrix is (k, k+1)
         :type m: numpy array of int
@@ -192,42 +216,21 @@ class ModularArithmetic:
         :param verbose: when True, print some debugging information
         :type verbose: bool, optional
 
-        :raise: ValueError
+        :raise: ValueError if there is no solution, or more than one solution
 
-        :return: the coef matrix with (hopefully) the solution
+        :return: the coef matrix in reduced form, which is the identity matrix
+            with the solution in the last column
         :rtype: numpy array
         '''
-        # - make a copy of matrix m and get the dimensionsof the matrix
-        result = m.copy()
-        n_row, n_col = result.shape
-
-        for pivot_row in range(n_row):
-            # - for every row in the coef matrix, find the modulo inverse of the pivot in the row
-            # - the pivot in a row is the coef m(pivot_row, pivot_row)
-            pivot = result[pivot_row][pivot_row]
-            pivot_inv = ModularArithmetic.mod_inv(pivot, modulo)
-            if verbose:
-                print('  ** %4d: %8d, %8d, %8d' % (pivot_row, pivot, pivot_inv, modulo))
-            # - multiply the pivot row with the modulo inverse of the pivot
-            # - this will make the pivot equal to 1
-            # - note that the coef that come before the pivot in the pivot row would have been reduced
-            #   to zero in previous rounds
-            for col in range(n_col):
-                result[pivot_row][col] = (result[pivot_row][col] * pivot_inv) % modulo
-
-            for curr_row in range(n_row):
-                # - for every other row, subtract a multiple of the pivot row
-                # - the multiple is the coef m(curr_row, pivot_row)
-                # - this will make the coef m(curr_row, pivot_row) equal to 0 for every row other than
-                #   the pivot row
-                # - in other words, the pivot column (which is equal to pivot_row) will be all zeroes,
-                #   except for the pivot, which will be 1.
-                if pivot_row == curr_row:
-                    continue
-                v2 = result[curr_row][pivot_row]
-                for col in range(n_col):
-                    result[curr_row][col] = (result[curr_row][col] - result[pivot_row][col] * v2) % modulo
-
+        m = np.asarray(m)
+        n_col = m.shape[1] - 1
+        x, null_space = ModularLinearAlgebra.solve(m[:, :n_col], m[:, n_col], modulo)
+        if verbose:
+            print('  ** solution:', x)
+            print('  ** null space:', null_space)
+        if len(null_space) > 0:
+            raise ValueError('the linear equations have more than one solution')
+        result = np.hstack([ ModularLinearAlgebra.identity(n_col, modulo), x.reshape(-1, 1) ])
         return result
     
 # --- end of file --- #
@@ -0,0 +1,413 @@
+# file: modular_context.py
+
+# Montgomery Modular Multiplication
+# - Ref: https://en.wikipedia.org/wiki/Montgomery_modular_multiplication
+#
+# Barrett Reduction
+# - Ref: https://en.wikipedia.org/wiki/Barrett_reduction
+#
+# Sliding Window Exponentiation
+# - Ref: https://en.wikipedia.org/wiki/Exponentiation_by_squaring#Sliding-window_method
+# - Ref: A. Menezes et al., Handbook of Applied Cryptography, Chapter 14.6
+#        https://cacr.uwaterloo.ca/hac/about/chap14.pdf
+#
+# Fixed Base Exponentiation and Multi-Exponentiation (Shamir's Trick)
+# - Ref: Handbook of Applied Cryptography, Algorithms 14.88 (Shamir's trick)
+#        and 14.109 (fixed-base windowing)
+
+from ctf_library.math.modular_arithmetic import ModularArithmetic
+
+class ModularContext:
+    '''
+    Modular Arithmetic with a Fixed Modulus
+
+    Precomputes the constants for a modulus, for repeated multiplication
+    and exponentiation with the same modulus:
+    (a) sliding window exponentiation (pow),
+    (b) precomputed tables for a base that is used many times (fixed_base),
+    (c) the product of several powers with shared squarings (multi_pow), and
+    (d) the choice of reduction: Python's % operator ('native'), Montgomery
+        reduction ('montgomery', odd modulus only) or Barrett reduction
+        ('barrett').
+
+    Python's % operator on big integers runs in C, so 'native' is the
+    fastest reduction in pure Python; the other two are provided for
+    reference and for porting. The results do not depend on the reduction.
+    '''
+
+    reductions = [ 'native', 'montgomery', 'barrett' ]
+    '''
+    The supported reductions.
+    '''
+
+    # [ <maximum bit length of the exponent>, <window size> ]
+    # - Ref: Handbook of Applied Cryptography, Table 14.16
+    window_sizes = [
+        [ 24, 1 ], [ 80, 3 ], [ 240, 4 ], [ 672, 5 ], [ 1792, 6 ], [ 4608, 7 ],
+    ]
+
+    def __init__(self, modulus, reduction='native'):
+        if modulus < 2:
+            raise ValueError(f'modulus must be greater than 1: {modulus}')
+        if reduction not in ModularContext.reductions:
+            raise ValueError(f'unknown reduction: {reduction}')
+        if reduction == 'montgomery' and modulus % 2 == 0:
+            raise ValueError(f'montgomery reduction needs an odd modulus: {modulus}')
+        self.modulus = modulus
+        self.reduction = reduction
+        self.bits = modulus.bit_length()
+
+        # Montgomery constants, with R = 2 ^ bits > modulus
+        self.r_mask = (1 << self.bits) - 1
+        if modulus % 2 == 1:
+            self.n_prime = -pow(modulus, -1, 1 << self.bits) & self.r_mask
+            self.r_mod = (1 << self.bits) % modulus
+            self.r2_mod = (1 << (2 * self.bits)) % modulus
+        else:
+            self.n_prime = self.r_mod = self.r2_mod = None
+
+        # Barrett constant, mu = floor(4 ^ bits / modulus)
+        self.barrett_mu = (1 << (2 * self.bits)) // modulus
+
+        # the representation used by the exponentiation functions
+        if reduction == 'montgomery':
+            self.mul = self.montgomery_multiply
+            self.one = self.r_mod
+        elif reduction == 'barrett':
+            self.mul = self.barrett_multiply
+            self.one = 1
+        else:
+            self.mul = self.native_multiply
+            self.one = 1
+        return
+
+    # ----- Reductions ----- #
+
+    def native_multiply(self, a, b):
+        '''
+        Multiply two residues with Python's % operator.
+
+        :meta private:
+        '''
+        return a * b % self.modulus
+
+    def montgomery_reduce(self, t):
+        '''
+        Compute t / R mod modulus for 0 <= t < modulus * R (REDC).
+
+        :param t: the value to reduce
+        :type t: int
+
+        :return: t * R ^ -1 mod modulus
+        :rtype: int
+        '''
+        m = (t & self.r_mask) * self.n_prime & self.r_mask
+        u = (t + m * self.modulus) >> self.bits
+        return u - self.modulus if u >= self.modulus else u
+
+    def montgomery_multiply(self, a, b):
+        '''
+        Multiply two residues in Montgomery form.
+
+        :meta private:
+        '''
+        return self.montgomery_reduce(a * b)
+
+    def to_montgomery(self, x):
+        '''
+        Convert x to Montgomery form, x * R mod modulus.
+
+        :param x: the value
+        :type x: int
+
+        :return: x in Montgomery form
+        :rtype: int
+        '''
+        return self.montgomery_reduce((x % self.modulus) * self.r2_mod)
+
+    def from_montgomery(self, x):
+        '''
+        Convert x from Montgomery form.
+
+        :param x: the value in Montgomery form
+        :type x: int
+
+        :return: x * R ^ -1 mod modulus
+        :rtype: int
+        '''
+        return self.montgomery_reduce(x)
+
+    def barrett_reduce(self, x):
+        '''
+        Compute x mod modulus for 0 <= x < modulus ^ 2 with Barrett reduction.
+
+        :param x: the value to reduce
+        :type x: int
+
+        :return: x mod modulus
+        :rtype: int
+        '''
+        q = (x * self.barrett_mu) >> (2 * self.bits)
+        r = x - q * self.modulus
+        while r >= self.modulus:
+            r -= self.modulus
+        return r
+
+    def barrett_multiply(self, a, b):
+        '''
+        Multiply two residues with Barrett reduction.
+
+        :meta private:
+        '''
+        return self.barrett_reduce(a * b)
+
+    def to_internal(self, x):
+        '''
+        Convert a residue to the representation of the reduction.
+
+        :meta private:
+        '''
+        if self.reduction == 'montgomery':
+            return self.to_montgomery(x)
+        return x % self.modulus
+
+    def from_internal(self, x):
+        '''
+        Convert a residue from the representation of the reduction.
+
+        :meta private:
+        '''
+        if self.reduction == 'montgomery':
+            return self.from_montgomery(x)
+        return x
+
+    # ----- Arithmetic ----- #
+
+    def reduce(self, x):
+        '''
+        Reduce a number modulo the modulus.
+
+        :param x: the number
+        :type x: int
+
+        :return: x mod modulus
+        :rtype: int
+        '''
+        return x % self.modulus
+
+    def multiply(self, a, b):
+        '''
+        Multiply two numbers modulo the modulus, with the chosen reduction.
+
+        :param a: first number
+        :param b: second number
+        :type a: int
+        :type b: int
+
+        :return: a * b mod modulus
+        :rtype: int
+        '''
+        return self.from_internal(self.mul(self.to_internal(a), self.to_internal(b)))
+
+    def inverse(self, x):
+        '''
+        Find the modular multiplicative inverse of a number.
+
+        :param x: the number
+        :type x: int
+
+        :raise: ValueError if the inverse does not exist
+
+        :return: the inverse of x mod modulus
+        :rtype: int
+        '''
+        return ModularArithmetic.multiplicative_inverse(x, self.modulus)
+
+    # ----- Sliding Window Exponentiation ----- #
+
+    @staticmethod
+    def window_size(exponent_bits):
+        '''
+        Return the window size for an exponent of a bit length.
+
+        :meta private:
+        :param exponent_bits: the bit length of the exponent
+        :type exponent_bits: int
+
+        :return: the window size in bits
+        :rtype: int
+        '''
+        for max_bits, window in ModularContext.window_sizes:
+            if exponent_bits <= max_bits:
+                return window
+        return 8
+
+    def pow(self, base, exponent, window=None):
+        '''
+        Compute base ^ exponent mod modulus with sliding window exponentiation.
+
+        :param base: the base
+        :type base: int
+        :param exponent: the exponent; a negative exponent uses the inverse of base
+        :type exponent: int
+        :param window: the window size in bits; chosen from the exponent if None
+        :type window: int, optional
+
+        :raise: ValueError if the exponent is negative and base has no inverse
+
+        :return: base ^ exponent mod modulus
+        :rtype: int
+        '''
+        if exponent < 0:
+            base = self.inverse(base)
+            exponent = -exponent
+        if window is None:
+            window = ModularContext.window_size(exponent.bit_length())
+        mul = self.mul
+
+        # odd powers base ^ 1, base ^ 3, ..., base ^ (2 ^ window - 1)
+        x = self.to_internal(base)
+        x2 = mul(x, x)
+        odd_powers = [ x ]
+        for _ in range((1 << (window - 1)) - 1):
+            odd_powers.append(mul(odd_powers[-1], x2))
+
+        result = self.one
+        i = exponent.bit_length() - 1
+        while i >= 0:
+            if (exponent >> i) & 1 == 0:
+                result = mul(result, result)
+                i -= 1
+                continue
+            # the longest window ending in a set bit, at most window bits
+            j = max(i - window + 1, 0)
+            while (exponent >> j) & 1 == 0:
+                j += 1
+            value = (exponent >> j) & ((1 << (i - j + 1)) - 1)
+            for _ in range(i - j + 1):
+                result = mul(result, result)
+            result = mul(result, odd_powers[value >> 1])
+            i = j - 1
+        return self.from_internal(result)
+
+    # ----- Fixed Base Exponentiation ----- #
+
+    class FixedBaseTable:
+        '''
+        Precomputed powers of a base, for computing many powers of the
+        same base without squarings.
+
+        The table keeps base ^ (d * 2 ^ (window * i)) for each digit d of
+        the window; a power is the product of one entry per digit of the
+        exponent.
+        '''
+
+        def __init__(self, context, base, exponent_bits, window=4):
+            self.context = context
+            self.window = window
+            self.digits = max(1, -(-exponent_bits // window))
+            mul = context.mul
+            self.table = []
+            g = context.to_internal(base)
+            for _ in range(self.digits):
+                row = [ context.one, g ]
+                for _ in range((1 << window) - 2):
+                    row.append(mul(row[-1], g))
+                self.table.append(row)
+                # g ^ (2 ^ window) for the next digit
+                g = mul(row[-1], g)
+            return
+
+        def pow(self, exponent):
+            '''
+            Compute base ^ exponent mod modulus from the table.
+
+            :param exponent: a non-negative exponent with at most
+                exponent_bits bits
+            :type exponent: int
+
+            :raise: ValueError if the exponent is out of the range of the table
+
+            :return: base ^ exponent mod modulus
+            :rtype: int
+            '''
+            if exponent < 0 or exponent.bit_length() > self.digits * self.window:
+                raise ValueError(f'exponent out of range of the table: {exponent}')
+            context = self.context
+            mul = context.mul
+            mask = (1 << self.window) - 1
+            result = context.one
+            i = 0
+            while exponent > 0:
+                digit = exponent & mask
+                if digit != 0:
+                    result = mul(result, self.table[i][digit])
+                exponent >>= self.window
+                i += 1
+            return context.from_internal(result)
+
+    def fixed_base(self, base, exponent_bits=None, window=4):
+        '''
+        Precompute a table for computing many powers of the same base.
+
+        :param base: the base
+        :type base: int
+        :param exponent_bits: the largest bit length of the exponents; the
+            bit length of the modulus if None
+        :type exponent_bits: int, optional
+        :param window: the number of exponent bits for each row of the table
+        :type window: int, optional
+
+        :return: the table, with a function pow(exponent)
+        :rtype: ModularContext.FixedBaseTable
+        '''
+        if exponent_bits is None:
+            exponent_bits = self.bits
+        return ModularContext.FixedBaseTable(self, base, exponent_bits, window=window)
+
+    # ----- Multi-Exponentiation ----- #
+
+    def multi_pow(self, bases, exponents):
+        '''
+        Compute the product of base[i] ^ exponent[i] mod modulus with
+        Shamir's trick, which shares the squarings between all the powers.
+
+        A table of the products of every subset of the bases is precomputed,
+        so the number of bases should be small.
+
+        :param bases: the bases
+        :type bases: list of int
+        :param exponents: the exponents; negative exponents use the inverse
+            of the base
+        :type exponents: list of int
+
+        :return: the product of the powers mod modulus
+        :rtype: int
+        '''
+        if len(bases) != len(exponents):
+            raise ValueError('the numbers of bases and exponents are different')
+        bases = list(bases)
+        exponents = list(exponents)
+        for k, e in enumerate(exponents):
+            if e < 0:
+                bases[k] = self.inverse(bases[k])
+                exponents[k] = -e
+        mul = self.mul
+
+        # products[mask] is the product of the bases selected by the bits of mask
+        products = [ self.one ]
+        for base in bases:
+            x = self.to_internal(base)
+            products += [ mul(p, x) for p in products ]
+
+        result = self.one
+        for i in range(max([ e.bit_length() for e in exponents ] + [ 0 ]) - 1, -1, -1):
+            result = mul(result, result)
+            mask = 0
+            for k, e in enumerate(exponents):
+                mask |= ((e >> i) & 1) << k
+            if mask != 0:
+                result = mul(result, products[mask])
+        return self.from_internal(result)
+
+# --- end of file --- #
@@ -0,0 +1,276 @@
+# file: modular_linear_algebra.py
+
+# Gaussian Elimination
+# - Ref: https://en.wikipedia.org/wiki/Gaussian_elimination
+#
+# Howell Form (echelon form over Z/NZ)
+# - Ref: A. Storjohann and T. Mulders, Fast Algorithms for Linear Algebra Modulo N,
+#        https://doi.org/10.1007/3-540-68530-8_12
+# - Ref: https://en.wikipedia.org/wiki/Hermite_normal_form
+#
+# Kernel (Null Space)
+# - Ref: https://en.wikipedia.org/wiki/Kernel_(linear_algebra)
+
+import math
+import numpy as np
+from ctf_library.math.mathlib import MathLib
+
+class ModularLinearAlgebra:
+    '''
+    Linear Algebra Modulo N
+
+    Row reduction of integer matrices modulo a prime or composite number N:
+    (a) the row operations work on whole numpy rows,
+    (b) the pivot of a column is a row with an element that is invertible
+        mod N, when there is one; otherwise the rows are combined with the
+        extended Euclidean algorithm into the Howell form, which is an
+        echelon form that works for composite N,
+    (c) the matrices are int64 when N is at most 2 ^ 31, so that the product
+        of two residues fits, and numpy arrays of Python int otherwise.
+
+    For a prime N, the Howell form is the reduced row echelon form.
+    '''
+
+    int64_modulus_limit = 1 << 31
+    '''
+    The largest modulus for int64 matrices. Larger moduli use object
+    matrices of Python int.
+    '''
+
+    # ----- Matrices ----- #
+
+    @staticmethod
+    def dtype(modulus):
+        '''
+        Return the numpy dtype for residues of a modulus.
+
+        :meta private:
+        '''
+        return np.int64 if modulus <= ModularLinearAlgebra.int64_modulus_limit else object
+
+    @staticmethod
+    def as_matrix(m, modulus):
+        '''
+        Convert a matrix to a 2-dimensional numpy array of residues mod modulus.
+
+        :meta private:
+        :param m: the matrix
+        :type m: numpy array or list of lists
+        :param modulus: the modulus
+        :type modulus: int
+
+        :return: a copy of the matrix with values in [0, modulus)
+        :rtype: numpy array
+        '''
+        if modulus < 1:
+            raise ValueError(f'modulus must be positive: {modulus}')
+        dtype = ModularLinearAlgebra.dtype(modulus)
+        m = np.asarray(m)
+        if m.ndim != 2:
+            raise ValueError(f'not a matrix: shape {m.shape}')
+        if dtype is not object and m.dtype.kind in 'iu':
+            return np.mod(m.astype(np.int64), modulus)
+        result = MathLib.as_object_array(m) % modulus
+        return result if dtype is object else result.astype(np.int64)
+
+    @staticmethod
+    def identity(n, modulus):
+        '''
+        Return the identity matrix of size n, with the dtype for the modulus.
+
+        :meta private:
+        '''
+        result = np.zeros((n, n), dtype=ModularLinearAlgebra.dtype(modulus))
+        for i in range(n):
+            result[i, i] = 1 % modulus
+        return result
+
+    @staticmethod
+    def unit_normalizer(a, modulus):
+        '''
+        Find a unit u mod modulus with u * a = gcd(a, modulus) mod modulus.
+
+        :meta private:
+        '''
+        g, s, _ = MathLib.xgcd(a, modulus)
+        g = abs(g)
+        s %= modulus
+        # s is a unit mod (modulus / g); one of s + k * (modulus / g) is a
+        # unit mod modulus
+        step = modulus // g
+        while math.gcd(s, modulus) != 1:
+            s = (s + step) % modulus
+        return s
+
+    # ----- Row Reduction ----- #
+
+    @staticmethod
+    def row_reduce(m, modulus):
+        '''
+        Find the Howell form of a matrix mod modulus.
+
+        The rows of the Howell form span the same rows as the rows of m.
+        Each row starts with a pivot that divides the modulus, the elements
+        above each pivot are less than the pivot, and every combination of
+        the rows with zeros in the first k columns is a combination of the
+        rows with zeros in the first k columns. For a prime modulus, the
+        pivots are 1 and the Howell form is the reduced row echelon form.
+
+        :param m: the matrix
+        :type m: numpy array or list of lists
+        :param modulus: the modulus
+        :type modulus: int
+
+        :return: the Howell form without zero rows, and the column of the
+            pivot of each row
+        :rtype: tuple
+        '''
+        a = ModularLinearAlgebra.as_matrix(m, modulus)
+        n_rows, n_cols = a.shape
+        if modulus == 1:
+            return a[:0], []
+        # each column can add one row to the Howell form
+        a = np.vstack([ a, np.zeros((n_cols, n_cols), dtype=a.dtype) ])
+        end = n_rows
+        r = 0
+        pivots = []
+        for c in range(n_cols):
+            if r >= end:
+                break
+            units = np.flatnonzero(MathLib.gcd_many(a[r:end, c], modulus) == 1)
+            if len(units) > 0:
+                # an invertible pivot: scale it to 1 and clear the column
+                i = r + int(units[0])
+                if i != r:
+                    a[[r, i]] = a[[i, r]]
+                a[r] = a[r] * pow(int(a[r, c]), -1, modulus) % modulus
+                others = np.flatnonzero(a[:end, c] != 0)
+                others = others[others != r]
+                if len(others) > 0:
+                    a[others] = (a[others] - a[others, c][:, None] * a[r]) % modulus
+            else:
+                nonzero = r + np.flatnonzero(a[r:end, c] != 0)
+                if len(nonzero) == 0:
+                    continue
+                i = int(nonzero[0])
+                if i != r:
+                    a[[r, i]] = a[[i, r]]
+                # combine the rows below into the pivot row, with a
+                # unimodular transformation from the extended gcd
+                for i in r + 1 + np.flatnonzero(a[r + 1:end, c] != 0):
+                    x, y = int(a[r, c]), int(a[i, c])
+                    g, s, t = MathLib.xgcd(x, y)
+                    s, t, u, v = s % modulus, t % modulus, x // g, y // g
+                    a[r], a[i] = (s * a[r] + t * a[i]) % modulus, (u * a[i] - v * a[r]) % modulus
+                a[r] = a[r] * ModularLinearAlgebra.unit_normalizer(int(a[r, c]), modulus) % modulus
+                d = int(a[r, c])
+                if r > 0:
+                    a[:r] = (a[:r] - (a[:r, c] // d)[:, None] * a[r]) % modulus
+                # the multiple of the pivot row that is zero in this column
+                annihilator = (modulus // d) * a[r] % modulus
+                if np.any(annihilator != 0):
+                    a[end] = annihilator
+                    end += 1
+            pivots.append(c)
+            r += 1
+        return a[:r], pivots
+
+    @staticmethod
+    def howell_form(m, modulus):
+        '''
+        Find the Howell form of a matrix mod modulus; see row_reduce().
+
+        :param m: the matrix
+        :type m: numpy array or list of lists
+        :param modulus: the modulus
+        :type modulus: int
+
+        :return: the Howell form without zero rows
+        :rtype: numpy array
+        '''
+        return ModularLinearAlgebra.row_reduce(m, modulus)[0]
+
+    @staticmethod
+    def rank(m, modulus):
+        '''
+        Find the rank of a matrix mod modulus.
+
+        For a composite modulus, this is the number of rows of the Howell
+        form, which can be more than the number of rows that span the rows
+        of m; for example, [ 2 1 ] mod 4 has the Howell form [ 2 1 ] [ 0 2 ].
+
+        :param m: the matrix
+        :type m: numpy array or list of lists
+        :param modulus: the modulus
+        :type modulus: int
+
+        :return: the rank
+        :rtype: int
+        '''
+        return len(ModularLinearAlgebra.row_reduce(m, modulus)[1])
+
+    # ----- Null Space and Linear Equations ----- #
+
+    @staticmethod
+    def null_space(m, modulus):
+        '''
+        Find the vectors x with m * x = 0 mod modulus.
+
+        :param m: the matrix
+        :type m: numpy array or list of lists
+        :param modulus: the modulus
+        :type modulus: int
+
+        :return: a matrix whose rows span the null space, in Howell form;
+            no rows if x = 0 is the only solution
+        :rtype: numpy array
+        '''
+        a = ModularLinearAlgebra.as_matrix(m, modulus)
+        n_rows, n_cols = a.shape
+        # the rows of [ m^T | I ] that reduce to zero in the m^T part have
+        # the null vectors in the I part
+        form, pivots = ModularLinearAlgebra.row_reduce(
+            np.hstack([ a.T, ModularLinearAlgebra.identity(n_cols, modulus) ]), modulus
+        )
+        kernel = [ i for i, c in enumerate(pivots) if c >= n_rows ]
+        return form[kernel, n_rows:]
+
+    @staticmethod
+    def solve(m, b, modulus):
+        '''
+        Solve the linear equations m * x = b mod modulus.
+
+        Every solution is x plus a combination of the rows of the null space.
+
+        :param m: the matrix of coefficients
+        :type m: numpy array or list of lists
+        :param b: the constants, one for each row of m
+        :type b: numpy array or list
+        :param modulus: the modulus
+        :type modulus: int
+
+        :raise: ValueError if there is no solution
+
+        :return: a solution x, and the null space of m (see null_space())
+        :rtype: tuple
+        '''
+        a = ModularLinearAlgebra.as_matrix(m, modulus)
+        b = ModularLinearAlgebra.as_matrix(np.asarray(b).reshape(-1, 1), modulus)
+        n_rows, n_cols = a.shape
+        if b.shape[0] != n_rows:
+            raise ValueError(f'{b.shape[0]} constants for {n_rows} equations')
+        if modulus == 1:
+            return np.zeros(n_cols, dtype=a.dtype), np.zeros((0, n_cols), dtype=a.dtype)
+        # the null vectors (t, x) of [ -b | m ] with t = 1 are the solutions
+        form, pivots = ModularLinearAlgebra.row_reduce(
+            np.hstack([ np.vstack([ (-b.T) % modulus, a.T ]), ModularLinearAlgebra.identity(n_cols + 1, modulus) ]),
+            modulus
+        )
+        kernel = [ i for i, c in enumerate(pivots) if c >= n_rows ]
+        # in the Howell form, the first null vector has the gcd of all t
+        if len(kernel) == 0 or pivots[kernel[0]] != n_rows or form[kernel[0], n_rows] != 1 % modulus:
+            raise ValueError('the linear equations have no solution')
+        x = form[kernel[0], n_rows + 1:]
+        return x, form[kernel[1:], n_rows + 1:]
+
+# --- end of file --- #
@@ -0,0 +1,516 @@
+# file: modular_sqrt.py
+
+# Modular Square Root
+# - Ref: https://en.wikipedia.org/wiki/Quadratic_residue#Prime_or_prime_power_modulus
+#
+# Tonelli-Shanks Algorithm
+# - Ref: https://en.wikipedia.org/wiki/Tonelli%E2%80%93Shanks_algorithm
+#
+# Cipolla's Algorithm
+# - Ref: https://en.wikipedia.org/wiki/Cipolla%27s_algorithm
+#
+# Square Roots for p = 3 mod 4 and p = 5 mod 8 (Atkin's method)
+# - Ref: https://www.rieselprime.de/ziki/Modular_square_root
+# - Ref: A. O. L. Atkin, Probabilistic primality testing (1992)
+#
+# Hensel's Lemma (square roots modulo prime powers)
+# - Ref: https://en.wikipedia.org/wiki/Hensel%27s_lemma
+# - Ref: https://en.wikipedia.org/wiki/Quadratic_residue#Prime_power_modulus
+
+from collections import OrderedDict
+from ctf_library.math.chinese_remainder_theorem import ChineseRemainderTheorem
+from ctf_library.math.factorization import Factorization
+
+class ModularSqrt:
+    '''
+    Modular Square Root
+
+    Finds r where r * r = n mod p for a prime p, choosing the method from p:
+    (a) p = 3 mod 4: r = n ^ ((p + 1) / 4),
+    (b) p = 5 mod 8: Atkin's formula,
+    (c) p = 1 mod 8: Tonelli-Shanks, or Cipolla's algorithm when p - 1 is
+        divisible by a large power of two.
+
+    The decomposition p - 1 = q * 2 ^ s and a quadratic non-residue of p are
+    kept in a cache for each prime, so taking many roots modulo the same
+    prime (see mod_sqrt_many) computes them only once.
+
+    Every root is checked before it is returned, so a modulus that is not
+    a prime gives no root rather than a wrong one.
+
+    The roots modulo a prime power are lifted from the roots modulo the
+    prime with Hensel's lemma, and the roots modulo a composite number are
+    combined from the roots modulo its prime powers with the Chinese
+    Remainder Theorem. A composite modulus can have many roots (2 ^ k or
+    more for k distinct prime factors), so they can be generated one at a
+    time.
+    '''
+
+    # The prime contexts are kept in a least recently used (LRU) cache of this size.
+    prime_cache_size = 1024
+    _prime_cache = OrderedDict()
+
+    class PrimeContext:
+        '''
+        The values for a prime p that do not depend on the number whose
+        square root is taken.
+        '''
+
+        def __init__(self, p):
+            self.p = p
+            # p - 1 = q * 2 ^ s with q odd
+            q, s = p - 1, 0
+            while q > 0 and q % 2 == 0:
+                q //= 2
+                s += 1
+            self.q = q
+            self.s = s
+            # the non-residue z and c = z ^ q are only needed for p = 1 mod 8
+            self.z = None
+            self.c = None
+            self.z_searched = False
+            if p % 8 == 1:
+                self.z = ModularSqrt.find_non_residue(p)
+                self.z_searched = True
+                if self.z is not None:
+                    self.c = pow(self.z, q, p)
+            return
+
+    # ----- Main Entry ----- #
+
+    @staticmethod
+    def mod_sqrt(n, p):
+        '''
+        Find the square roots of n modulo a prime p.
+
+        :param n: the number
+        :type n: int
+        :param p: a prime
+        :type p: int
+
+        :return: [ r, p - r ] with r < p - r when n is a non-zero quadratic
+            residue; [ 0 ] when n = 0 mod p; [] when n has no square root
+        :rtype: list
+        '''
+        return ModularSqrt.roots_from_one(ModularSqrt.sqrt_mod_prime(n, p), p)
+
+    @staticmethod
+    def mod_sqrt_many(values, p):
+        '''
+        Find the square roots of each of the numbers modulo a prime p.
+
+        :param values: the numbers
+        :type values: iterable of int
+        :param p: a prime
+        :type p: int
+
+        :return: a list with the result of mod_sqrt() for each number
+        :rtype: list
+        '''
+        context = ModularSqrt.prime_context(p)
+        return [
+            ModularSqrt.roots_from_one(ModularSqrt.sqrt_mod_prime(n, p, context=context), p)
+            for n in values
+        ]
+
+    @staticmethod
+    def sqrt_mod_prime(n, p, context=None):
+        '''
+        Find one square root of n modulo a prime p.
+
+        :param n: the number
+        :type n: int
+        :param p: a prime
+        :type p: int
+        :param context: the cached values for p; looked up if None
+        :type context: ModularSqrt.PrimeContext, optional
+
+        :return: r where r * r = n mod p, or None if there is no such r
+        :rtype: int
+        '''
+        if p < 2:
+            raise ValueError(f'modulus must be a prime: {p}')
+        n = n % p
+        if n == 0 or p == 2:
+            return n
+        if p % 4 == 3:
+            r = pow(n, (p + 1) // 4, p)
+        elif p % 8 == 5:
+            r = ModularSqrt.sqrt_atkin(n, p)
+        else:
+            if context is None:
+                context = ModularSqrt.prime_context(p)
+            if context.z is None:
+                # p is not a prime
+                return None
+            if context.s * context.s > ModularSqrt.cipolla_factor * p.bit_length():
+                r = ModularSqrt.sqrt_cipolla(n, p)
+            else:
+                r = ModularSqrt.sqrt_tonelli_shanks(n, context)
+        if r is None or r * r % p != n:
+            return None
+        return r
+
+    @staticmethod
+    def roots_from_one(r, p):
+        '''
+        Return the list of square roots from one square root.
+
+        :meta private:
+        '''
+        if r is None:
+            return []
+        if r == 0 or r + r == p:
+            return [ r ]
+        return sorted([ r, p - r ])
+
+    # ----- Prime Powers and Composite Moduli ----- #
+
+    @staticmethod
+    def mod_sqrt_prime_power(n, p, k):
+        '''
+        Find all the square roots of n modulo p ^ k.
+
+        :param n: the number
+        :type n: int
+        :param p: a prime
+        :type p: int
+        :param k: a positive exponent
+        :type k: int
+
+        :return: the sorted list of r in [0, p ^ k) with r * r = n mod p ^ k
+        :rtype: list
+        '''
+        return sorted(ModularSqrt.iter_mod_sqrt_prime_power(n, p, k))
+
+    @staticmethod
+    def iter_mod_sqrt_prime_power(n, p, k):
+        '''
+        Generate the square roots of n modulo p ^ k, in no particular order.
+
+        When p divides n, n = p ^ (2 * a) * m with m not divisible by p has
+        the roots p ^ a * y, where y * y = m mod p ^ (k - 2 * a), and each y
+        gives p ^ a roots modulo p ^ k.
+
+        :param n: the number
+        :type n: int
+        :param p: a prime
+        :type p: int
+        :param k: a positive exponent
+        :type k: int
+
+        :return: a generator of the roots
+        :rtype: generator
+        '''
+        if k < 1:
+            raise ValueError(f'exponent must be positive: {k}')
+        modulus = p ** k
+        n = n % modulus
+        if n == 0:
+            # r * r = 0 mod p ^ k when p ^ ceil(k / 2) divides r
+            step = p ** ((k + 1) // 2)
+            yield from range(0, modulus, step)
+            return
+        v = 0
+        while n % p == 0:
+            n //= p
+            v += 1
+        if v % 2 == 1:
+            return
+        a = v // 2
+        j = k - v
+        pa = p ** a
+        # the roots y of m modulo p ^ j, and y + t * p ^ j modulo p ^ (k - a)
+        step = p ** j
+        count = pa
+        for y in ModularSqrt.hensel_roots(n, p, j):
+            for t in range(count):
+                yield (y + t * step) * pa
+
+    @staticmethod
+    def hensel_roots(n, p, k):
+        '''
+        Find the square roots of n modulo p ^ k, where p does not divide n.
+
+        :meta private:
+        :param n: a number not divisible by p
+        :type n: int
+        :param p: a prime
+        :type p: int
+        :param k: a positive exponent
+        :type k: int
+
+        :return: the list of roots, which has 0, 1, 2 or 4 elements
+        :rtype: list
+        '''
+        modulus = p ** k
+        if p == 2:
+            # an odd square is 1 mod 8, and has 4 roots modulo 2 ^ k for k >= 3
+            if k == 1:
+                return [ 1 ]
+            if k == 2:
+                return [ 1, 3 ] if n % 4 == 1 else []
+            if n % 8 != 1:
+                return []
+            r = 1
+            for i in range(3, k):
+                # r * r = n mod 2 ^ i; fix bit i - 1 of r to make it hold mod 2 ^ (i + 1)
+                if (r * r - n) % (1 << (i + 1)) != 0:
+                    r += 1 << (i - 1)
+            half = modulus // 2
+            return [ r, modulus - r, (r + half) % modulus, (modulus - r + half) % modulus ]
+        r = ModularSqrt.sqrt_mod_prime(n, p)
+        if r is None:
+            return []
+        # Newton's step r = r - (r * r - n) / (2 * r) doubles the number of
+        # correct digits in base p
+        precision = 1
+        while precision < k:
+            precision = min(2 * precision, k)
+            q = p ** precision
+            r = (r - (r * r - n) * pow(2 * r, -1, q)) % q
+        return [ r, modulus - r ]
+
+    @staticmethod
+    def mod_sqrt_composite(n, modulus, factorization=None):
+        '''
+        Find all the square roots of n modulo any positive modulus.
+
+        :param n: the number
+        :type n: int
+        :param modulus: the modulus
+        :type modulus: int
+        :param factorization: the prime factorization of the modulus, as a
+            dictionary; found with Factorization.factorint() if None
+        :type factorization: dict, optional
+
+        :return: the sorted list of r in [0, modulus) with r * r = n mod modulus
+        :rtype: list
+        '''
+        return sorted(ModularSqrt.iter_mod_sqrt_composite(n, modulus, factorization=factorization))
+
+    @staticmethod
+    def iter_mod_sqrt_composite(n, modulus, factorization=None):
+        '''
+        Generate the square roots of n modulo any positive modulus, in no
+        particular order, without keeping all of them in memory.
+
+        :param n: the number
+        :type n: int
+        :param modulus: the modulus
+        :type modulus: int
+        :param factorization: the prime factorization of the modulus, as a
+            dictionary; found with Factorization.factorint() if None
+        :type factorization: dict, optional
+
+        :return: a generator of the roots
+        :rtype: generator
+        '''
+        if modulus < 1:
+            raise ValueError(f'modulus must be positive: {modulus}')
+        if modulus == 1:
+            yield 0
+            return
+        if factorization is None:
+            factorization = Factorization.factorint(modulus)
+        prime_powers = sorted(factorization.items())
+        # check every prime power first, so that no roots are generated
+        # when some prime power has none
+        for p, k in prime_powers:
+            if next(ModularSqrt.iter_mod_sqrt_prime_power(n, p, k), None) is None:
+                return
+        # x = sum of r_i * e_i mod modulus, where e_i = 1 mod p_i ^ k_i and
+        # e_i = 0 modulo the other prime powers
+        basis = []
+        for p, k in prime_powers:
+            q = p ** k
+            e, _ = ChineseRemainderTheorem.solve([ (1, q), (0, modulus // q) ])
+            basis.append((p, k, e))
+
+        def combine(i, partial):
+            if i == len(basis):
+                yield partial
+                return
+            p, k, e = basis[i]
+            for r in ModularSqrt.iter_mod_sqrt_prime_power(n, p, k):
+                yield from combine(i + 1, (partial + r * e) % modulus)
+
+        yield from combine(0, 0)
+
+    # ----- Prime Context Cache ----- #
+
+    @staticmethod
+    def prime_context(p):
+        '''
+        Return the cached values for a prime p.
+
+        :meta private:
+        :param p: a prime
+        :type p: int
+
+        :return: the values for p
+        :rtype: ModularSqrt.PrimeContext
+        '''
+        cache = ModularSqrt._prime_cache
+        context = cache.get(p)
+        if context is not None:
+            cache.move_to_end(p)
+        else:
+            context = ModularSqrt.PrimeContext(p)
+            cache[p] = context
+            while len(cache) > ModularSqrt.prime_cache_size:
+                cache.popitem(last=False)
+        return context
+
+    @staticmethod
+    def clear_prime_cache():
+        '''
+        Remove all the cached values.
+        '''
+        ModularSqrt._prime_cache.clear()
+        return
+
+    @staticmethod
+    def find_non_residue(p):
+        '''
+        Find the smallest quadratic non-residue of an odd prime p.
+
+        :meta private:
+        :param p: an odd prime
+        :type p: int
+
+        :return: the smallest z with z ^ ((p - 1) / 2) = -1 mod p, or None if
+            there is none (p is not a prime)
+        :rtype: int
+        '''
+        e = (p - 1) // 2
+        # the smallest non-residue is below 2 * (ln p) ^ 2 under the
+        # generalized Riemann hypothesis, and bit_length > ln p
+        bits = p.bit_length()
+        for z in range(2, min(p, 2 * bits * bits + 2)):
+            if pow(z, e, p) == p - 1:
+                return z
+        return None
+
+    @staticmethod
+    def find_non_residue_cached(p):
+        '''
+        Find the smallest quadratic non-residue of an odd prime p, keeping
+        it in the cache for p.
+
+        :meta private:
+        :param p: an odd prime
+        :type p: int
+
+        :return: the smallest quadratic non-residue, or None if there is none
+        :rtype: int
+        '''
+        context = ModularSqrt.prime_context(p)
+        if context.z is None and not context.z_searched:
+            context.z = ModularSqrt.find_non_residue(p)
+            context.z_searched = True
+        return context.z
+
+    # ----- Square Root Algorithms ----- #
+
+    cipolla_factor = 8
+    '''
+    Cipolla's algorithm is used instead of Tonelli-Shanks when s * s is
+    greater than this factor times the bit length of p, where 2 ^ s is the
+    largest power of two that divides p - 1. Tonelli-Shanks takes up to
+    s * s / 2 multiplications, and Cipolla's algorithm a fixed number of
+    multiplications for each bit of p.
+    '''
+
+    @staticmethod
+    def sqrt_atkin(n, p):
+        '''
+        Find a square root of n modulo a prime p = 5 mod 8 with Atkin's formula.
+
+        :meta private:
+        :param n: a quadratic residue modulo p
+        :type n: int
+        :param p: a prime with p = 5 mod 8
+        :type p: int
+
+        :return: a candidate square root, to be checked by the caller
+        :rtype: int
+        '''
+        v = pow(2 * n, (p - 5) // 8, p)
+        i = 2 * n * v * v % p
+        return n * v * (i - 1) % p
+
+    @staticmethod
+    def sqrt_tonelli_shanks(n, context):
+        '''
+        Find a square root of n modulo a prime with the Tonelli-Shanks algorithm.
+
+        :meta private:
+        :param n: a number with 0 < n < p
+        :type n: int
+        :param context: the cached values for p
+        :type context: ModularSqrt.PrimeContext
+
+        :return: a square root of n, or None if n is not a quadratic residue
+        :rtype: int
+        '''
+        p = context.p
+        m = context.s
+        c = context.c
+        t = pow(n, context.q, p)
+        r = pow(n, (context.q + 1) // 2, p)
+        while t != 1:
+            # find the least i with t ^ (2 ^ i) = 1 by repeated squaring
+            i, t2 = 0, t
+            while t2 != 1:
+                t2 = t2 * t2 % p
+                i += 1
+                if i == m:
+                    # n is not a quadratic residue
+                    return None
+            b = c
+            for _ in range(m - i - 1):
+                b = b * b % p
+            m = i
+            c = b * b % p
+            t = t * c % p
+            r = r * b % p
+        return r
+
+    @staticmethod
+    def sqrt_cipolla(n, p):
+        '''
+        Find a square root of n modulo a prime with Cipolla's algorithm.
+
+        :meta private:
+        :param n: a number with 0 < n < p
+        :type n: int
+        :param p: an odd prime
+        :type p: int
+
+        :return: a candidate square root, to be checked by the caller; None
+            if n is not a quadratic residue
+        :rtype: int
+        '''
+        e = (p - 1) // 2
+        if pow(n, e, p) != 1:
+            return None
+        # find a where a * a - n is a quadratic non-residue
+        a = 1
+        while True:
+            w = (a * a - n) % p
+            if pow(w, e, p) == p - 1:
+                break
+            a += 1
+        # compute (a + sqrt(w)) ^ ((p + 1) / 2) in F(p ^ 2), as x + y * sqrt(w)
+        x, y = 1, 0
+        bx, by = a, 1
+        k = (p + 1) // 2
+        while k > 0:
+            if k & 1:
+                x, y = (x * bx + y * by % p * w) % p, (x * by + y * bx) % p
+            bx, by = (bx * bx + by * by % p * w) % p, 2 * bx * by % p
+            k >>= 1
+        return x
+
+# --- end of file --- #
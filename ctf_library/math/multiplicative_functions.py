@@ -0,0 +1,206 @@
+# file: multiplicative_functions.py
+
+# Multiplicative Functions
+# - Ref: https://en.wikipedia.org/wiki/Multiplicative_function
+#
+# Euler's Totient Function
+# - Ref: https://en.wikipedia.org/wiki/Euler%27s_totient_function
+#
+# Carmichael Lambda Function
+# - Ref: https://en.wikipedia.org/wiki/Carmichael_function
+#
+# Mobius Function
+# - Ref: https://en.wikipedia.org/wiki/M%C3%B6bius_function
+#
+# Prime Omega Functions
+# - Ref: https://en.wikipedia.org/wiki/Prime_omega_function
+
+import math
+import numpy as np
+from ctf_library.math.divisors import Divisors
+from ctf_library.math.prime_sieve import PrimeSieve
+
+class MultiplicativeFunctions:
+    '''
+    Multiplicative Functions from the Prime Factorization
+
+    The functions for a single number take its prime factorization as a
+    dictionary mapping each prime factor to its exponent, such as the result
+    of Factorization.factorint(), so that several functions can be computed
+    from one factorization.
+
+    The table functions compute a function for all numbers from 0 to a limit
+    with a sieve, as a numpy array of int64. The entry for 0 is 0.
+    '''
+
+    # ----- Functions on a Factorization ----- #
+
+    @staticmethod
+    def euler_phi(factorization):
+        '''
+        Euler's totient function phi(n).
+
+        :param factorization: the prime factorization of n
+        :type factorization: dict
+
+        :return: the number of integers in 1 to n that are coprime to n
+        :rtype: int
+        '''
+        result = 1
+        for p, e in factorization.items():
+            result *= p ** (e - 1) * (p - 1)
+        return result
+
+    @staticmethod
+    def carmichael_lambda(factorization):
+        '''
+        Carmichael lambda function lambda(n).
+
+        :param factorization: the prime factorization of n
+        :type factorization: dict
+
+        :return: the smallest m such that a ** m = 1 mod n for all a coprime to n
+        :rtype: int
+        '''
+        result = 1
+        for p, e in factorization.items():
+            result = math.lcm(result, MultiplicativeFunctions.carmichael_lambda_prime_power(p, e))
+        return result
+
+    @staticmethod
+    def carmichael_lambda_prime_power(p, e):
+        '''
+        Carmichael lambda function of the prime power p ** e.
+
+        :meta private:
+        :param p: a prime
+        :type p: int
+        :param e: a positive exponent
+        :type e: int
+
+        :return: lambda(p ** e)
+        :rtype: int
+        '''
+        if p == 2 and e >= 3:
+            return 1 << (e - 2)
+        return p ** (e - 1) * (p - 1)
+
+    @staticmethod
+    def sigma(factorization, k=1):
+        '''
+        Divisor function sigma_k(n), the sum of the k-th powers of the divisors.
+
+        :param factorization: the prime factorization of n
+        :type factorization: dict
+        :param k: the power of the divisors
+        :type k: int, optional
+
+        :return: sigma_k(n)
+        :rtype: int
+        '''
+        return Divisors.sum(factorization, k=k)
+
+    @staticmethod
+    def mobius(factorization):
+        '''
+        Mobius function mu(n).
+
+        :param factorization: the prime factorization of n
+        :type factorization: dict
+
+        :return: 0 if n has a squared prime factor; otherwise 1 or -1 for an
+            even or odd number of prime factors
+        :rtype: int
+        '''
+        for e in factorization.values():
+            if e > 1:
+                return 0
+        return -1 if len(factorization) % 2 == 1 else 1
+
+    @staticmethod
+    def omega(factorization):
+        '''
+        Prime omega function omega(n), the number of distinct prime factors.
+
+        :param factorization: the prime factorization of n
+        :type factorization: dict
+
+        :return: omega(n)
+        :rtype: int
+        '''
+        return len(factorization)
+
+    @staticmethod
+    def big_omega(factorization):
+        '''
+        Prime omega function Omega(n), the number of prime factors counted
+        with multiplicity.
+
+        :param factorization: the prime factorization of n
+        :type factorization: dict
+
+        :return: Omega(n)
+        :rtype: int
+        '''
+        return sum(factorization.values())
+
+    # ----- Tables ----- #
+
+    @staticmethod
+    def euler_phi_table(limit):
+        '''
+        Euler's totient function for all numbers from 0 to limit.
+
+        :param limit: the largest number in the table
+        :type limit: int
+
+        :return: the table, where table[n] = phi(n)
+        :rtype: numpy array
+        '''
+        table = np.arange(limit + 1, dtype=np.int64)
+        for p in PrimeSieve.shared().primes_up_to(limit):
+            table[p::p] -= table[p::p] // p
+        return table
+
+    @staticmethod
+    def carmichael_lambda_table(limit):
+        '''
+        Carmichael lambda function for all numbers from 0 to limit.
+
+        :param limit: the largest number in the table
+        :type limit: int
+
+        :return: the table, where table[n] = lambda(n)
+        :rtype: numpy array
+        '''
+        table = np.ones(limit + 1, dtype=np.int64)
+        table[0] = 0
+        for p in PrimeSieve.shared().primes_up_to(limit):
+            # lambda(p ** e) is a multiple of lambda(p ** (e - 1)), so taking
+            # the lcm with every prime power that divides n gives lambda(n)
+            q, e = p, 1
+            while q <= limit:
+                value = MultiplicativeFunctions.carmichael_lambda_prime_power(p, e)
+                table[q::q] = np.lcm(table[q::q], value)
+                q, e = q * p, e + 1
+        return table
+
+    @staticmethod
+    def mobius_table(limit):
+        '''
+        Mobius function for all numbers from 0 to limit.
+
+        :param limit: the largest number in the table
+        :type limit: int
+
+        :return: the table, where table[n] = mu(n)
+        :rtype: numpy array
+        '''
+        table = np.ones(limit + 1, dtype=np.int64)
+        table[0] = 0
+        for p in PrimeSieve.shared().primes_up_to(limit):
+            table[p::p] *= -1
+            table[p * p::p * p] = 0
+        return table
+
+# --- end of file --- #
@@ -0,0 +1,288 @@
+# file: primality.py
+
+# Primality Test
+# - Ref: https://en.wikipedia.org/wiki/Primality_test
+#
+# Miller-Rabin Primality Test
+# - Ref: https://en.wikipedia.org/wiki/Miller%E2%80%93Rabin_primality_test
+# - Deterministic bases: https://oeis.org/A014233
+#
+# Baillie-PSW Primality Test
+# - Ref: https://en.wikipedia.org/wiki/Baillie%E2%80%93PSW_primality_test
+# - Ref: https://en.wikipedia.org/wiki/Lucas_pseudoprime#Strong_Lucas_pseudoprimes
+#
+# Jacobi Symbol
+# - Ref: https://en.wikipedia.org/wiki/Jacobi_symbol
+
+import math
+from ctf_library.math.mathlib import MathLib
+from ctf_library.math.prime_sieve import PrimeSieve
+
+class Primality:
+    '''
+    Primality Testing
+
+    Implements the following tests:
+    (a) trial division by small primes,
+    (b) deterministic Miller-Rabin test for n below 3.3 * 10 ** 24,
+    (c) Baillie-PSW test for larger n (no counterexample is known).
+    '''
+
+    small_prime_limit = 1000
+    '''
+    Numbers are first checked against the primes up to this limit.
+    '''
+
+    # Smallest set of Miller-Rabin bases that is deterministic below each bound
+    # - [ <bound>, <bases> ]
+    miller_rabin_deterministic_bases = [
+        [ 2047, [ 2 ] ],
+        [ 1373653, [ 2, 3 ] ],
+        [ 25326001, [ 2, 3, 5 ] ],
+        [ 3215031751, [ 2, 3, 5, 7 ] ],
+        [ 2152302898747, [ 2, 3, 5, 7, 11 ] ],
+        [ 3474749660383, [ 2, 3, 5, 7, 11, 13 ] ],
+        [ 341550071728321, [ 2, 3, 5, 7, 11, 13, 17 ] ],
+        [ 3825123056546413051, [ 2, 3, 5, 7, 11, 13, 17, 19, 23 ] ],
+        [ 318665857834031151167461, [ 2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37 ] ],
+        [ 3317044064679887385961981, [ 2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41 ] ],
+    ]
+
+    _small_primes = None
+    _small_prime_product = None
+
+    # ----- Main Entry ----- #
+
+    @staticmethod
+    def is_prime(n):
+        '''
+        Check if n is a prime.
+
+        The result is exact for n below 3.3 * 10 ** 24. Larger n are checked
+        with the Baillie-PSW test.
+
+        :param n: the number to check
+        :type n: int
+
+        :return: True if n is a prime
+        :rtype: bool
+        '''
+        if n < 2:
+            return False
+        sieve = PrimeSieve.shared()
+        if n <= sieve.limit:
+            return sieve.is_prime(n)
+        for p in Primality.small_primes():
+            if n % p == 0:
+                return False
+        return Primality.is_prime_no_small_factor(n)
+
+    @staticmethod
+    def is_prime_many(numbers):
+        '''
+        Check if each of the given numbers is a prime.
+
+        The small prime factors are found for the whole batch with one gcd
+        per number against the product of all the small primes.
+
+        :param numbers: the numbers to check
+        :type numbers: iterable of int
+
+        :return: a list of True or False, one for each number
+        :rtype: list
+        '''
+        sieve = PrimeSieve.shared()
+        small_prime_product = Primality.small_prime_product()
+        result = []
+        for n in numbers:
+            if n < 2:
+                result.append(False)
+            elif n <= sieve.limit:
+                result.append(sieve.is_prime(n))
+            elif math.gcd(n, small_prime_product) != 1:
+                result.append(False)
+            else:
+                result.append(Primality.is_prime_no_small_factor(n))
+        return result
+
+    @staticmethod
+    def is_prime_no_small_factor(n):
+        '''
+        Check if n is a prime, where n has no prime factor up to small_prime_limit.
+
+        :meta private:
+        :param n: the number to check
+        :type n: int
+
+        :return: True if n is a prime
+        :rtype: bool
+        '''
+        if n < Primality.small_prime_limit * Primality.small_prime_limit:
+            return True
+        for bound, bases in Primality.miller_rabin_deterministic_bases:
+            if n < bound:
+                return Primality.miller_rabin(n, bases)
+        return Primality.baillie_psw(n)
+
+    @staticmethod
+    def small_primes():
+        '''
+        Return the list of primes up to small_prime_limit.
+
+        :meta private:
+        :return: the small primes
+        :rtype: list
+        '''
+        if Primality._small_primes is None:
+            Primality._small_primes = PrimeSieve.shared().primes_up_to(Primality.small_prime_limit)
+        return Primality._small_primes
+
+    @staticmethod
+    def small_prime_product():
+        '''
+        Return the product of the primes up to small_prime_limit.
+
+        :meta private:
+        :return: the product of the small primes
+        :rtype: int
+        '''
+        if Primality._small_prime_product is None:
+            Primality._small_prime_product = math.prod(Primality.small_primes())
+        return Primality._small_prime_product
+
+    # ----- Miller-Rabin ----- #
+
+    @staticmethod
+    def miller_rabin(n, bases):
+        '''
+        Check if n is a strong probable prime to all the given bases.
+
+        :param n: an odd number greater than 2
+        :type n: int
+        :param bases: the bases to test
+        :type bases: list of int
+
+        :return: False if n is composite; True if n is a strong probable
+            prime to all the bases
+        :rtype: bool
+        '''
+        d, s = n - 1, 0
+        while d % 2 == 0:
+            d //= 2
+            s += 1
+        for a in bases:
+            a = a % n
+            if a == 0:
+                continue
+            x = pow(a, d, n)
+            if x == 1 or x == n - 1:
+                continue
+            for _ in range(s - 1):
+                x = x * x % n
+                if x == n - 1:
+                    break
+            else:
+                return False
+        return True
+
+    # ----- Baillie-PSW ----- #
+
+    @staticmethod
+    def baillie_psw(n):
+        '''
+        Check if n is a prime using the Baillie-PSW test, which is a
+        Miller-Rabin test to base 2 followed by a strong Lucas test.
+
+        :param n: an odd number with no small prime factors
+        :type n: int
+
+        :return: False if n is composite; True if n is a Baillie-PSW
+            probable prime
+        :rtype: bool
+        '''
+        if not Primality.miller_rabin(n, [ 2 ]):
+            return False
+        return Primality.strong_lucas_probable_prime(n)
+
+    @staticmethod
+    def jacobi_symbol(a, n):
+        '''
+        Compute the Jacobi symbol (a / n).
+
+        :param a: the numerator
+        :type a: int
+        :param n: a positive odd number
+        :type n: int
+
+        :return: -1, 0 or 1
+        :rtype: int
+        '''
+        if n <= 0 or n % 2 == 0:
+            raise ValueError(f'jacobi symbol not defined for n = {n}')
+        a = a % n
+        result = 1
+        while a != 0:
+            while a % 2 == 0:
+                a //= 2
+                if n % 8 in (3, 5):
+                    result = -result
+            a, n = n, a
+            if a % 4 == 3 and n % 4 == 3:
+                result = -result
+            a = a % n
+        return result if n == 1 else 0
+
+    @staticmethod
+    def strong_lucas_probable_prime(n):
+        '''
+        Check if n is a strong Lucas probable prime, with the parameters
+        (D, P, Q) chosen by Selfridge's method A.
+
+        :param n: an odd number that is not a perfect square
+        :type n: int
+
+        :return: False if n is composite; True if n is a strong Lucas
+            probable prime
+        :rtype: bool
+        '''
+        # a perfect square would never find a D with jacobi symbol -1
+        if MathLib.isqrt(n) ** 2 == n:
+            return False
+
+        # find the first D in 5, -7, 9, -11, ... with (D / n) = -1
+        d = 5
+        while True:
+            j = Primality.jacobi_symbol(d, n)
+            if j == -1:
+                break
+            if j == 0 and abs(d) != n:
+                return False
+            d = -d - 2 if d > 0 else -d + 2
+        p, q = 1, (1 - d) // 4
+
+        # n + 1 = k * 2 ^ s with k odd
+        k, s = n + 1, 0
+        while k % 2 == 0:
+            k //= 2
+            s += 1
+
+        # compute U(k), V(k) and Q ^ k with the binary method, from the top bit
+        inv_2 = (n + 1) // 2
+        u, v, qk = 1, p, q % n
+        for bit in bin(k)[3:]:
+            u, v = u * v % n, (v * v - 2 * qk) % n
+            qk = qk * qk % n
+            if bit == '1':
+                u, v = (p * u + v) * inv_2 % n, (d * u + p * v) * inv_2 % n
+                qk = qk * q % n
+
+        if u == 0 or v == 0:
+            return True
+        for _ in range(s - 1):
+            v = (v * v - 2 * qk) % n
+            qk = qk * qk % n
+            if v == 0:
+                return True
+        return False
+
+# --- end of file --- #
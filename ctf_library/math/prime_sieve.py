@@ -0,0 +1,292 @@
+# file: prime_sieve.py
+
+# Sieve of Eratosthenes
+# - Ref: https://en.wikipedia.org/wiki/Sieve_of_Eratosthenes
+# - Ref: https://cp-algorithms.com/algebra/sieve-of-eratosthenes.html
+#
+# Segmented Sieve
+# - Ref: https://cp-algorithms.com/algebra/sieve-of-eratosthenes.html#segmented-sieve
+#
+# Smallest Prime Factor (SPF) Table
+# - Ref: https://cp-algorithms.com/algebra/prime-sieve-linear.html
+
+import array
+import bisect
+import itertools
+import math
+import mmap
+import sys
+
+class PrimeSieve:
+    '''
+    A lazily-grown table of primes and smallest prime factors.
+
+    The table covers the integers 0 to limit (inclusive) and is extended
+    segment by segment when a larger limit is requested. Once the table
+    covers a number n, the prime factorization of n is found by repeated
+    lookups of the smallest prime factor, in O(log n) steps.
+
+    The smallest prime factor of a composite n never exceeds sqrt(n), so for
+    a table below 2 ** 32 every entry fits in an unsigned 16-bit integer.
+    Primes are stored as 0 in the table.
+    '''
+
+    default_limit = 1 << 16
+    '''
+    The initial limit of a new table.
+    '''
+
+    segment_size = 1 << 18
+    '''
+    The number of integers sieved in one segment when the table grows.
+    '''
+
+    max_limit = (1 << 32) - 1
+    '''
+    The largest limit supported by the 16-bit table.
+    '''
+
+    file_magic = b'CTFSPF01'
+    '''
+    The magic bytes at the start of a saved table.
+    '''
+
+    _shared = None
+
+    def __init__(self, limit=default_limit):
+        # spf[n] is the smallest prime factor of a composite n, or 0 if n is prime
+        # (or n < 2); primes is the sorted list of all primes up to the limit.
+        self.spf = array.array('H', [0, 0])
+        self.primes = []
+        self.limit = 1
+        self.extend(limit)
+        return
+
+    @classmethod
+    def shared(cls):
+        '''
+        Return the table shared by the whole library, creating it when needed.
+
+        :return: the shared table
+        :rtype: PrimeSieve
+        '''
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    # ----- Growing the Table ----- #
+
+    def extend(self, limit):
+        '''
+        Grow the table so that it covers all integers up to limit.
+
+        :param limit: the new limit of the table
+        :type limit: int
+
+        :raise: ValueError if limit is above max_limit
+
+        :return: the table itself
+        :rtype: PrimeSieve
+        '''
+        if limit <= self.limit:
+            return self
+        if limit > PrimeSieve.max_limit:
+            raise ValueError(f'limit too large for the table: {limit} > {PrimeSieve.max_limit}')
+        if not isinstance(self.spf, array.array):
+            # a table loaded with mmap is read-only, so copy it before growing it
+            self.spf = array.array('H', self.spf)
+        while self.limit < limit:
+            low = self.limit + 1
+            high = min(limit, self.limit + PrimeSieve.segment_size)
+            self.sieve_segment(low, high)
+        return self
+
+    def ensure(self, number):
+        '''
+        Grow the table, by doubling, so that it covers number.
+
+        :param number: the number to cover
+        :type number: int
+
+        :return: the table itself
+        :rtype: PrimeSieve
+        '''
+        if number > self.limit:
+            self.extend(min(max(number, 2 * self.limit), PrimeSieve.max_limit))
+        return self
+
+    def sieve_segment(self, low, high):
+        '''
+        Sieve the segment [low, high] and append it to the table.
+
+        The table must already cover all integers below low.
+
+        :meta private:
+        :param low: the first integer in the segment
+        :param high: the last integer in the segment
+        :type low: int
+        :type high: int
+        '''
+        size = high - low + 1
+        segment = array.array('H', bytes(2 * size))
+        is_prime = bytearray(b'\x01') * size
+        root = math.isqrt(high)
+        # the primes up to sqrt(high) are either in the table already, or are in
+        # this segment, in which case they are found while sieving the segment
+        base_primes = self.primes[:bisect.bisect_right(self.primes, root)]
+        if root >= low:
+            base_primes = base_primes + PrimeSieve.simple_sieve(root)[len(base_primes):]
+        # go through the primes from the largest to the smallest so that the
+        # smallest prime factor is the last one written for every multiple
+        for p in reversed(base_primes):
+            start = max(p * p, (low + p - 1) // p * p)
+            if start > high:
+                continue
+            count = (high - start) // p + 1
+            segment[start - low::p] = array.array('H', [p]) * count
+            is_prime[start - low::p] = bytes(count)
+        if low <= 1:
+            # 0 and 1 are not primes
+            is_prime[:2 - low] = bytes(2 - low)
+        self.spf.extend(segment)
+        self.primes.extend(itertools.compress(range(low, high + 1), is_prime))
+        self.limit = high
+        return
+
+    @staticmethod
+    def simple_sieve(limit):
+        '''
+        Return the list of primes up to limit using a plain sieve.
+
+        :meta private:
+        :param limit: the upper limit (inclusive)
+        :type limit: int
+
+        :return: the primes up to limit
+        :rtype: list
+        '''
+        if limit < 2:
+            return []
+        is_prime = bytearray(b'\x01') * (limit + 1)
+        is_prime[0:2] = b'\x00\x00'
+        for p in range(2, math.isqrt(limit) + 1):
+            if is_prime[p]:
+                is_prime[p * p::p] = bytes((limit - p * p) // p + 1)
+        return list(itertools.compress(range(limit + 1), is_prime))
+
+    # ----- Lookups ----- #
+
+    def smallest_prime_factor(self, number):
+        '''
+        Return the smallest prime factor of a number covered by the table.
+
+        :param number: a number between 2 and the limit of the table
+        :type number: int
+
+        :return: the smallest prime factor of number
+        :rtype: int
+        '''
+        spf = self.spf[number]
+        return spf if spf != 0 else number
+
+    def is_prime(self, number):
+        '''
+        Check if a number covered by the table is a prime.
+
+        :param number: a number between 0 and the limit of the table
+        :type number: int
+
+        :return: True if number is a prime
+        :rtype: bool
+        '''
+        return number >= 2 and self.spf[number] == 0
+
+    def factorize(self, number):
+        '''
+        Return the prime factors of a number covered by the table, in
+        ascending order and repeated according to their multiplicity.
+
+        :param number: a number between 1 and the limit of the table
+        :type number: int
+
+        :return: the list of prime factors
+        :rtype: list
+        '''
+        factors = []
+        spf = self.spf
+        while number > 1:
+            p = spf[number]
+            if p == 0:
+                factors.append(number)
+                break
+            factors.append(p)
+            number //= p
+        return factors
+
+    def primes_up_to(self, limit):
+        '''
+        Return the list of primes up to limit, growing the table if needed.
+
+        :param limit: the upper limit (inclusive)
+        :type limit: int
+
+        :return: the primes up to limit
+        :rtype: list
+        '''
+        self.extend(limit)
+        return self.primes[:bisect.bisect_right(self.primes, limit)]
+
+    # ----- Persistence ----- #
+
+    def save(self, filename):
+        '''
+        Save the table to a file, which can be loaded later with load().
+
+        :param filename: the name of the file
+        :type filename: str
+        '''
+        data = array.array('H', self.spf)
+        if sys.byteorder != 'little':
+            data.byteswap()
+        with open(filename, 'wb') as fd:
+            fd.write(PrimeSieve.file_magic)
+            fd.write(self.limit.to_bytes(8, byteorder='little'))
+            data.tofile(fd)
+        return
+
+    @classmethod
+    def load(cls, filename):
+        '''
+        Load a table saved with save().
+
+        The table is mapped into memory with mmap and is not read into memory,
+        so a large table is shared between processes that load the same file.
+        The list of primes is rebuilt from the table.
+
+        :param filename: the name of the file
+        :type filename: str
+
+        :raise: ValueError if the file is not a saved table
+
+        :return: the table
+        :rtype: PrimeSieve
+        '''
+        header_size = len(PrimeSieve.file_magic) + 8
+        with open(filename, 'rb') as fd:
+            mapped = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapped[:len(PrimeSieve.file_magic)] != PrimeSieve.file_magic:
+            mapped.close()
+            raise ValueError(f'not a prime sieve file: {filename}')
+        limit = int.from_bytes(mapped[len(PrimeSieve.file_magic):header_size], byteorder='little')
+        if sys.byteorder == 'little':
+            spf = memoryview(mapped)[header_size:].cast('H')
+        else:
+            spf = array.array('H', mapped[header_size:])
+            spf.byteswap()
+        sieve = cls.__new__(cls)
+        sieve.spf = spf
+        sieve.limit = limit
+        sieve.primes = list(itertools.compress(range(2, limit + 1), map((0).__eq__, spf[2:])))
+        return sieve
+
+# --- end of file --- #
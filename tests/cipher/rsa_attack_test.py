@@ -0,0 +1,104 @@
+# file: rsa_attack_test.py
+
+import json
+import os
+import tempfile
+import unittest
+from ctf_library.cipher.rsa_attack import RSAAttack
+from ctf_library.math.primality import Primality
+
+class RSAAttackTest(unittest.TestCase):
+
+    p = 247783006742674559981423958215936779423
+    q = 256816475875521019462736001544970355701
+
+    def test_hastad_broadcast(self):
+        # m ^ 3 is larger than the product of any two moduli
+        m = (1 << 399) + int.from_bytes(b'attack at dawn', 'big')
+        moduli = [
+            self.next_prime(k << 200) * self.next_prime((k + 100) << 200) for k in [ 1, 2, 3 ]
+        ]
+        ciphertexts = [ pow(m, 3, n) for n in moduli ]
+        self.assertEqual(m, RSAAttack.hastad_broadcast(ciphertexts, moduli))
+        # not enough ciphertexts for a large message
+        with self.assertRaises(ValueError):
+            RSAAttack.hastad_broadcast(ciphertexts[:2], moduli[:2], e=3)
+        return
+
+    def test_common_modulus(self):
+        n = RSAAttackTest.p * RSAAttackTest.q
+        m = 1234567890123456789
+        for e1, e2 in [ (17, 65537), (3, 5), (65537, 257) ]:
+            c1, c2 = pow(m, e1, n), pow(m, e2, n)
+            self.assertEqual(m, RSAAttack.common_modulus(c1, c2, e1, e2, n))
+        # gcd(e1, e2) = 3, and m ^ 3 < n
+        self.assertEqual(m, RSAAttack.common_modulus(pow(m, 3, n), pow(m, 9, n), 3, 9, n))
+        return
+
+    def test_wiener(self):
+        p, q = RSAAttackTest.p, RSAAttackTest.q
+        n = p * q
+        phi = (p - 1) * (q - 1)
+        d = 1000003
+        e = pow(d, -1, phi)
+        self.assertEqual((p, q, d), RSAAttack.wiener(e, n))
+        self.assertIsNone(RSAAttack.wiener(65537, n))
+        # the example from https://en.wikipedia.org/wiki/Wiener%27s_attack
+        self.assertEqual((239, 379, 5), RSAAttack.wiener(17993, 90581))
+        return
+
+    def test_fermat(self):
+        p = self.next_prime(1 << 256)
+        q = self.next_prime(p + 1000)
+        n = p * q
+        p_found, q_found, d = RSAAttack.fermat(65537, n, max_iterations=1000)
+        self.assertEqual((p, q), (p_found, q_found))
+        self.assertEqual(1, 65537 * d % ((p - 1) * (q - 1)))
+        self.assertIsNone(RSAAttack.fermat(65537, RSAAttackTest.p * RSAAttackTest.q, max_iterations=1000))
+        return
+
+    def test_attack_directory(self):
+        p, q = RSAAttackTest.p, RSAAttackTest.q
+        n = p * q
+        phi = (p - 1) * (q - 1)
+        m = int.from_bytes(b'hello', 'big')
+        close_p = self.next_prime(1 << 256)
+        close_q = self.next_prime(close_p + 1000)
+        moduli = [
+            self.next_prime(k << 200) * self.next_prime((k + 100) << 200) for k in [ 1, 2, 3 ]
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'wiener.json'), 'w') as f:
+                json.dump({ 'n': hex(n), 'e': pow(1000003, -1, phi) }, f)
+            with open(os.path.join(directory, 'broadcast.json'), 'w') as f:
+                json.dump([ { 'n': str(k), 'e': 3, 'c': pow(m, 3, k) } for k in moduli ], f)
+            with open(os.path.join(directory, 'common.json'), 'w') as f:
+                json.dump([ { 'n': n, 'e': e, 'c': pow(m, e, n) } for e in [ 17, 65537 ] ], f)
+            try:
+                from Crypto.PublicKey import RSA
+                pem = RSA.construct((close_p * close_q, 65537)).export_key('PEM').decode()
+                with open(os.path.join(directory, 'close.pem'), 'w') as f:
+                    f.write(pem)
+            except ImportError:
+                pem = None
+            for workers in [ None, 2 ]:
+                result = RSAAttack.attack_directory(directory, workers=workers, fermat_max_iterations=1000)
+                found = { (r['attack'], tuple(r['names'])): r for r in result }
+                self.assertEqual(1000003, found[('wiener', ('wiener.json',))]['d'])
+                self.assertEqual(m, found[('hastad', ('broadcast.json[0]', 'broadcast.json[1]', 'broadcast.json[2]'))]['m'])
+                self.assertEqual(m, found[('common_modulus', ('common.json[0]', 'common.json[1]'))]['m'])
+                if pem is not None:
+                    self.assertEqual(close_p, found[('fermat', ('close.pem',))]['p'])
+        return
+
+    # --- Internal Functions
+
+    def next_prime(self, n):
+        while not Primality.is_prime(n):
+            n += 1
+        return n
+
+if __name__ == '__main__':
+    unittest.main()
+
+# --- end of file --- #
@@ -1,8 +1,10 @@
 # file: rsa_demo_test.py
 
 import unittest
+import math
 import random
 from ctf_library.cipher.rsa_demo import RSADemo
+from ctf_library.math.primality import Primality
 
 class RSADemoTest(unittest.TestCase):
 
@@ -78,6 +80,76 @@ class RSADemoTest(unittest.TestCase):
                 print(f'Error: {err.exception}')
         return
     
+    def test_rsa_helper_04(self):
+        # p and q must be primes
+        for p, q in [ [ 61, 51 ], [ 1, 53 ], [ 561, 1105 ] ]:
+            with self.assertRaises(ValueError):
+                RSADemo.Helper.compute_private_key(p, q, 17)
+        new_e, d, n = RSADemo.Helper.compute_private_key(61, 51, 17, check_primes=False)
+        self.assertEqual(61 * 51, n)
+        return
+    
+    def test_rsa_key(self):
+        p, q, e, expected_d, expected_n, _, message_pairs = RSADemoTest.test_cases[0]
+        key = RSADemo.key(p, q, e)
+        self.assertEqual((expected_n, e, expected_d), (key.n, key.e, key.d))
+        self.assertEqual((expected_d % (p - 1), expected_d % (q - 1)), (key.dp, key.dq))
+        self.assertEqual(1, key.q_inv * q % p)
+        rsa = RSADemo(key)
+        for message, encrypted_message in message_pairs:
+            self.assertEqual(message, rsa.decrypt_value(encrypted_message))
+        with self.assertRaises(ValueError):
+            RSADemo.RSADemoKey(3233, 17, p=61, q=51)
+        return
+
+    def test_rsa_encrypt_decrypt(self):
+        for p, q, e, _, _, _, _ in RSADemoTest.test_cases[-1:]:
+            key = RSADemo.key(p, q, e)
+            public_key = RSADemo.RSADemoKey(key.n, key.e)
+            private_key = RSADemo.RSADemoKey(key.n, key.e, d=key.d)
+            for plain_text in [ b'', b'a', b'\x00\x00hello\x00', bytes(range(256)) * 3 ]:
+                cipher_text = RSADemo(public_key).encrypt(plain_text)
+                self.assertEqual(0, len(cipher_text) % key.cipher_block_size())
+                self.assertEqual(plain_text, RSADemo(key).decrypt(cipher_text))
+                self.assertEqual(plain_text, RSADemo(private_key).decrypt(cipher_text))
+            self.assertEqual('RSA 測試'.encode(), RSADemo(key).decrypt(RSADemo(key).encrypt('RSA 測試')))
+            with self.assertRaises(ValueError):
+                RSADemo(public_key).decrypt(cipher_text)
+            with self.assertRaises(ValueError):
+                RSADemo(key).decrypt(cipher_text[1:])
+        # the modulus is too small for a block
+        with self.assertRaises(ValueError):
+            RSADemo(RSADemo.key(61, 53, 17)).encrypt(b'a')
+        return
+
+    def test_rsa_decrypt_many(self):
+        p, q, e, _, _, _, _ = RSADemoTest.test_cases[-1]
+        rsa = RSADemo(RSADemo.key(p, q, e))
+        plain_texts = [ random.randbytes(random.randint(0, 100)) for i in range(20) ]
+        cipher_texts = [ rsa.encrypt(plain_text) for plain_text in plain_texts ]
+        self.assertEqual(plain_texts, rsa.decrypt_many(cipher_texts))
+        self.assertEqual(plain_texts, rsa.decrypt_many(cipher_texts, workers=2, chunk_size=4))
+        return
+
+    def test_rsa_generate_key(self):
+        for bits in [ 16, 17, 64, 512 ]:
+            key = RSADemo.generate_key(bits, seed=bits)
+            self.assertEqual(bits, key.n.bit_length())
+            self.assertTrue(Primality.is_prime(key.p) and Primality.is_prime(key.q))
+            self.assertLess(key.p, key.q)
+            self.assertEqual(1, math.gcd(key.e, (key.p - 1) * (key.q - 1)))
+            self.assertEqual(key.n, RSADemo.generate_key(bits, seed=bits).n)
+            self.do_check_encryption_decryption_random(key.e, key.d, key.n, rounds=10)
+        self.assertNotEqual(RSADemo.generate_key(256).n, RSADemo.generate_key(256).n)
+        # the same keys with and without processes
+        keys = RSADemo.generate_keys(4, 128, e=3, seed='fixtures')
+        self.assertEqual(
+            [ key.n for key in keys ],
+            [ key.n for key in RSADemo.generate_keys(4, 128, e=3, seed='fixtures', workers=2) ]
+        )
+        self.assertEqual(4, len(set(key.n for key in keys)))
+        return
+
     # --- Internal Functions
     
     def do_check_compute_private_key(self, p, q, e, expected_d, expected_n,
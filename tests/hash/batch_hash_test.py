@@ -0,0 +1,64 @@
+# file: batch_hash_test.py
+
+import unittest
+import hashlib
+import numpy as np
+from ctf_library.hash.batch_hash import BatchHash
+from ctf_library.hash.candidate_space import CandidateSpace
+from ctf_library.hash.hash_search_core import HashSearchCore
+
+class BatchHashTest(unittest.TestCase):
+
+    def test_sha256_compress(self):
+        # [ <message> ]
+        test_cases = [ b'', b'abc', b'x' * 55, b'0dQk5dyK0KuOb9a5' + b'abcd' ]
+        for message in test_cases:
+            block = message + b'\x80' + bytes(55 - len(message)) + (8 * len(message)).to_bytes(8, 'big')
+            words = np.frombuffer(block, dtype='>u4').astype(np.uint32).reshape(16, 1)
+            state = BatchHash.sha256_compress(BatchHash.sha256_iv.reshape(8, 1), words)
+            self.assertEqual(hashlib.sha256(message).digest(), state.T.astype('>u4').tobytes())
+        return
+
+    def test_fill_candidates(self):
+        for repeat in [ True, False ]:
+            space = CandidateSpace('abcde', min_length=3, repeat=repeat)
+            out = np.zeros((space.size() - 7, 3), dtype=np.uint8)
+            BatchHash.fill_candidates(space, 3, 7, out)
+            self.assertEqual(b''.join(space.candidates(7)), out.tobytes())
+        return
+
+    def test_search(self):
+        batch_size = BatchHash.batch_size
+        try:
+            BatchHash.batch_size = 100
+            for prefix in [ b'', b'0dQk5dyK0KuOb9a5', b'x' * 70 ]:
+                for suffix in [ b'', b'end' ]:
+                    space = CandidateSpace('abcdefgh', min_length=0, max_length=4)
+                    digests = [ hashlib.sha256(prefix + c + suffix).digest() for c in space.candidates() ]
+                    for backend in [ 'hashlib', 'numpy' ]:
+                        target = HashSearchCore.hex_target('07', 32)
+                        index, hashes = BatchHash.search('sha256', prefix, space, 5, space.size(), target,
+                                                         suffix=suffix, backend=backend)
+                        matches = [ i for i in range(5, space.size()) if digests[i].endswith(b'\x07') ]
+                        self.assertEqual(matches[0], index)
+                        self.assertEqual(index - 5 + 1, hashes)
+                        index, _ = BatchHash.search('sha256', prefix, space, 0, space.size(), lambda d: d[0] == 0x42,
+                                                    suffix=suffix, backend=backend)
+                        self.assertEqual(0x42, digests[index][0])
+            # no match, and stopped after the first batch
+            space = CandidateSpace('abcdefgh', min_length=3)
+            target = HashSearchCore.hex_target('0' * 20, 20)
+            self.assertEqual((None, 512), BatchHash.search('sha1', b'', space, 0, 512, target))
+            self.assertEqual((None, 100), BatchHash.search('sha1', b'', space, 0, 512, target, stopped=lambda: True))
+            with self.assertRaises(ValueError):
+                BatchHash.search('sha1', b'', space, 0, 512, target, backend='numpy')
+            with self.assertRaises(ValueError):
+                BatchHash.search('sha256', b'x' * 60, space, 0, 512, target, backend='numpy')
+        finally:
+            BatchHash.batch_size = batch_size
+        return
+
+if __name__ == '__main__':
+    unittest.main()
+
+# --- end of file --- #
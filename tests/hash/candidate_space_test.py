@@ -0,0 +1,92 @@
+# file: candidate_space_test.py
+
+import unittest
+import itertools
+from ctf_library.hash.candidate_space import CandidateSpace
+
+class CandidateSpaceTest(unittest.TestCase):
+
+    def test_candidate(self):
+        space = CandidateSpace('abc', min_length=0, max_length=3)
+        self.assertEqual(1 + 3 + 9 + 27, space.size())
+        # [ <index>, <expected_result> ]
+        test_cases = [
+            [ 0, b'' ],
+            [ 1, b'a' ],
+            [ 4, b'aa' ],
+            [ 12, b'cc' ],
+            [ 13, b'aaa' ],
+            [ 39, b'ccc' ],
+        ]
+        for index, expected_result in test_cases:
+            self.assertEqual(expected_result, space.candidate(index))
+            self.assertEqual(index, space.index(expected_result))
+        with self.assertRaises(ValueError):
+            space.candidate(40)
+        with self.assertRaises(ValueError):
+            space.index(b'abd')
+        # a large space, without enumerating it
+        space = CandidateSpace(bytes(range(256)), min_length=16)
+        self.assertEqual(256 ** 16, space.size())
+        self.assertEqual((12345678901234567890).to_bytes(16, 'big'), space.candidate(12345678901234567890))
+        with self.assertRaises(ValueError):
+            CandidateSpace('ab', min_length=3, max_length=2)
+        with self.assertRaises(ValueError):
+            CandidateSpace([ 'ab', '' ])
+        return
+
+    def test_multibyte_characters(self):
+        max_block_size = CandidateSpace.max_block_size
+        try:
+            for CandidateSpace.max_block_size in [ 5, 1 << 16 ]:
+                for repeat in [ True, False ]:
+                    space = CandidateSpace('éa€b', min_length=0, max_length=3, repeat=repeat)
+                    if repeat:
+                        expected = [ ''.join(c) for n in range(4) for c in itertools.product('éa€b', repeat=n) ]
+                    else:
+                        expected = [ ''.join(c) for n in range(4) for c in itertools.permutations('éa€b', n) ]
+                    expected = [ c.encode() for c in expected ]
+                    self.assertEqual(expected, list(space.candidates()))
+                    self.assertEqual(expected[7:30], list(space.candidates(7, 30)))
+                    self.assertEqual(expected, [ space.candidate(i) for i in range(space.size()) ])
+                    self.assertEqual(list(range(len(expected))), [ space.index(c) for c in expected ])
+        finally:
+            CandidateSpace.max_block_size = max_block_size
+        return
+
+    def test_candidates(self):
+        max_block_size = CandidateSpace.max_block_size
+        try:
+            # small blocks, so that the ranges cross the heads
+            for CandidateSpace.max_block_size in [ 7, 1 << 16 ]:
+                for repeat in [ True, False ]:
+                    space = CandidateSpace('abcd', min_length=0, max_length=4, repeat=repeat)
+                    if repeat:
+                        expected = [ bytes(c) for n in range(5) for c in itertools.product(b'abcd', repeat=n) ]
+                    else:
+                        expected = [ bytes(c) for n in range(5) for c in itertools.permutations(b'abcd', n) ]
+                    self.assertEqual(len(expected), space.size())
+                    self.assertEqual(expected, list(space.candidates()))
+                    self.assertEqual(expected, [ space.candidate(i) for i in range(space.size()) ])
+                    self.assertEqual(list(range(len(expected))), [ space.index(c) for c in expected ])
+                    for start in range(0, len(expected), 7):
+                        for end in range(start, len(expected) + 3, 11):
+                            self.assertEqual(expected[start:end], list(space.candidates(start, end)))
+        finally:
+            CandidateSpace.max_block_size = max_block_size
+        return
+
+    def test_block_cache(self):
+        CandidateSpace.clear_block_cache()
+        for charset in [ 'ab', 'abc', 'abcd', 'abcde', 'abcdef', 'abcdefg' ]:
+            space = CandidateSpace(charset, min_length=1, max_length=3)
+            self.assertEqual(space.size(), len(list(space.candidates())))
+            self.assertLessEqual(len(CandidateSpace._blocks), CandidateSpace.block_cache_size)
+        CandidateSpace.clear_block_cache()
+        self.assertEqual(0, len(CandidateSpace._blocks))
+        return
+
+if __name__ == '__main__':
+    unittest.main()
+
+# --- end of file --- #
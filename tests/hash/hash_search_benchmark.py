@@ -0,0 +1,72 @@
+# file: hash_search_benchmark.py
+
+# Microbenchmark of the inner loops of the hash searches: the loops of
+# HashSearch before HashSearchCore (a new hash of the whole input and a
+# slice of hexdigest() for each candidate) against the shards of the
+# compiled PowChallenge specs, with each backend: HashSearchCore one
+# candidate at a time, and BatchHash with hashlib or NumPy SHA-256.
+#
+# Usage: python -m tests.hash.hash_search_benchmark [candidates]
+
+import sys
+import time
+import itertools
+from hashlib import sha256
+from ctf_library.hash.hash_search import HashSearch
+from ctf_library.hash.pow_challenge import PowChallenge
+
+# a target that is never found, so that every candidate is hashed
+no_target = 'f' * 20
+
+def htv_2024_reference(prefix, search_target, search_space, result_length, count):
+    search_length = len(search_target)
+    candidates = itertools.islice(itertools.permutations(search_space, result_length), count)
+    for curr_list in candidates:
+        curr_postfix = ''.join(curr_list)
+        curr_bytes = (prefix + curr_postfix).encode()
+        curr_hash = sha256(curr_bytes).hexdigest()[-search_length:]
+        if curr_hash == search_target:
+            return curr_postfix
+    return None
+
+def xmas_ctf_2021_reference(search_target, string_length, count):
+    search_length = len(search_target)
+    for curr_value in range(0, count):
+        curr_bytes = (curr_value).to_bytes(string_length, byteorder='big')
+        curr_hash = sha256(curr_bytes).hexdigest()[-search_length:]
+        if curr_hash == search_target:
+            return curr_bytes.hex()
+    return None
+
+def benchmark(count=1 << 18):
+    prefix = '0dQk5dyK0KuOb9a5'
+    space = HashSearch.printable_characters
+    variants = [
+        [ 'htv_2024 (reference)', lambda: htv_2024_reference(prefix, no_target, space, 4, count) ],
+        [ 'xmas_ctf_2021 (reference)', lambda: xmas_ctf_2021_reference(no_target, 4, count) ],
+    ]
+    for backend in [ 'core', 'hashlib', 'numpy' ]:
+        spec = HashSearch.htv_2024_spec(prefix, no_target, space, 4)
+        spec.backend = backend
+        htv_2024 = PowChallenge.compile(spec)
+        spec = HashSearch.xmas_ctf_2021_spec(no_target, 4)
+        spec.backend = backend
+        xmas_ctf_2021 = PowChallenge.compile(spec)
+        variants.append([ f'htv_2024 ({backend})', lambda engine=htv_2024: engine.search_shard(0, count) ])
+        variants.append([ f'xmas_ctf_2021 ({backend})', lambda engine=xmas_ctf_2021: engine.search_shard(0, count) ])
+    print(f'{"variant":<28} {"hashes/s":>12}')
+    for name, function in variants:
+        start = time.perf_counter()
+        result = function()
+        t = time.perf_counter() - start
+        if isinstance(result, tuple):
+            hashes = result[1]
+        else:
+            hashes = count
+        print(f'{name:<28} {hashes / t:>12.0f}', flush=True)
+    return
+
+if __name__ == '__main__':
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1 << 18)
+
+# --- end of file --- #
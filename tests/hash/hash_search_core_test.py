@@ -0,0 +1,85 @@
+# file: hash_search_core_test.py
+
+import hashlib
+import unittest
+from ctf_library.hash.hash_search_core import HashSearchCore
+
+class HashSearchCoreTest(unittest.TestCase):
+
+    def test_hex_target(self):
+        # [ <search_target>, <position>, <expected_result> ]
+        test_cases = [
+            [ '0000', 'suffix', (30, b'\xff\xff', b'\x00\x00') ],
+            [ 'e709b', 'suffix', (29, b'\x0f\xff\xff', b'\x0e\x70\x9b') ],
+            [ 'e709b', 'prefix', (0, b'\xff\xff\xf0', b'\xe7\x09\xb0') ],
+            [ '', 'suffix', (32, b'', b'') ],
+        ]
+        for search_target, position, expected_result in test_cases:
+            self.assertEqual(expected_result, HashSearchCore.hex_target(search_target, 32, position=position))
+        with self.assertRaises(ValueError):
+            HashSearchCore.hex_target('0' * 65, 32)
+        return
+
+    def test_leading_zero_bits_target(self):
+        # [ <bits>, <expected_result> ]
+        test_cases = [
+            [ 0, (0, b'', b'') ],
+            [ 8, (0, b'\xff', b'\x00') ],
+            [ 20, (0, b'\xff\xff\xf0', b'\x00\x00\x00') ],
+        ]
+        for bits, expected_result in test_cases:
+            self.assertEqual(expected_result, HashSearchCore.leading_zero_bits_target(bits, 20))
+        with self.assertRaises(ValueError):
+            HashSearchCore.leading_zero_bits_target(161, 20)
+        return
+
+    def test_matcher(self):
+        digests = [ hashlib.sha256(i.to_bytes(4, 'big')).digest() for i in range(5000) ]
+        for position in [ 'prefix', 'suffix' ]:
+            for search_target in [ '', '0', 'a5', '3c1', 'ff0a' ]:
+                target = HashSearchCore.hex_target(search_target, 32, position=position)
+                match = HashSearchCore.matcher(*target)
+                where, key = HashSearchCore.prefilter(*target, 32)
+                for digest in digests:
+                    hex_digest = digest.hex()
+                    if position == 'prefix':
+                        expected = hex_digest.startswith(search_target)
+                    else:
+                        expected = hex_digest.endswith(search_target)
+                    self.assertEqual(expected, match(digest))
+                    if expected:
+                        self.assertTrue(digest.startswith(key) if where == 'prefix' else digest.endswith(key))
+        # a mask that is not at the start or the end of the digest
+        match = HashSearchCore.matcher(4, b'\xf0\x0f', b'\x10\x02')
+        self.assertTrue(match(bytes([ 0, 0, 0, 0, 0x1f, 0xf2 ])))
+        self.assertFalse(match(bytes([ 0, 0, 0, 0, 0x2f, 0xf2 ])))
+        return
+
+    def test_search(self):
+        prefix = b'x' * 100
+        candidates = [ i.to_bytes(3, 'big') for i in range(1 << 16) ]
+        for hash_name in [ 'sha256', 'md5', 'sha1', 'sha512' ]:
+            digest_size = hashlib.new(hash_name).digest_size
+            for position in [ 'prefix', 'suffix' ]:
+                target = HashSearchCore.hex_target('abc', digest_size, position=position)
+                candidate, hashes = HashSearchCore.search(hash_name, prefix, candidates, target, check_interval=1000)
+                hex_digests = [ hashlib.new(hash_name, prefix + c).hexdigest() for c in candidates[:hashes] ]
+                check = str.startswith if position == 'prefix' else str.endswith
+                self.assertTrue(check(hex_digests[-1], 'abc'))
+                self.assertFalse(any(check(h, 'abc') for h in hex_digests[:-1]))
+                self.assertEqual(candidates[hashes - 1], candidate)
+        # a function as the target
+        candidate, hashes = HashSearchCore.search('sha256', prefix, candidates, lambda digest: digest[-1] == 0x42)
+        self.assertEqual(0x42, hashlib.sha256(prefix + candidate).digest()[-1])
+        self.assertEqual(candidates[hashes - 1], candidate)
+        # no match, and stopped after the first chunk
+        target = HashSearchCore.hex_target('0' * 20, 32)
+        self.assertEqual((None, 1 << 16), HashSearchCore.search('sha256', prefix, candidates, target))
+        result = HashSearchCore.search('sha256', prefix, candidates, target, stopped=lambda: True, check_interval=100)
+        self.assertEqual((None, 100), result)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
+
+# --- end of file --- #
@@ -0,0 +1,40 @@
+# file: parallel_hash_search_test.py
+
+import unittest
+from ctf_library.hash.parallel_hash_search import ParallelHashSearch
+
+def find_square_root(n, start, end, stopped=None):
+    # a shard function for the tests: search x * x == n in [start, end)
+    for x in range(start, end):
+        if x * x == n:
+            return x, x - start + 1
+    return None, end - start
+
+class ParallelHashSearchTest(unittest.TestCase):
+
+    def test_search(self):
+        shards = list(ParallelHashSearch.range_shards(0, 1000, shard_size=64))
+        self.assertEqual(16, len(shards))
+        self.assertEqual((960, 1000), shards[-1])
+        for workers in [ None, 2 ]:
+            search_result = ParallelHashSearch.search(
+                find_square_root, [ (700 * 700, start, end) for start, end in shards ], workers=workers
+            )
+            self.assertEqual(700, search_result.result)
+            self.assertGreater(search_result.hashes, 0)
+            self.assertLessEqual(search_result.hashes, 1000)
+            self.assertEqual(search_result.hashes, sum(search_result.worker_hashes.values()))
+            self.assertEqual(set(search_result.worker_hashes), set(search_result.worker_hashes_per_second()))
+            # no result: all the shards are searched
+            search_result = ParallelHashSearch.search(
+                find_square_root, [ (2, start, end) for start, end in shards ], workers=workers
+            )
+            self.assertIsNone(search_result.result)
+            self.assertEqual(1000, search_result.hashes)
+            self.assertEqual(16, search_result.shards)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
+
+# --- end of file --- #
@@ -0,0 +1,135 @@
+# file: pow_challenge_test.py
+
+import unittest
+import hashlib
+from ctf_library.hash.hash_search import HashSearch
+from ctf_library.hash.pow_challenge import PowChallenge
+
+def starts_with_digit(digest):
+    # a target predicate for the tests: the first hex digit is a decimal digit
+    return digest[0] < 0xa0
+
+class PowChallengeTest(unittest.TestCase):
+
+    def test_spec(self):
+        with self.assertRaises(ValueError):
+            PowChallenge.Spec(charset='ab')
+        with self.assertRaises(ValueError):
+            PowChallenge.Spec(hex_prefix='00', leading_zero_bits=8)
+        with self.assertRaises(ValueError):
+            PowChallenge.Spec(hex_prefix='00', min_length=3, max_length=2)
+        with self.assertRaises(ValueError):
+            PowChallenge.Spec(hex_prefix='00', result_format='base64')
+        with self.assertRaises(ValueError):
+            PowChallenge.Spec(hex_suffix='00', charset=bytes(range(128, 256)), min_length=2)
+        with self.assertRaises(ValueError):
+            PowChallenge.Spec(hex_suffix='00', charset=[ b'\xc3\xa9', b'\xff\xfe' ])
+        with self.assertRaises(ValueError):
+            PowChallenge.compile(PowChallenge.Spec(algorithm='no-such-hash', hex_prefix='00'))
+        with self.assertRaises(ValueError):
+            PowChallenge.compile(PowChallenge.Spec(algorithm='md5', hex_prefix='0' * 33))
+        # [ <spec>, <strategy> ]
+        test_cases = [
+            [ PowChallenge.Spec(hex_suffix='0000'), 'bytes' ],
+            [ PowChallenge.Spec(hex_prefix='000'), 'mask' ],
+            [ PowChallenge.Spec(leading_zero_bits=16), 'bytes' ],
+            [ PowChallenge.Spec(leading_zero_bits=20), 'mask' ],
+            [ PowChallenge.Spec(predicate=starts_with_digit), 'predicate' ],
+        ]
+        for spec, strategy in test_cases:
+            self.assertEqual(strategy, PowChallenge.compile(spec).strategy())
+        return
+
+    def test_solve(self):
+        # [ <algorithm>, <prefix>, <suffix>, <target>, <check> ]
+        test_cases = [
+            [ 'md5', b'abc', b'', { 'hex_suffix': '123' }, lambda h: h.endswith('123') ],
+            [ 'sha1', b'', b'xyz', { 'hex_prefix': 'ab1' }, lambda h: h.startswith('ab1') ],
+            [ 'sha512', b'pre', b'', { 'leading_zero_bits': 10 }, lambda h: int(h, 16) >> (512 - 10) == 0 ],
+            [ 'blake2b', b'pre', b'post', { 'hex_prefix': '0e' }, lambda h: h.startswith('0e') ],
+            [ 'sha256', b'pre', b'', { 'predicate': starts_with_digit }, lambda h: h[0] in '0123456789' ],
+        ]
+        for algorithm, prefix, suffix, target, check in test_cases:
+            spec = PowChallenge.Spec(algorithm=algorithm, prefix=prefix, suffix=suffix,
+                                     charset='abcdefghijklmnop', min_length=1, max_length=4, **target)
+            answer = PowChallenge.solve(spec).result
+            digest = hashlib.new(algorithm, prefix + answer.encode() + suffix).hexdigest()
+            self.assertTrue(check(digest), f'{algorithm}, {answer}')
+        # the shortest answer is found first
+        spec = PowChallenge.Spec(hex_prefix='', charset='ab', min_length=0, max_length=2)
+        self.assertEqual('', PowChallenge.solve(spec).result)
+        # no answer: all the candidates of length 1 to 2 are hashed
+        spec = PowChallenge.Spec(hex_suffix='0' * 16, charset='abc', max_length=2, result_format='bytes')
+        search_result = PowChallenge.solve(spec)
+        self.assertIsNone(search_result.result)
+        self.assertEqual(3 + 9, search_result.hashes)
+        # characters that are not UTF-8 text, with the answer as bytes
+        spec = PowChallenge.Spec(hex_suffix='00', charset=bytes(range(128, 256)), min_length=2, result_format='bytes')
+        answer = PowChallenge.solve(spec).result
+        self.assertTrue(hashlib.sha256(answer).hexdigest().endswith('00'))
+        self.assertTrue(all(c >= 128 for c in answer))
+        return
+
+    def test_solve_backends(self):
+        prefix = '0dQk5dyK0KuOb9a5'
+        for backend in [ 'core', 'hashlib', 'numpy' ]:
+            spec = PowChallenge.Spec(prefix=prefix, suffix='!', hex_suffix='abc', charset='abcdefghijklmnop',
+                                     min_length=1, max_length=4, backend=backend)
+            search_result = PowChallenge.solve(spec)
+            answer = search_result.result
+            self.assertTrue(hashlib.sha256((prefix + answer + '!').encode()).hexdigest().endswith('abc'))
+            # the first answer, with the same number of hashes
+            self.assertEqual(PowChallenge.compile(spec).space.index(answer.encode()) + 1, search_result.hashes)
+        with self.assertRaises(ValueError):
+            PowChallenge.Spec(hex_suffix='abc', backend='gpu')
+        with self.assertRaises(ValueError):
+            PowChallenge.compile(PowChallenge.Spec(algorithm='md5', hex_suffix='abc', backend='numpy'))
+        with self.assertRaises(ValueError):
+            PowChallenge.compile(PowChallenge.Spec(prefix='x' * 60, hex_suffix='abc', backend='numpy'))
+        return
+
+    def test_solve_workers(self):
+        spec = PowChallenge.Spec(algorithm='sha1', prefix='task:', leading_zero_bits=12,
+                                 charset='0123456789', min_length=1, max_length=6, result_format='bytes')
+        answer = PowChallenge.solve(spec, workers=2).result
+        self.assertTrue(hashlib.sha1(b'task:' + answer).hexdigest().startswith('000'))
+        return
+
+    def test_hashcash_spec(self):
+        spec = PowChallenge.hashcash_spec('user@example.com', bits=12, date='261018', rand='c0ffee')
+        self.assertEqual(b'1:12:261018:user@example.com::c0ffee:', spec.prefix)
+        stamp = spec.prefix.decode() + PowChallenge.solve(spec).result
+        self.assertTrue(hashlib.sha1(stamp.encode()).hexdigest().startswith('000'))
+        return
+
+    def test_hash_search_specs(self):
+        prefix = '0dQk5dyK0KuOb9a5'
+        for workers in [ None, 2 ]:
+            postfix = HashSearch.hash_search_htv_2024(prefix, '000', 'abcdefghijklmnop', workers=workers)
+            self.assertEqual(4, len(postfix))
+            self.assertTrue(hashlib.sha256((prefix + postfix).encode()).hexdigest().endswith('000'))
+            result = HashSearch.hash_search_xmas_ctf_2021('abc', workers=workers)
+            self.assertEqual(8, len(result))
+            self.assertTrue(hashlib.sha256(bytes.fromhex(result)).hexdigest().endswith('abc'))
+        # non-ASCII characters, encoded with UTF-8
+        postfix = HashSearch.hash_search_htv_2024(prefix, '00', 'éabc€')
+        self.assertTrue(set(postfix) <= set('éabc€'))
+        self.assertTrue(hashlib.sha256((prefix + postfix).encode()).hexdigest().endswith('00'))
+        with self.assertRaises(ValueError):
+            PowChallenge.compile(PowChallenge.Spec(hex_suffix='00', charset='éabc', backend='hashlib'))
+        # 5 ^ 3 candidates, with repeated characters, none of them matches
+        search_result = PowChallenge.solve(HashSearch.htv_2024_spec(prefix, '0' * 12, 'abcde', result_length=3))
+        self.assertIsNone(search_result.result)
+        self.assertEqual(125, search_result.hashes)
+        # 5 * 4 * 3 permutations
+        spec = PowChallenge.Spec(prefix=prefix, hex_suffix='0' * 12, charset='abcde', min_length=3, repeat=False)
+        self.assertEqual(60, PowChallenge.solve(spec).hashes)
+        search_result = PowChallenge.solve(HashSearch.xmas_ctf_2021_spec('0' * 20, string_length=1))
+        self.assertIsNone(search_result.result)
+        self.assertEqual(256, search_result.hashes)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
+
+# --- end of file --- #
@@ -0,0 +1,105 @@
+# file: batch_gcd_test.py
+
+import unittest
+import os
+import random
+import tempfile
+from ctf_library.math.batch_gcd import BatchGCD
+from ctf_library.math.mathlib import MathLib
+from ctf_library.math.primality import Primality
+
+class BatchGCDTest(unittest.TestCase):
+
+    def test_batch_gcd(self):
+        # [ <moduli>, <expected gcds> ]
+        test_cases = [
+            [ [], [] ],
+            [ [ 15 ], [ 1 ] ],
+            [ [ 15, 21, 77, 143 ], [ 3, 21, 77, 11 ] ],
+            [ [ 6, 35, 6 ], [ 6, 1, 6 ] ],
+        ]
+        for moduli, expected_result in test_cases:
+            self.assertEqual(expected_result, BatchGCD.batch_gcd(moduli))
+        return
+
+    def test_batch_gcd_random(self):
+        moduli = self.random_moduli(200, 32, random.Random(5))
+        expected_result = [
+            MathLib.gcd(n, self.product_except(moduli, i)) for i, n in enumerate(moduli)
+        ]
+        self.assertEqual(expected_result, BatchGCD.batch_gcd(moduli))
+        self.assertEqual(expected_result, BatchGCD.batch_gcd(moduli, workers=2))
+        return
+
+    def test_product_tree(self):
+        tree = BatchGCD.product_tree([ 2, 3, 5, 7, 11 ])
+        self.assertEqual([ [ 2, 3, 5, 7, 11 ], [ 6, 35, 11 ], [ 210, 11 ], [ 2310 ] ], tree)
+        self.assertEqual([ 2310 % 4, 2310 % 9, 2310 % 25, 2310 % 49, 2310 % 121 ],
+                         BatchGCD.remainder_tree(tree))
+        return
+
+    def test_find_shared_factors(self):
+        # 3233 appears twice, so its factors are found from the other moduli
+        moduli = [ 3233, 15, 3233, 53 * 67, 71 * 73 ]
+        result = BatchGCD.find_shared_factors(moduli)
+        self.assertEqual([ 0, 2, 3 ], [ index for index, _, _, _ in result ])
+        for index, n, p, q in result:
+            self.assertEqual(moduli[index], n)
+            self.assertEqual(n, p * q)
+            self.assertIn(53, [ p, q ])
+        return
+
+    def test_recover_keys(self):
+        rng = random.Random(8)
+        moduli = self.random_moduli(50, 64, rng)
+        # the last modulus shares a prime with moduli[10], which replaces
+        # the modulus that shared a prime with moduli[11]
+        shared = self.random_prime(64, rng)
+        moduli[10] = shared * self.random_prime(64, rng)
+        moduli.append(shared * self.random_prime(64, rng))
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'moduli.txt')
+            with open(filename, 'w') as f:
+                f.write('# moduli\n\n')
+                for i, n in enumerate(moduli):
+                    f.write(f'{hex(n) if i % 2 == 0 else n}\n')
+            self.assertEqual(moduli, list(BatchGCD.read_moduli(filename)))
+            result = BatchGCD.recover_keys_from_file(filename, e=65537)
+        self.assertEqual([ 0, 1, 10, 20, 21, 30, 31, 40, 41, 50 ],
+                         [ index for index, _, _, _, _, _ in result ])
+        for index, n, p, q, e, d in result:
+            self.assertEqual(moduli[index], n)
+            self.assertEqual(n, p * q)
+            self.assertEqual(1, e * d % ((p - 1) * (q - 1)))
+            self.assertEqual(12345, pow(pow(12345, e, n), d, n))
+        return
+
+    # --- Internal Functions
+
+    def random_prime(self, bits, rng):
+        while True:
+            n = rng.getrandbits(bits) | (1 << (bits - 1)) | 1
+            if Primality.is_prime(n):
+                return n
+
+    def random_moduli(self, count, bits, rng):
+        # products of two random primes, where every tenth modulus shares a
+        # prime with the previous modulus
+        primes = [ self.random_prime(bits, rng) for _ in range(count + 1) ]
+        moduli = []
+        for i in range(count):
+            q = primes[i - 1] if i % 10 == 1 else self.random_prime(bits, rng)
+            moduli.append(primes[i] * q)
+        return moduli
+
+    def product_except(self, values, index):
+        product = 1
+        for i, value in enumerate(values):
+            if i != index:
+                product *= value
+        return product
+
+if __name__ == '__main__':
+    unittest.main()
+
+# --- end of file --- #
@@ -1,5 +1,6 @@
 # file: chinese_remainder_theorem.py
 
+import math
 import unittest
 from ctf_library.math.chinese_remainder_theorem import ChineseRemainderTheorem
 
@@ -25,7 +26,6 @@ class ChineseRemainderTheoremTest(unittest.TestCase):
         [ [ (2, 4), (2, 2) ], error_result_marker ],
     ]
 
-    # not implemented yet (TODO)
     test_cases_extended = [
         # Test cases from https://www.math.cmu.edu/~mradclif/teaching/127S19/Notes/ChineseRemainderTheorem.pdf
         [ [ (2, 5, 7), (3, 4, 8) ], [ (6, 7), (4, 8) ], [ 20, 56 ] ],
@@ -84,6 +84,61 @@ class ChineseRemainderTheoremTest(unittest.TestCase):
                 self.assertEqual((a_prime, n_prime), coef_2)
         return
     
+    # [ coef_list, expected_result ]
+    test_cases_general = [
+        [ [ (2, 4), (2, 2) ], [ 2, 4 ] ],
+        [ [ (3, 4), (0, 6) ], error_result_marker ],
+        [ [ (3, 4), (1, 6) ], [ 7, 12 ] ],
+        [ [ (3, 12), (7, 10), (2, 7), (2, 5) ], [ 387, 420 ] ],
+        [ [ (6, 7), (4, 8) ], [ 20, 56 ] ],
+        [ [ (5, 6) ], [ 5, 6 ] ],
+        [ [], [] ],
+    ]
+
+    def test_solve_general(self):
+        for coef_list, expected_result in ChineseRemainderTheoremTest.test_cases_general:
+            try:
+                result = ChineseRemainderTheorem.solve_general(coef_list)
+                self.assertEqual(expected_result, result)
+            except ValueError:
+                self.assertEqual(expected_result, ChineseRemainderTheoremTest.error_result_marker)
+        return
+
+    def test_solve_many(self):
+        primes = [ 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53 ] + [ (1 << 127) - 1, (1 << 61) - 1 ]
+        x = 0x0123456789abcdef0123456789abcdef0123456789abcdef0123456789abcdef
+        coef_list = [ (x % p, p) for p in primes ]
+        n = math.prod(primes)
+        self.assertEqual([ x % n, n ], ChineseRemainderTheorem.solve_many(coef_list))
+        self.assertEqual([ x % n, n ], ChineseRemainderTheorem.solve_general(coef_list))
+        self.assertEqual([ x % n, n ], ChineseRemainderTheorem.solve(coef_list))
+        with self.assertRaises(ValueError):
+            ChineseRemainderTheorem.solve_many([ (1, 6), (1, 10) ])
+        # a modulus with a common factor in a long list
+        coef_list.append((x % 9, 9))
+        self.assertEqual([ x % (n * 3), n * 3 ], ChineseRemainderTheorem.solve_general(coef_list))
+        return
+
+    def test_solve_linear_congruence(self):
+        # [ (m, a, n), expected_result ]
+        test_cases = [
+            [ (3, 2, 5), [ 4 ] ],
+            [ (4, 2, 6), [ 2, 5 ] ],
+            [ (4, 1, 6), [] ],
+            [ (6, 0, 9), [ 0, 3, 6 ] ],
+            [ (0, 0, 4), [ 0, 1, 2, 3 ] ],
+            [ (5, 20, 60), [ 4, 16, 28, 40, 52 ] ],
+        ]
+        for coef, expected_result in test_cases:
+            result = ChineseRemainderTheorem.solve_linear_congruence(coef)
+            self.assertEqual(expected_result, result)
+            m, a, n = coef
+            for x in range(n):
+                self.assertEqual((m * x - a) % n == 0, x in result)
+        with self.assertRaises(ValueError):
+            ChineseRemainderTheorem.reduce((4, 1, 6))
+        return
+
 if __name__ == '__main__':
     unittest.main()
 
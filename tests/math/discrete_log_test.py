@@ -0,0 +1,81 @@
+# file: discrete_log_test.py
+
+import unittest
+import math
+import random
+from ctf_library.math.discrete_log import DiscreteLog
+
+class DiscreteLogTest(unittest.TestCase):
+
+    def test_discrete_log_small(self):
+        # every power of every unit modulo small numbers, including
+        # moduli without primitive roots
+        for n in [ 2, 3, 7, 8, 9, 15, 16, 24, 25, 27, 97, 100 ]:
+            for g in range(1, n):
+                if math.gcd(g, n) != 1:
+                    continue
+                expected_results = {}
+                x, value = 0, 1 % n
+                while value not in expected_results:
+                    expected_results[value] = x
+                    x, value = x + 1, value * g % n
+                for h in range(n):
+                    self.assertEqual(expected_results.get(h), DiscreteLog.discrete_log(h, g, n))
+        return
+
+    def test_discrete_log_large(self):
+        rng = random.Random(1)
+        for n in [ 1000003, 2 ** 61 - 1, 3 ** 20 * 7, 1000003 * 998244353 ]:
+            for _ in range(5):
+                g = rng.randrange(2, n)
+                while math.gcd(g, n) != 1:
+                    g = rng.randrange(2, n)
+                x = rng.randrange(n)
+                h = pow(g, x, n)
+                result = DiscreteLog.discrete_log(h, g, n)
+                self.assertEqual(h, pow(g, result, n))
+        return
+
+    def test_bsgs(self):
+        p = 1000003
+        for x in [ 0, 1, 777, 999, 1000, 123456, p - 2 ]:
+            h = pow(5, x, p)
+            self.assertEqual(x, DiscreteLog.bsgs(h, 5, p, p - 1))
+            # a table of 10 baby steps
+            self.assertEqual(x, DiscreteLog.bsgs(h, 5, p, p - 1, memory_limit=160))
+        # 2 is not a power of 4
+        self.assertIsNone(DiscreteLog.bsgs(2, 4, p, p - 1))
+        return
+
+    def test_bsgs_workers(self):
+        # q and 2 * q + 1 are primes, and 4 has order q
+        q = 1099511627933
+        p = 2 * q + 1
+        x = 987654321
+        self.assertEqual(x, DiscreteLog.bsgs(pow(4, x, p), 4, p, q, memory_limit=1 << 16, workers=2))
+        return
+
+    def test_pollard_rho_log(self):
+        q = 1099511627933
+        p = 2 * q + 1
+        rng = random.Random(2)
+        for _ in range(3):
+            x = rng.randrange(q)
+            self.assertEqual(x, DiscreteLog.pollard_rho_log(pow(4, x, p), 4, p, q, seed=1))
+        return
+
+    def test_pohlig_hellman(self):
+        # 3 is a primitive root of the safe prime p, with p - 1 = 2 * q
+        q = 1099511627933
+        p = 2 * q + 1
+        x = 10 ** 12
+        self.assertEqual(x, DiscreteLog.pohlig_hellman(pow(3, x, p), 3, p, p - 1, factorization={ 2: 1, q: 1 }))
+        # not coprime
+        with self.assertRaises(ValueError):
+            DiscreteLog.discrete_log(4, 6, 9)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
+
+# --- end of file --- #
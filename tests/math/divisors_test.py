@@ -0,0 +1,72 @@
+# file: divisors_test.py
+
+import unittest
+import random
+import time
+from ctf_library.math.divisors import Divisors
+from ctf_library.math.factorization import Factorization
+
+class DivisorsTest(unittest.TestCase):
+
+    def test_divisors(self):
+        verbose = False
+        for n in range(1, 2000):
+            expected_result = [ d for d in range(1, n + 1) if n % d == 0 ]
+            factorization = Factorization.factorint(n)
+            result = Divisors.divisors(factorization)
+            if verbose:
+                print(f'divisors({n}) = {result}')
+            self.assertEqual(expected_result, result)
+            self.assertEqual(expected_result, sorted(Divisors.iter_divisors(factorization)))
+            self.assertEqual(expected_result, list(Divisors.iter_sorted_divisors(factorization)))
+            self.assertEqual(len(expected_result), Divisors.count(factorization))
+            self.assertEqual(sum(expected_result), Divisors.sum(factorization))
+            self.assertEqual(sum(d * d for d in expected_result), Divisors.sum(factorization, k=2))
+            self.assertEqual(len(expected_result), Divisors.sum(factorization, k=0))
+        return
+
+    def test_divisors_highly_composite(self):
+        # the largest highly composite number below 2 ** 64 has 184320 divisors
+        n = 18401055938125660800
+        factorization = Factorization.factorint(n)
+        self.assertEqual(184320, Divisors.count(factorization))
+        result = Divisors.divisors(factorization)
+        self.assertEqual(184320, len(result))
+        self.assertEqual(result, sorted(set(result)))
+        for d in random.sample(result, 1000):
+            self.assertEqual(0, n % d)
+        first_divisors = []
+        for d in Divisors.iter_sorted_divisors(factorization):
+            if len(first_divisors) == 100:
+                break
+            first_divisors.append(d)
+        self.assertEqual(result[:100], first_divisors)
+        return
+
+    def test_factorization_divisors(self):
+        for n in [ 1, 12, -12, 65536, 1234567890, 10 ** 18 + 9 ]:
+            expected_result = Factorization.all_factors(n)
+            if n < 0:
+                expected_result = expected_result[1:]
+            self.assertEqual(expected_result, list(Factorization.iter_divisors(n, sort=True)))
+            self.assertEqual(expected_result, sorted(Factorization.iter_divisors(n)))
+            self.assertEqual(len(expected_result), Factorization.divisor_count(n))
+            self.assertEqual(sum(expected_result), Factorization.divisor_sum(n))
+        self.assertEqual([], list(Factorization.iter_divisors(0)))
+        self.assertEqual(0, Factorization.divisor_count(0))
+        self.assertEqual(0, Factorization.divisor_sum(0))
+        return
+
+    def test_all_factors_large(self):
+        # a product of two 32-bit primes was out of reach for a scan up to sqrt(n)
+        n = 4294967291 * 4294967279
+        start_time = time.monotonic()
+        result = Factorization.all_factors(n)
+        self.assertEqual([ 1, 4294967279, 4294967291, n ], result)
+        self.assertLess(time.monotonic() - start_time, 10)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
+
+# --- end of file --- #
@@ -0,0 +1,120 @@
+# file: factorization_engine_test.py
+
+import unittest
+import random
+from ctf_library.math.factorization_engine import FactorizationEngine
+from ctf_library.math.factorization import Factorization
+from ctf_library.math.primality import Primality
+
+class FactorizationEngineTest(unittest.TestCase):
+
+    # [ <n>, <expected factorization> ]
+    test_cases_factorint = [
+        [ 0, { 0: 1 } ], [ 1, {} ], [ 2, { 2: 1 } ], [ -1, { -1: 1 } ],
+        [ -12, { -1: 1, 2: 2, 3: 1 } ],
+        [ 65536, { 2: 16 } ], [ 1234567890, { 2: 1, 3: 2, 5: 1, 3607: 1, 3803: 1 } ],
+        [ 2 ** 64 * 3 ** 5 * 1000000007 ** 3, { 2: 64, 3: 5, 1000000007: 3 } ],
+        # Test cases from https://en.wikipedia.org/wiki/RSA_(cryptosystem)
+        [ 3233, { 53: 1, 61: 1 } ],
+        # a 64-bit RSA modulus
+        [ 4294967291 * 4294967279, { 4294967279: 1, 4294967291: 1 } ],
+        # perfect powers of a composite number
+        [ (1000003 * 999983) ** 3, { 999983: 3, 1000003: 3 } ],
+        # Carmichael numbers
+        [ 561, { 3: 1, 11: 1, 17: 1 } ], [ 1105, { 5: 1, 13: 1, 17: 1 } ],
+        # 2 ** 67 - 1 (Cole, 1903)
+        [ 2 ** 67 - 1, { 193707721: 1, 761838257287: 1 } ],
+    ]
+
+    def test_factorint(self):
+        verbose = False
+        for n, expected_result in FactorizationEngineTest.test_cases_factorint:
+            result = FactorizationEngine.factorint(n)
+            if verbose:
+                print(f'factorint({n}) = {result}')
+            self.assertEqual(expected_result, result)
+            self.assertEqual(list(expected_result.keys()), list(result.keys()))
+            self.assertEqual(expected_result, Factorization.factorint(n))
+        return
+
+    def test_factorint_random(self):
+        verbose = False
+        for _ in range(200):
+            n = random.getrandbits(64)
+            result = FactorizationEngine.factorint(n)
+            if verbose:
+                print(f'factorint({n}) = {result}')
+            self.do_check_factorint(n, result)
+        return
+
+    def test_factorint_rsa_modulus(self):
+        verbose = False
+        rng = random.Random(2024)
+        for bits in [ 24, 32, 40 ]:
+            p = self.random_prime(bits, rng)
+            q = self.random_prime(bits, rng)
+            result = FactorizationEngine.factorint(p * q, seed=bits)
+            if verbose:
+                print(f'factorint({p * q}) = {result}')
+            self.assertEqual({ p: 1, q: 1 }, result)
+        return
+
+    def test_factorint_timeout(self):
+        # a product of two 64-bit primes cannot be factorized in 0.1 seconds
+        p = 18446744073709551557
+        q = 18446744073709551533
+        with self.assertRaises(TimeoutError):
+            FactorizationEngine.factorint(p * q, timeout=0.1)
+        return
+
+    def test_pollard_rho_brent(self):
+        n = 10403 * 1000003
+        d = None
+        for c in range(1, 10):
+            d = FactorizationEngine.pollard_rho_brent(n, c=c)
+            if d is not None:
+                break
+        self.assertIn(d, [ 10403, 1000003, 101, 103, 101 * 1000003, 103 * 1000003 ])
+        self.assertEqual(0, n % d)
+        return
+
+    def test_ecm_one_curve(self):
+        # with enough curves, ecm finds a factor of a product of 32-bit primes
+        n = 4294967291 * 4294967279
+        rng = random.Random(1)
+        d = None
+        for _ in range(100):
+            d = FactorizationEngine.ecm_one_curve(n, rng.randrange(6, n - 1), 2000, 100000)
+            if d is not None:
+                break
+        self.assertIn(d, [ 4294967291, 4294967279 ])
+        return
+
+    def test_perfect_power(self):
+        for root, k in [ (2, 10), (3, 7), (6, 6), (1000003, 4), (12345, 1) ]:
+            n = root ** k
+            result_root, result_k = FactorizationEngine.perfect_power(n)
+            self.assertEqual(n, result_root ** result_k)
+            self.assertEqual(k, result_k)
+        return
+
+    # --- Internal Functions
+
+    def do_check_factorint(self, n, result):
+        product = 1
+        for p, k in result.items():
+            self.assertTrue(Primality.is_prime(p))
+            product *= p ** k
+        self.assertEqual(n, product)
+        return
+
+    def random_prime(self, bits, rng):
+        while True:
+            n = rng.getrandbits(bits) | (1 << (bits - 1)) | 1
+            if Primality.is_prime(n):
+                return n
+
+if __name__ == '__main__':
+    unittest.main()
+
+# --- end of file --- #
@@ -0,0 +1,117 @@
+# file: fermat_factorization_test.py
+
+import unittest
+import json
+import random
+from ctf_library.math.fermat_factorization import FermatFactorization
+
+class FermatFactorizationTest(unittest.TestCase):
+
+    # [ <n>, <expected smaller factor> ]
+    test_cases = [
+        [ 59 * 73, 59 ], [ 97 * 499, 97 ], [ 25 * 27, 25 ], [ 15 * 15, 15 ],
+        [ 97, 1 ], [ 8, 2 ], [ 12, 2 ], [ 3, 1 ], [ 1, 1 ],
+        [ 1000003 * 1000033, 1000003 ],
+        [ 4294967291 * 4294967279, 4294967279 ],
+    ]
+
+    def test_factor(self):
+        verbose = False
+        for n, expected_result in FermatFactorizationTest.test_cases:
+            result = FermatFactorization.factor(n)
+            if verbose:
+                print(f'factor({n}) = {result}')
+            self.assertEqual(expected_result, result)
+        # numbers that are 2 mod 4 are not a difference of two squares
+        for n in [ 2, 6, 10, 82 ]:
+            self.assertIsNone(FermatFactorization.factor(n))
+        return
+
+    def test_factor_random(self):
+        for _ in range(100):
+            first = random.randint(1, 99999) | 1
+            second = first + 2 * random.randint(0, 9999)
+            n = first * second
+            result = FermatFactorization.factor(n)
+            self.assertEqual(0, n % result)
+            self.assertLessEqual(result * result, n)
+        return
+
+    def test_search_bounded(self):
+        # the factors are far apart, so a small search does not find them
+        n = 1009 * 1000003
+        checkpoint = FermatFactorization.search(n, max_iterations=1000)
+        self.assertIsNone(checkpoint.factor)
+        self.assertEqual(1000, checkpoint.iterations)
+        self.assertFalse(checkpoint.finished())
+        checkpoint = FermatFactorization.search(n, timeout=0.0)
+        self.assertIsNone(checkpoint.factor)
+        return
+
+    def test_search_resume(self):
+        n = 1009 * 1000003
+        checkpoint = FermatFactorization.Checkpoint(n)
+        rounds = 0
+        while not checkpoint.finished():
+            # save and load the checkpoint between the rounds
+            checkpoint = FermatFactorization.Checkpoint.from_dict(
+                json.loads(json.dumps(checkpoint.to_dict()))
+            )
+            FermatFactorization.search(checkpoint=checkpoint, max_iterations=50000)
+            rounds += 1
+        self.assertGreater(rounds, 1)
+        self.assertEqual(1009, checkpoint.factor)
+        self.assertEqual(FermatFactorization.factor(n), checkpoint.factor)
+        return
+
+    def test_search_split(self):
+        n = 101 * 10007
+        checkpoints = FermatFactorization.Checkpoint(n).split(7)
+        self.assertEqual(FermatFactorization.Checkpoint(n).a, checkpoints[0].a)
+        for first, second in zip(checkpoints, checkpoints[1:]):
+            self.assertEqual(first.a_end, second.a)
+        factors = [
+            FermatFactorization.search(checkpoint=checkpoint).factor
+            for checkpoint in checkpoints
+        ]
+        self.assertIn(101, factors)
+        return
+
+    def test_lehman(self):
+        verbose = False
+        for n in [ 59 * 73, 97 * 499, 1009 * 1000003, 1000003 * 1000033, 2 ** 31 - 1, 35 ]:
+            result = FermatFactorization.lehman(n)
+            if verbose:
+                print(f'lehman({n}) = {result}')
+            self.assertEqual(0, n % result)
+            if n == 2 ** 31 - 1:
+                self.assertEqual(1, result)
+            else:
+                self.assertTrue(1 < result < n)
+        return
+
+    def test_hart_one_line(self):
+        verbose = False
+        for n in [ 59 * 73, 1000003 * 1000033, 4294967291 * 4294967279, 1009 * 1000003 ]:
+            result = FermatFactorization.hart_one_line(n, max_iterations=100000)
+            if verbose:
+                print(f'hart_one_line({n}) = {result}')
+            self.assertTrue(1 < result < n)
+            self.assertEqual(0, n % result)
+        self.assertIsNone(FermatFactorization.hart_one_line(2 ** 31 - 1, max_iterations=1000))
+        return
+
+    def test_residue_table(self):
+        for n in [ 1, 7, 59 * 73, 1000003 * 1000033 ]:
+            for m in FermatFactorization.residue_moduli:
+                table = FermatFactorization.residue_table(n, m)
+                for a in range(m, 4 * m):
+                    if table[a % m] == 0:
+                        b2 = a * a - n
+                        self.assertFalse(b2 >= 0 and int(b2 ** 0.5) ** 2 == b2)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
+
+# --- end of file --- #
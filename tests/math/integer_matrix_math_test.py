@@ -1,6 +1,7 @@
 # file: integer_matrix_math_test.py
 
 import unittest
+import random
 import numpy as np
 from ctf_library.math.integer_matrix_math import IntegerMatrixMath
 
@@ -84,8 +85,44 @@ class IntegerMatrixMathTest(unittest.TestCase):
             print(f'inverse:\n{m_inv}')
             print(f'computed inverse:\n{m_computed_inv}')
             print(f'diff:\n{diff}')
+            self.assertTrue(np.array_equal(m_inv, m_computed_inv))
         return
     
+    def test_matrix_det(self):
+        for m_data, _ in IntegerMatrixMathTestData.cofactor_matrix:
+            self.assertEqual(3, IntegerMatrixMath.matrix_det(m_data))
+        self.assertEqual(0, IntegerMatrixMath.matrix_det([[1, 2], [2, 4]]))
+        self.assertEqual(-1, IntegerMatrixMath.matrix_det([[0, 1], [1, 0]]))
+        # the float determinant is wrong for entries this large
+        rng = random.Random(1)
+        for n in [ 3, 4, 5 ]:
+            m = [ [ rng.randrange(-2 ** 40, 2 ** 40) for _ in range(n) ] for _ in range(n) ]
+            self.assertEqual(self.det_laplace(m), IntegerMatrixMath.matrix_det(m))
+        return
+    
+    def test_matrix_modular_inverse_large(self):
+        rng = random.Random(2)
+        count = 0
+        while count < 3:
+            m = np.array([ [ rng.randrange(26) for _ in range(50) ] for _ in range(50) ], dtype=np.int64)
+            if IntegerMatrixMath.matrix_det(m) % 2 == 0 or IntegerMatrixMath.matrix_det(m) % 13 == 0:
+                with self.assertRaises(ValueError):
+                    IntegerMatrixMath.matrix_modular_inverse(m, 26)
+                continue
+            m_inv = IntegerMatrixMath.matrix_modular_inverse(m, 26)
+            self.assertEqual(np.int64, m_inv.dtype)
+            self.assertTrue(np.array_equal(np.eye(50, dtype=np.int64), np.matmul(m, m_inv) % 26))
+            count += 1
+        return
+    
+    def det_laplace(self, m):
+        if len(m) == 1:
+            return m[0][0]
+        return sum(
+            (-1) ** j * m[0][j] * self.det_laplace([ row[:j] + row[j+1:] for row in m[1:] ])
+            for j in range(len(m))
+        )
+    
     # --- These are some tests to check the numpy behaviour
     
     def test_np_array_elements(self):
@@ -0,0 +1,58 @@
+# file: lattice_reduction_benchmark.py
+
+# Benchmark of LatticeReduction on random knapsack (subset sum) lattices.
+#
+# Usage: python -m tests.math.lattice_reduction_benchmark [max dimension]
+
+import sys
+import time
+import random
+from ctf_library.math.lattice_reduction import LatticeReduction
+
+# [ <name>, <function>, <maximum dimension or None> ]
+# - lll() and bkz() take much longer in large dimensions
+variants = [
+    [ 'lll (exact)', LatticeReduction.lll, 60 ],
+    [ 'lll_fp', LatticeReduction.lll_fp, None ],
+    [ 'lll_fp (deep insertion)', lambda basis: LatticeReduction.lll_fp(basis, deep_insertion=True), None ],
+    [ 'bkz (block size 10)', lambda basis: LatticeReduction.bkz(basis, block_size=10), 40 ],
+]
+
+def knapsack(n, rng, density=0.5):
+    # weights of n / density bits, and a solution with n / 2 ones
+    weights = [ rng.getrandbits(int(n / density)) for _ in range(n) ]
+    x = [ 1 ] * (n // 2) + [ 0 ] * (n - n // 2)
+    rng.shuffle(x)
+    total = sum(w * b for w, b in zip(weights, x))
+    basis = [ [ 2 if i == j else 0 for j in range(n) ] + [ n * weights[i] ] for i in range(n) ]
+    basis.append([ 1 ] * n + [ n * total ])
+    return basis, x
+
+def is_solved(basis, x):
+    for row in basis:
+        row = [ int(v) for v in row ]
+        if row[-1] == 0 and all(abs(v) == 1 for v in row[:-1]):
+            y = [ (1 + v) // 2 for v in row[:-1] ]
+            if y == x or [ 1 - v for v in y ] == x:
+                return True
+    return False
+
+def benchmark(max_dimension=80, seed=1):
+    rng = random.Random(seed)
+    print(f'{"variant":<26} {"dim":>4} {"time (s)":>9} {"solved":>7} {"|b1|^2":>8}')
+    for n in range(20, max_dimension + 1, 20):
+        basis, x = knapsack(n, rng)
+        for name, function, max_n in variants:
+            if max_n is not None and n > max_n:
+                continue
+            start = time.perf_counter()
+            result = function(basis)
+            t = time.perf_counter() - start
+            norm = sum(int(v) ** 2 for v in result[0])
+            print(f'{name:<26} {n:>4} {t:>9.3f} {str(is_solved(result, x)):>7} {norm:>8}', flush=True)
+    return
+
+if __name__ == '__main__':
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 80)
+
+# --- end of file --- #
@@ -0,0 +1,111 @@
+# file: lattice_reduction_test.py
+
+import unittest
+import random
+import warnings
+from ctf_library.math.lattice_reduction import LatticeReduction
+
+class LatticeReductionTest(unittest.TestCase):
+
+    def test_lll_small(self):
+        # the example from https://en.wikipedia.org/wiki/Lenstra%E2%80%93Lenstra%E2%80%93Lov%C3%A1sz_lattice_basis_reduction_algorithm
+        basis = [[1, 1, 1], [-1, 0, 2], [3, 5, 6]]
+        self.assertFalse(LatticeReduction.is_lll_reduced(basis, delta=0.75))
+        for reduce in self.reductions():
+            result = reduce(basis)
+            self.assertEqual(LatticeReduction.volume_squared(basis), LatticeReduction.volume_squared(result))
+            self.assertTrue(LatticeReduction.is_lll_reduced(result, delta=0.75, eta=0.51))
+            self.assertEqual(1, sum(int(v) ** 2 for v in result[0]))
+        return
+
+    def test_knapsack(self):
+        rng = random.Random(1)
+        for n in [ 10, 16, 24 ]:
+            weights = [ rng.getrandbits(2 * n) for _ in range(n) ]
+            x = [ rng.randrange(2) for _ in range(n) ]
+            basis = self.knapsack_basis(weights, sum(w * b for w, b in zip(weights, x)))
+            for reduce in self.reductions():
+                result = reduce(basis)
+                self.assertEqual(LatticeReduction.volume_squared(basis), LatticeReduction.volume_squared(result))
+                self.assertIn(x, self.knapsack_solutions(result))
+        return
+
+    def test_large_entries(self):
+        # the Gram matrix does not fit in float64
+        rng = random.Random(2)
+        n = 8
+        weights = [ rng.getrandbits(700) for _ in range(n) ]
+        x = [ rng.randrange(2) for _ in range(n) ]
+        basis = self.knapsack_basis(weights, sum(w * b for w, b in zip(weights, x)))
+        result = LatticeReduction.lll_fp(basis)
+        self.assertTrue(LatticeReduction.is_lll_reduced(result, eta=0.51))
+        self.assertEqual(LatticeReduction.volume_squared(basis), LatticeReduction.volume_squared(result))
+        return
+
+    def test_large_entries_bkz(self):
+        # entries above 512 bits: the Gram matrix of BKZ does not fit in float64
+        rng = random.Random(3)
+        basis = [
+            [ rng.getrandbits(1200) | (1 << 1199) if i == j else rng.getrandbits(600) for j in range(6) ]
+            for i in range(6)
+        ]
+        result = LatticeReduction.bkz(basis, block_size=3)
+        self.assertTrue(LatticeReduction.is_lll_reduced(result, eta=0.51))
+        self.assertEqual(LatticeReduction.volume_squared(basis), LatticeReduction.volume_squared(result))
+        return
+
+    def test_large_entries_no_warnings(self):
+        # float64 underflows on a large knapsack lattice, and lll_fp() falls
+        # back to lll() without numpy warnings
+        rng = random.Random(4)
+        n = 12
+        weights = [ rng.getrandbits(1100) for _ in range(n) ]
+        x = [ rng.randrange(2) for _ in range(n) ]
+        basis = self.knapsack_basis(weights, sum(w * b for w, b in zip(weights, x)))
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            result = LatticeReduction.lll_fp(basis)
+        self.assertEqual(LatticeReduction.volume_squared(basis), LatticeReduction.volume_squared(result))
+        self.assertIn(x, self.knapsack_solutions(result))
+        return
+
+    def test_dependent_vectors(self):
+        basis = [[1, 2, 3], [2, 4, 6], [0, 1, 1]]
+        with self.assertRaises(ValueError):
+            LatticeReduction.lll(basis)
+        with self.assertRaises(ValueError):
+            LatticeReduction.lll_fp(basis)
+        return
+
+    def reductions(self):
+        return [
+            LatticeReduction.lll,
+            LatticeReduction.lll_fp,
+            lambda basis: LatticeReduction.lll_fp(basis, deep_insertion=True),
+            lambda basis: LatticeReduction.bkz(basis, block_size=6),
+        ]
+
+    @staticmethod
+    def knapsack_basis(weights, total):
+        # the lattice of Coster et al.: a solution x gives the short vector
+        # (2x - 1, 0) up to sign
+        n = len(weights)
+        scale = n
+        basis = [ [ 2 if i == j else 0 for j in range(n) ] + [ scale * weights[i] ] for i in range(n) ]
+        basis.append([ 1 ] * n + [ scale * total ])
+        return basis
+
+    @staticmethod
+    def knapsack_solutions(basis):
+        solutions = []
+        for row in basis:
+            row = [ int(v) for v in row ]
+            if row[-1] == 0 and all(abs(v) == 1 for v in row[:-1]):
+                solutions.append([ (1 - v) // 2 for v in row[:-1] ])
+                solutions.append([ (1 + v) // 2 for v in row[:-1] ])
+        return solutions
+
+if __name__ == '__main__':
+    unittest.main()
+
+# --- end of file --- #
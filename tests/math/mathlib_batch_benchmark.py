@@ -0,0 +1,47 @@
+# file: mathlib_batch_benchmark.py
+
+# Benchmark of the MathLib batch functions against calling the single-value
+# functions in a Python loop.
+#
+# Usage: python -m tests.math.mathlib_batch_benchmark [count]
+
+import sys
+import time
+import random
+from ctf_library.math.mathlib import MathLib
+
+def measure(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+def benchmark(count=100000, seed=1):
+    rng = random.Random(seed)
+    print(f'{"function":<16} {"bits":>5} {"loop (s)":>10} {"batch (s)":>10} {"speedup":>8}')
+    for bits in [ 31, 62, 256 ]:
+        a = [ rng.getrandbits(bits) for _ in range(count) ]
+        b = [ rng.getrandbits(bits) for _ in range(count) ]
+        cases = [
+            ('gcd', lambda: [ MathLib.gcd(x, y) for x, y in zip(a, b) ],
+                    lambda: MathLib.gcd_many(a, b)),
+            ('gcd_binary', lambda: [ MathLib.gcd(x, y) for x, y in zip(a, b) ],
+                           lambda: MathLib.gcd_binary_many(a, b) if bits <= 62 else None),
+            ('xgcd', lambda: [ MathLib.xgcd(x, y) for x, y in zip(a, b) ],
+                     lambda: MathLib.xgcd_many(a, b)),
+            ('lcm', lambda: [ MathLib.lcm(x, y) for x, y in zip(a, b) ],
+                    lambda: MathLib.lcm_many(a, b)),
+            ('isqrt', lambda: [ MathLib.isqrt(x) for x in a ],
+                      lambda: MathLib.isqrt_many(a)),
+        ]
+        for name, loop_function, batch_function in cases:
+            if name == 'gcd_binary' and bits > 62:
+                continue
+            loop_time = measure(loop_function)
+            batch_time = measure(batch_function)
+            print(f'{name:<16} {bits:>5} {loop_time:>10.4f} {batch_time:>10.4f} {loop_time / batch_time:>7.1f}x')
+    return
+
+if __name__ == '__main__':
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
+
+# --- end of file --- #
@@ -0,0 +1,33 @@
+# file: mathlib_benchmark_test.py
+
+# Benchmark of the MathLib algorithm variants for pytest-benchmark.
+# - The tests are skipped when pytest-benchmark is not installed.
+# - Usage: python -m pytest tests/math/mathlib_benchmark_test.py --benchmark-group-by=param:function_name,param:bits
+# - See also: python -m ctf_library.math.mathlib_benchmark
+
+import random
+import pytest
+from ctf_library.math.mathlib import MathLib
+from ctf_library.math.mathlib_benchmark import MathLibBenchmark
+
+pytest.importorskip('pytest_benchmark')
+
+benchmark_cases = [
+    (function_name, variant, bits)
+    for function_name, variants in MathLibBenchmark.variants.items()
+    for variant, max_bits in variants
+    for bits in MathLibBenchmark.default_bit_lengths
+    if max_bits is None or bits <= max_bits
+]
+
+@pytest.mark.parametrize('function_name,variant,bits', benchmark_cases)
+def test_mathlib_variant(benchmark, function_name, variant, bits):
+    inputs = MathLibBenchmark.make_inputs(function_name, bits, 50, random.Random(bits))
+    function = getattr(MathLib, variant)
+    def run():
+        for args in inputs:
+            function(*args)
+    benchmark(run)
+    return
+
+# --- end of file --- #
@@ -0,0 +1,76 @@
+# file: mathlib_dispatch_test.py
+
+import unittest
+import os
+import math
+import random
+import tempfile
+from ctf_library.math.mathlib import MathLib
+from ctf_library.math.mathlib_benchmark import MathLibBenchmark
+from ctf_library.math.mathlib_dispatch import MathLibDispatch
+
+class MathLibDispatchTest(unittest.TestCase):
+
+    def tearDown(self):
+        MathLibDispatch.reset()
+        return
+
+    def test_dispatch(self):
+        rng = random.Random(3)
+        for bits in [ 1, 8, 31, 32, 33, 64, 100, 1024, 5000 ]:
+            for _ in range(20):
+                a = rng.getrandbits(bits) - (1 << (bits - 1))
+                b = rng.getrandbits(bits)
+                self.assertEqual(math.gcd(a, b), MathLibDispatch.gcd(a, b))
+                self.assertEqual(a ** 5, MathLibDispatch.pow(a, 5))
+                self.assertEqual(math.isqrt(b), MathLibDispatch.isqrt(b))
+        with self.assertRaises(ValueError):
+            MathLibDispatch.isqrt(-1)
+        return
+
+    def test_select(self):
+        self.assertEqual(MathLib.isqrt_hybrid, MathLibDispatch.select('isqrt', 32))
+        self.assertEqual(MathLib.isqrt_newtons_method_faster, MathLibDispatch.select('isqrt', 33))
+        self.assertEqual(MathLib.isqrt_newtons_method_faster, MathLibDispatch.select('isqrt', 100000))
+        return
+
+    def test_thresholds_from_results(self):
+        results = {
+            'gcd': {
+                8: { 'gcd': 2.0, 'gcd_euclidean': 1.0, 'gcd_euclidean_recursive': 1.5 },
+                # within the tie tolerance, gcd_euclidean is kept
+                16: { 'gcd': 1.02, 'gcd_euclidean': 1.03, 'gcd_euclidean_recursive': 1.0 },
+                32: { 'gcd': 1.0, 'gcd_euclidean': 2.0, 'gcd_euclidean_recursive': 2.0 },
+                64: { 'gcd': 1.0, 'gcd_euclidean': 2.0, 'gcd_euclidean_recursive': 2.0 },
+            },
+            'isqrt': {
+                8: { 'isqrt': 2.0, 'isqrt_newtons_method': 1.0 },
+                16: { 'isqrt': 2.0, 'isqrt_newtons_method': 1.0 },
+            },
+        }
+        thresholds = MathLibDispatch.thresholds_from_results(results)
+        self.assertEqual([ [ 16, 'gcd_euclidean' ], [ None, 'gcd' ] ], thresholds['gcd'])
+        # isqrt_newtons_method is not used above the bit length it is benchmarked at
+        self.assertEqual([ [ 1024, 'isqrt_newtons_method' ], [ None, 'isqrt' ] ], thresholds['isqrt'])
+        return
+
+    def test_calibrate(self):
+        thresholds = MathLibDispatch.calibrate(bit_lengths=[ 8, 64 ], count=10, repeat=1)
+        self.assertEqual([ 'gcd', 'pow', 'isqrt' ], list(thresholds.keys()))
+        for function_name, table in thresholds.items():
+            self.assertIsNone(table[-1][0])
+            variants = [ variant for variant, _ in MathLibBenchmark.variants[function_name] ]
+            for _, variant in table:
+                self.assertIn(variant, variants)
+        self.assertEqual(12, MathLibDispatch.gcd(36, 48))
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'thresholds.json')
+            MathLibDispatch.save(filename)
+            MathLibDispatch.reset()
+            self.assertEqual(thresholds, MathLibDispatch.load(filename))
+        return
+
+if __name__ == '__main__':
+    unittest.main()
+
+# --- end of file --- #
@@ -1,6 +1,8 @@
 # file: mathlib_test.py
 
 import unittest
+import random
+import numpy as np
 from ctf_library.math.mathlib import MathLib
 
 class MathLibTest(unittest.TestCase):
@@ -102,6 +104,62 @@ class MathLibTest(unittest.TestCase):
             self.do_check_isqrt_all_methods(n, verbose=verbose)
         return
     
+    def test_iroot(self):
+        verbose = False
+        for k in range(1, 8):
+            for n in list(range(1000)) + [ 1 << 500, (1 << 500) - 1, 3 ** 300 ]:
+                result = MathLib.iroot(n, k)
+                if verbose:
+                    print(f'iroot({n}, {k}) = {result}')
+                self.assertLessEqual(result ** k, n)
+                self.assertGreater((result + 1) ** k, n)
+        self.assertEqual(3 ** 100, MathLib.iroot(3 ** 300, 3))
+        with self.assertRaises(ValueError):
+            MathLib.iroot(-8, 3)
+        with self.assertRaises(ValueError):
+            MathLib.iroot(8, 0)
+        return
+    
+    def test_gcd_many(self):
+        a = [ a for a, _, _, _ in MathLibTest.test_cases_gcd_lcm ]
+        b = [ b for _, b, _, _ in MathLibTest.test_cases_gcd_lcm ]
+        expected_gcd = [ abs(g) for _, _, g, _ in MathLibTest.test_cases_gcd_lcm ]
+        expected_lcm = [ l for _, _, _, l in MathLibTest.test_cases_gcd_lcm ]
+        self.assertEqual(expected_gcd, list(MathLib.gcd_many(a, b)))
+        self.assertEqual(expected_gcd, list(MathLib.gcd_binary_many(a, b)))
+        self.assertEqual(expected_lcm, list(MathLib.lcm_many(a, b)))
+        rng = random.Random(7)
+        for bits in [ 16, 62, 64, 200 ]:
+            a = [ rng.randrange(-(1 << bits), 1 << bits) for _ in range(500) ]
+            b = [ rng.randrange(-(1 << bits), 1 << bits) for _ in range(500) ]
+            self.assertEqual([ MathLib.gcd(x, y) for x, y in zip(a, b) ], list(MathLib.gcd_many(a, b)))
+            self.assertEqual([ MathLib.lcm(x, y) for x, y in zip(a, b) ], list(MathLib.lcm_many(a, b)))
+        # broadcasting
+        result = MathLib.gcd_many(np.array([ [ 12 ], [ 18 ] ]), np.array([ 8, 9, 30 ]))
+        self.assertEqual([ [ 4, 3, 6 ], [ 2, 9, 6 ] ], result.tolist())
+        return
+
+    def test_xgcd_many(self):
+        rng = random.Random(11)
+        for bits in [ 8, 62, 100 ]:
+            a = [ rng.randrange(-(1 << bits), 1 << bits) for _ in range(500) ] + [ 0, 0, 5 ]
+            b = [ rng.randrange(-(1 << bits), 1 << bits) for _ in range(500) ] + [ 0, 7, 0 ]
+            g, x, y = MathLib.xgcd_many(a, b)
+            for i in range(len(a)):
+                self.assertEqual(MathLib.xgcd(a[i], b[i]), (int(g[i]), int(x[i]), int(y[i])))
+        return
+
+    def test_isqrt_many(self):
+        n = [ n for n, _ in MathLibTest.test_cases_isqrt ]
+        expected_result = [ r for _, r in MathLibTest.test_cases_isqrt ]
+        self.assertEqual(expected_result, list(MathLib.isqrt_many(n)))
+        # values near the 62-bit limit and above it
+        n = list(range(65536)) + [ (1 << 62) - 1, ((1 << 31) - 1) ** 2, (1 << 62) + 1, 1 << 500 ]
+        self.assertEqual([ MathLib.isqrt(v) for v in n ], list(MathLib.isqrt_many(n)))
+        with self.assertRaises(ValueError):
+            MathLib.isqrt_many([ 4, -1 ])
+        return
+
     # --- Internal Functions
     
     def do_check_gcd_all_methods(self, a, b, expected_value, verbose=False):
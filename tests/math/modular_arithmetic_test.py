@@ -17,6 +17,7 @@ class ModularArithmeticTest(unittest.TestCase):
         result = ModularArithmetic.mod_inv(99, 293)
         result = ModularArithmetic.mod_pow(3, 17, 991)
         result = ModularArithmetic.mod_sqrt(40, 997)
+        result = ModularArithmetic.mod_sqrt_composite(40, 997 * 991)
         return
 
     def test_multiplicative_inverse(self):
@@ -0,0 +1,58 @@
+# file: modular_context_benchmark.py
+
+# Benchmark of ModularContext against Python's built-in pow().
+#
+# Usage: python -m tests.math.modular_context_benchmark [count]
+
+import sys
+import time
+import random
+from ctf_library.math.modular_context import ModularContext
+from ctf_library.math.modular_arithmetic import ModularArithmetic
+
+def measure(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+def benchmark(count=20, seed=1):
+    rng = random.Random(seed)
+    print(f'{"case":<34} {"bits":>5} {"pow (s)":>9} {"context (s)":>12} {"speedup":>8}')
+    for bits in [ 256, 1024, 2048 ]:
+        n = rng.getrandbits(bits) | (1 << (bits - 1)) | 1
+        bases = [ rng.randrange(2, n) for _ in range(count) ]
+        exponents = [ rng.getrandbits(bits) for _ in range(count) ]
+
+        builtin_time = measure(lambda: [ pow(b, e, n) for b, e in zip(bases, exponents) ])
+        cases = [ ('square and multiply', lambda: [
+            ModularArithmetic.mod_pow(b, e, n) for b, e in zip(bases, exponents)
+        ]) ]
+        for reduction in ModularContext.reductions:
+            context = ModularContext(n, reduction=reduction)
+            cases.append((f'sliding window ({reduction})', lambda context=context: [
+                context.pow(b, e) for b, e in zip(bases, exponents)
+            ]))
+        for name, function in cases:
+            t = measure(function)
+            print(f'{name:<34} {bits:>5} {builtin_time:>9.4f} {t:>12.4f} {builtin_time / t:>7.2f}x')
+
+        # one base, many exponents
+        context = ModularContext(n)
+        g = bases[0]
+        builtin_time = measure(lambda: [ pow(g, e, n) for e in exponents ])
+        table_time = measure(lambda: context.fixed_base(g, bits, window=6))
+        table = context.fixed_base(g, bits, window=6)
+        t = measure(lambda: [ table.pow(e) for e in exponents ])
+        print(f'{"fixed base (table: " + f"{table_time:.4f}s)":<34} {bits:>5} {builtin_time:>9.4f} {t:>12.4f} {builtin_time / t:>7.2f}x')
+
+        # product of two powers
+        pairs = list(zip(bases, exponents, reversed(bases), reversed(exponents)))
+        builtin_time = measure(lambda: [ pow(a, x, n) * pow(b, y, n) % n for a, x, b, y in pairs ])
+        t = measure(lambda: [ context.multi_pow([ a, b ], [ x, y ]) for a, x, b, y in pairs ])
+        print(f'{"multi pow (2 bases)":<34} {bits:>5} {builtin_time:>9.4f} {t:>12.4f} {builtin_time / t:>7.2f}x')
+    return
+
+if __name__ == '__main__':
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
+
+# --- end of file --- #
@@ -0,0 +1,91 @@
+# file: modular_context_test.py
+
+import unittest
+import random
+from ctf_library.math.modular_context import ModularContext
+
+class ModularContextTest(unittest.TestCase):
+
+    test_moduli = [
+        2, 3, 4, 15, 1000000007, 2 ** 127 - 1,
+        # Test case from https://en.wikipedia.org/wiki/RSA_(cryptosystem)
+        3233,
+    ]
+
+    def test_pow(self):
+        rng = random.Random(1)
+        moduli = ModularContextTest.test_moduli + [ rng.getrandbits(512) | 1, rng.getrandbits(512) & ~1 ]
+        for n in moduli:
+            for reduction in self.reductions(n):
+                context = ModularContext(n, reduction=reduction)
+                for bits in [ 0, 1, 5, 64, 300, 700 ]:
+                    b = rng.randrange(-n, 2 * n)
+                    e = rng.getrandbits(bits)
+                    self.assertEqual(pow(b, e, n), context.pow(b, e))
+                    self.assertEqual(b * e % n, context.multiply(b, e))
+                for window in range(1, 9):
+                    self.assertEqual(pow(7, 12345, n), context.pow(7, 12345, window=window))
+        self.assertEqual(2790, ModularContext(3233, reduction='montgomery').pow(65, 17))
+        return
+
+    def test_pow_negative_exponent(self):
+        for reduction in ModularContext.reductions:
+            context = ModularContext(1000000007, reduction=reduction)
+            self.assertEqual(pow(3, -5, 1000000007), context.pow(3, -5))
+        with self.assertRaises(ValueError):
+            ModularContext(15).pow(3, -1)
+        return
+
+    def test_fixed_base(self):
+        rng = random.Random(2)
+        for n in ModularContextTest.test_moduli:
+            for reduction in self.reductions(n):
+                table = ModularContext(n, reduction=reduction).fixed_base(5, 200, window=3)
+                for bits in [ 0, 1, 100, 200 ]:
+                    e = rng.getrandbits(bits)
+                    self.assertEqual(pow(5, e, n), table.pow(e))
+                with self.assertRaises(ValueError):
+                    table.pow(1 << 201)
+        return
+
+    def test_multi_pow(self):
+        rng = random.Random(3)
+        for n in ModularContextTest.test_moduli:
+            for reduction in self.reductions(n):
+                context = ModularContext(n, reduction=reduction)
+                for count in [ 1, 2, 3 ]:
+                    bases = [ rng.randrange(n) for _ in range(count) ]
+                    exponents = [ rng.getrandbits(100) for _ in range(count) ]
+                    expected_result = 1 % n
+                    for b, e in zip(bases, exponents):
+                        expected_result = expected_result * pow(b, e, n) % n
+                    self.assertEqual(expected_result, context.multi_pow(bases, exponents))
+        self.assertEqual(pow(2, 10, 1000000007) * pow(3, -4, 1000000007) % 1000000007,
+                         ModularContext(1000000007).multi_pow([ 2, 3 ], [ 10, -4 ]))
+        return
+
+    def test_reductions(self):
+        rng = random.Random(4)
+        n = rng.getrandbits(256) | (1 << 255) | 1
+        context = ModularContext(n, reduction='montgomery')
+        for _ in range(100):
+            a, b = rng.randrange(n), rng.randrange(n)
+            self.assertEqual(a * b % n, context.barrett_reduce(a * b))
+            self.assertEqual(a, context.from_montgomery(context.to_montgomery(a)))
+            product = context.montgomery_multiply(context.to_montgomery(a), context.to_montgomery(b))
+            self.assertEqual(a * b % n, context.from_montgomery(product))
+        with self.assertRaises(ValueError):
+            ModularContext(16, reduction='montgomery')
+        with self.assertRaises(ValueError):
+            ModularContext(1)
+        return
+
+    # --- Internal Functions
+
+    def reductions(self, n):
+        return [ r for r in ModularContext.reductions if r != 'montgomery' or n % 2 == 1 ]
+
+if __name__ == '__main__':
+    unittest.main()
+
+# --- end of file --- #
@@ -0,0 +1,76 @@
+# file: modular_linear_algebra_test.py
+
+import unittest
+import random
+import itertools
+import numpy as np
+from ctf_library.math.modular_linear_algebra import ModularLinearAlgebra
+
+class ModularLinearAlgebraTest(unittest.TestCase):
+
+    test_moduli = [ 2, 4, 5, 6, 7, 8, 9, 12 ]
+
+    def test_solve_and_null_space(self):
+        # compare with all the vectors of small random systems
+        rng = random.Random(1)
+        for _ in range(300):
+            modulus = rng.choice(ModularLinearAlgebraTest.test_moduli)
+            n_rows, n_cols = rng.randint(1, 3), rng.randint(1, 3)
+            m = [ [ rng.randrange(modulus) for _ in range(n_cols) ] for _ in range(n_rows) ]
+            b = [ rng.randrange(modulus) for _ in range(n_rows) ]
+            vectors = list(itertools.product(range(modulus), repeat=n_cols))
+            solutions = [ x for x in vectors if self.multiply(m, x, modulus) == b ]
+            kernel = set(x for x in vectors if self.multiply(m, x, modulus) == [ 0 ] * n_rows)
+
+            null_space = ModularLinearAlgebra.null_space(m, modulus)
+            self.assertEqual(kernel, self.span(null_space, n_cols, modulus))
+            if len(solutions) == 0:
+                with self.assertRaises(ValueError):
+                    ModularLinearAlgebra.solve(m, b, modulus)
+            else:
+                x, null_space = ModularLinearAlgebra.solve(m, b, modulus)
+                self.assertIn(tuple(int(v) for v in x), solutions)
+                self.assertEqual(kernel, self.span(null_space, n_cols, modulus))
+        return
+
+    def test_howell_form(self):
+        form = ModularLinearAlgebra.howell_form([[2, 1]], 4)
+        self.assertEqual([[2, 1], [0, 2]], form.tolist())
+        form = ModularLinearAlgebra.howell_form([[1, 2, 3], [4, 5, 6], [7, 8, 10]], 7)
+        self.assertEqual(np.eye(3, dtype=int).tolist(), form.tolist())
+        self.assertEqual(3, ModularLinearAlgebra.rank([[1, 2, 3], [4, 5, 6], [7, 8, 10]], 7))
+        self.assertEqual(2, ModularLinearAlgebra.rank([[1, 2, 3], [4, 5, 6], [7, 8, 9]], 7))
+        return
+
+    def test_large_modulus(self):
+        rng = random.Random(2)
+        for modulus in [ 2 ** 31 - 1, 2 ** 127 - 1, 2 ** 64 * 3 ** 40 ]:
+            n = 6
+            m = [ [ rng.randrange(modulus) for _ in range(n) ] for _ in range(n) ]
+            b = [ rng.randrange(modulus) for _ in range(n) ]
+            try:
+                x, null_space = ModularLinearAlgebra.solve(m, b, modulus)
+            except ValueError:
+                continue
+            self.assertEqual(b, self.multiply(m, x, modulus))
+            for v in null_space:
+                self.assertEqual([ 0 ] * n, self.multiply(m, v, modulus))
+        return
+
+    @staticmethod
+    def multiply(m, x, modulus):
+        return [ sum(int(a) * int(b) for a, b in zip(row, x)) % modulus for row in m ]
+
+    @staticmethod
+    def span(rows, n_cols, modulus):
+        result = set()
+        for coefs in itertools.product(range(modulus), repeat=len(rows)):
+            result.add(tuple(
+                sum(c * int(row[j]) for c, row in zip(coefs, rows)) % modulus for j in range(n_cols)
+            ))
+        return result
+
+if __name__ == '__main__':
+    unittest.main()
+
+# --- end of file --- #
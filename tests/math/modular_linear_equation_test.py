@@ -26,6 +26,9 @@ class ModularLinearEquationTest(unittest.TestCase):
             [ [[3, 1, 3, 1], [6, 3, 2, 1], [6, 3, 6, 1]], 17 ],
             [ [[3, 12, 5, 7, 2], [3, 5, 2, 16, 1], [4, 5, 3, 5, 6], [15, 21, 3, 15, 16]], 23 ],
             [ [[3, 12, 5, 7, 2], [3, 5, 2, 16, 1], [4, 5, 3, 5, 6], [15, 21, 3, 15, 16]], 71 ],
+            # Composite modulo, and a pivot that is not invertible
+            [ [[2, 1, 3], [1, 1, 1]], 26 ],
+            [ [[13, 4, 5, 1], [2, 7, 1, 2], [1, 1, 1, 3]], 26 ],
             # Value out of range but have solutions
             [ [[3, 8]], 5 ],
             [ [[3, 10, 2], [1, 2, 13]], 5 ],
@@ -0,0 +1,129 @@
+# file: modular_sqrt_test.py
+
+import unittest
+import random
+from ctf_library.math.modular_sqrt import ModularSqrt
+from ctf_library.math.primality import Primality
+
+class ModularSqrtTest(unittest.TestCase):
+
+    # primes for each method:
+    # - 3 mod 4: 3, 7, 59, 991
+    # - 5 mod 8: 5, 13, 29, 293, 997
+    # - 1 mod 8: 17, 41, 97, 257, 65537 (Tonelli-Shanks and Cipolla)
+    test_primes = [ 2, 3, 5, 7, 13, 17, 29, 41, 59, 97, 257, 293, 991, 997, 65537 ]
+
+    def test_mod_sqrt(self):
+        for p in ModularSqrtTest.test_primes:
+            expected_results = self.all_roots(p)
+            for n in range(min(p, 2000)):
+                self.assertEqual(expected_results.get(n, []), ModularSqrt.mod_sqrt(n, p))
+                self.assertEqual(expected_results.get(n, []), ModularSqrt.mod_sqrt(n - p, p))
+        return
+
+    def test_mod_sqrt_large(self):
+        rng = random.Random(1)
+        primes = [ 2 ** 127 - 1, 2 ** 255 - 19, 998244353, 3 * 2 ** 30 + 1 ]
+        # a prime where p - 1 has a large power of two, for Cipolla's algorithm
+        k = 3
+        while not Primality.is_prime(k * 2 ** 200 + 1):
+            k += 2
+        primes.append(k * 2 ** 200 + 1)
+        for p in primes:
+            for _ in range(50):
+                r = rng.randrange(1, p)
+                result = ModularSqrt.mod_sqrt(r * r, p)
+                self.assertEqual(sorted([ r, p - r ]), result)
+            non_residue = ModularSqrt.find_non_residue(p)
+            self.assertEqual([], ModularSqrt.mod_sqrt(non_residue, p))
+        return
+
+    def test_tonelli_shanks_and_cipolla(self):
+        rng = random.Random(2)
+        p = 3 * 2 ** 30 + 1
+        context = ModularSqrt.prime_context(p)
+        self.assertEqual((3, 30), (context.q, context.s))
+        for _ in range(200):
+            n = rng.randrange(1, p)
+            r1 = ModularSqrt.sqrt_tonelli_shanks(n, context)
+            r2 = ModularSqrt.sqrt_cipolla(n, p)
+            self.assertEqual(r1 is None, r2 is None)
+            if r1 is not None:
+                self.assertEqual(n, r1 * r1 % p)
+                self.assertEqual(n, r2 * r2 % p)
+        return
+
+    def test_mod_sqrt_many(self):
+        p = 65537
+        values = list(range(-10, 1000))
+        expected_result = [ ModularSqrt.mod_sqrt(n, p) for n in values ]
+        ModularSqrt.clear_prime_cache()
+        self.assertEqual(expected_result, ModularSqrt.mod_sqrt_many(values, p))
+        return
+
+    def test_mod_sqrt_prime_power(self):
+        for p, k in [ (2, 1), (2, 2), (2, 3), (2, 10), (3, 7), (5, 5), (7, 4), (13, 3) ]:
+            modulus = p ** k
+            expected_results = self.all_roots(modulus)
+            for n in range(modulus):
+                self.assertEqual(expected_results.get(n, []), ModularSqrt.mod_sqrt_prime_power(n, p, k))
+        # a large prime power
+        p = 2 ** 61 - 1
+        r = 123456789123456789
+        for k in [ 2, 3, 5 ]:
+            modulus = p ** k
+            self.assertEqual(sorted([ r, modulus - r ]), ModularSqrt.mod_sqrt_prime_power(r * r, p, k))
+        return
+
+    def test_mod_sqrt_composite(self):
+        for modulus in range(1, 400):
+            expected_results = self.all_roots(modulus)
+            for n in range(modulus):
+                self.assertEqual(expected_results.get(n, []), ModularSqrt.mod_sqrt_composite(n, modulus))
+        # Rabin's cryptosystem: 4 roots modulo p * q
+        p, q = 2 ** 61 - 1, 2 ** 89 - 1
+        n = p * q
+        m = 1234567890123456789
+        result = ModularSqrt.mod_sqrt_composite(m * m % n, n, factorization={ p: 1, q: 1 })
+        self.assertEqual(4, len(result))
+        self.assertIn(m, result)
+        return
+
+    def test_iter_mod_sqrt_composite(self):
+        # 2 ^ 6 roots of 4 modulo a product of 6 odd primes, generated lazily
+        primes = [ 3, 5, 7, 11, 2 ** 61 - 1, 2 ** 89 - 1 ]
+        modulus = 1
+        for p in primes:
+            modulus *= p
+        factorization = { p: 1 for p in primes }
+        roots = ModularSqrt.iter_mod_sqrt_composite(4, modulus, factorization=factorization)
+        self.assertEqual(4, next(roots) ** 2 % modulus)
+        result = set(ModularSqrt.iter_mod_sqrt_composite(4, modulus, factorization=factorization))
+        self.assertEqual(64, len(result))
+        for r in result:
+            self.assertEqual(4, r * r % modulus)
+        self.assertEqual([], list(ModularSqrt.iter_mod_sqrt_composite(2, modulus, factorization=factorization)))
+        return
+
+    def test_not_prime(self):
+        # roots are checked, so a composite modulus never gives a wrong root
+        for n in [ 4, 8, 9, 15, 32, 55, 561, 1105 ]:
+            for v in range(n):
+                for r in ModularSqrt.mod_sqrt(v, n):
+                    self.assertEqual(v, r * r % n)
+        with self.assertRaises(ValueError):
+            ModularSqrt.mod_sqrt(1, 1)
+        return
+
+    # --- Internal Functions
+
+    def all_roots(self, modulus):
+        roots = {}
+        for r in range(modulus):
+            roots.setdefault(r * r % modulus, []).append(r)
+        return roots
+
+if __name__ == '__main__':
+    unittest.main()
+
+# --- end of file --- #
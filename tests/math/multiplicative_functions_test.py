@@ -0,0 +1,88 @@
+# file: multiplicative_functions_test.py
+
+import unittest
+import math
+from ctf_library.math.multiplicative_functions import MultiplicativeFunctions
+from ctf_library.math.factorization import Factorization
+
+class MultiplicativeFunctionsTest(unittest.TestCase):
+
+    # [ <n>, <phi>, <lambda>, <mu>, <omega>, <Omega> ]
+    test_cases = [
+        [ 1, 1, 1, 1, 0, 0 ], [ 2, 1, 1, -1, 1, 1 ], [ 8, 4, 2, 0, 1, 3 ],
+        [ 16, 8, 4, 0, 1, 4 ], [ 15, 8, 4, 1, 2, 2 ], [ 30, 8, 4, -1, 3, 3 ],
+        [ 561, 320, 80, -1, 3, 3 ], [ 3233, 3120, 780, 1, 2, 2 ],
+        [ 65536, 32768, 16384, 0, 1, 16 ],
+    ]
+
+    def test_functions(self):
+        verbose = False
+        for n, phi, lam, mu, omega, big_omega in MultiplicativeFunctionsTest.test_cases:
+            factorization = Factorization.factorint(n)
+            if verbose:
+                print(f'{n}: {factorization}')
+            self.assertEqual(phi, MultiplicativeFunctions.euler_phi(factorization))
+            self.assertEqual(lam, MultiplicativeFunctions.carmichael_lambda(factorization))
+            self.assertEqual(mu, MultiplicativeFunctions.mobius(factorization))
+            self.assertEqual(omega, MultiplicativeFunctions.omega(factorization))
+            self.assertEqual(big_omega, MultiplicativeFunctions.big_omega(factorization))
+            self.assertEqual(phi, Factorization.euler_totient_function(n))
+            self.assertEqual(lam, Factorization.carmichael_lambda_function(n))
+            self.assertEqual(mu, Factorization.mobius_function(n))
+        return
+
+    def test_functions_brute_force(self):
+        for n in range(1, 500):
+            factorization = Factorization.factorint(n)
+            units = [ a for a in range(1, n + 1) if math.gcd(a, n) == 1 ]
+            self.assertEqual(len(units), MultiplicativeFunctions.euler_phi(factorization))
+            lam = MultiplicativeFunctions.carmichael_lambda(factorization)
+            for a in units:
+                self.assertEqual(1 % n, pow(a, lam, n))
+            # lambda is the smallest such exponent
+            for p in Factorization.factorint(lam):
+                self.assertTrue(any(pow(a, lam // p, n) != 1 % n for a in units))
+            divisors = [ d for d in range(1, n + 1) if n % d == 0 ]
+            self.assertEqual(sum(divisors), MultiplicativeFunctions.sigma(factorization))
+            self.assertEqual(len(divisors), MultiplicativeFunctions.sigma(factorization, k=0))
+        return
+
+    def test_tables(self):
+        limit = 3000
+        phi_table = MultiplicativeFunctions.euler_phi_table(limit)
+        lambda_table = MultiplicativeFunctions.carmichael_lambda_table(limit)
+        mobius_table = MultiplicativeFunctions.mobius_table(limit)
+        self.assertEqual(limit + 1, len(phi_table))
+        self.assertEqual([ 0, 0, 0 ], [ phi_table[0], lambda_table[0], mobius_table[0] ])
+        for n in range(1, limit + 1):
+            factorization = Factorization.factorint(n)
+            self.assertEqual(MultiplicativeFunctions.euler_phi(factorization), phi_table[n])
+            self.assertEqual(MultiplicativeFunctions.carmichael_lambda(factorization), lambda_table[n])
+            self.assertEqual(MultiplicativeFunctions.mobius(factorization), mobius_table[n])
+        return
+
+    def test_factorization_cache(self):
+        n = 4294967291 * 4294967279
+        Factorization.clear_factorization_cache()
+        self.assertEqual(n - 4294967291 - 4294967279 + 1, Factorization.euler_totient_function(n))
+        self.assertIn(n, Factorization._factorization_cache)
+        # the cache returns a copy of the factorization
+        factorization = Factorization.factorint(n)
+        factorization[2] = 1
+        self.assertEqual({ 4294967279: 1, 4294967291: 1 }, Factorization.factorint(n))
+        # the cache is bounded
+        cache_size = Factorization.factorization_cache_size
+        try:
+            Factorization.factorization_cache_size = 10
+            for number in range(10 ** 12, 10 ** 12 + 20):
+                Factorization.factorint(number)
+            self.assertEqual(10, len(Factorization._factorization_cache))
+            self.assertNotIn(n, Factorization._factorization_cache)
+        finally:
+            Factorization.factorization_cache_size = cache_size
+        return
+
+if __name__ == '__main__':
+    unittest.main()
+
+# --- end of file --- #
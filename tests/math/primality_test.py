@@ -0,0 +1,82 @@
+# file: primality_test.py
+
+import unittest
+import random
+from ctf_library.math.primality import Primality
+from ctf_library.math.prime_sieve import PrimeSieve
+
+class PrimalityTest(unittest.TestCase):
+
+    # [ <n>, <is prime> ]
+    test_cases = [
+        [ -7, False ], [ 0, False ], [ 1, False ], [ 2, True ], [ 3, True ], [ 4, False ],
+        [ 65537, True ], [ 1000003, True ], [ 1000001, False ],
+        # strong pseudoprimes to base 2
+        [ 2047, False ], [ 3277, False ], [ 4033, False ],
+        # Carmichael numbers
+        [ 561, False ], [ 41041, False ], [ 825265, False ],
+        # strong pseudoprimes to bases 2 to 37 (https://oeis.org/A014233)
+        [ 3825123056546413051, False ],
+        [ 318665857834031151167461, False ],
+        [ 3317044064679887385961981, False ],
+        # Mersenne numbers
+        [ 2 ** 61 - 1, True ], [ 2 ** 67 - 1, False ],
+        [ 2 ** 127 - 1, True ], [ 2 ** 521 - 1, True ], [ 2 ** 523 - 1, False ],
+        # products of two large primes
+        [ (2 ** 89 - 1) * (2 ** 107 - 1), False ],
+        [ (2 ** 127 - 1) ** 2, False ],
+    ]
+
+    def test_is_prime(self):
+        verbose = False
+        for n, expected_result in PrimalityTest.test_cases:
+            result = Primality.is_prime(n)
+            if verbose:
+                print(f'is_prime({n}) = {result}')
+            self.assertEqual(expected_result, result)
+        return
+
+    def test_is_prime_many(self):
+        numbers = [ n for n, _ in PrimalityTest.test_cases ]
+        expected_result = [ is_prime for _, is_prime in PrimalityTest.test_cases ]
+        self.assertEqual(expected_result, Primality.is_prime_many(numbers))
+        self.assertEqual(expected_result, Primality.is_prime_many(iter(numbers)))
+        self.assertEqual([], Primality.is_prime_many([]))
+        return
+
+    def test_is_prime_sieve(self):
+        # compare with the sieve beyond the range covered by the shared table
+        sieve = PrimeSieve(limit=300000)
+        for n in range(200000, 300001):
+            self.assertEqual(sieve.is_prime(n), Primality.is_prime(n))
+        return
+
+    def test_baillie_psw(self):
+        sieve = PrimeSieve(limit=100000)
+        for n in range(1001, 100000, 2):
+            self.assertEqual(sieve.is_prime(n), Primality.baillie_psw(n))
+        return
+
+    def test_miller_rabin_deterministic_bases(self):
+        for n in [ random.getrandbits(80) | 1 for _ in range(200) ]:
+            expected_result = Primality.miller_rabin(n, list(range(2, 100)))
+            self.assertEqual(expected_result, Primality.is_prime(n))
+        return
+
+    def test_jacobi_symbol(self):
+        # for a prime modulus, the jacobi symbol is the legendre symbol
+        for p in [ 3, 5, 7, 11, 13, 997 ]:
+            for a in range(-20, 50):
+                s = pow(a, (p - 1) // 2, p)
+                expected_result = -1 if s == p - 1 else s
+                self.assertEqual(expected_result, Primality.jacobi_symbol(a, p))
+        self.assertEqual(-1, Primality.jacobi_symbol(7, 15))
+        self.assertEqual(1, Primality.jacobi_symbol(4, 15))
+        with self.assertRaises(ValueError):
+            Primality.jacobi_symbol(3, 8)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
+
+# --- end of file --- #
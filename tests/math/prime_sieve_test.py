@@ -0,0 +1,105 @@
+# file: prime_sieve_test.py
+
+import unittest
+import os
+import random
+import tempfile
+from ctf_library.math.prime_sieve import PrimeSieve
+from ctf_library.math.factorization import Factorization
+
+class PrimeSieveTest(unittest.TestCase):
+
+    def test_primes(self):
+        verbose = False
+        sieve = PrimeSieve(limit=1000)
+        expected_primes = [
+            n for n in range(1000) if n >= 2 and all(n % d != 0 for d in range(2, n))
+        ]
+        if verbose:
+            print(f'primes: {sieve.primes}')
+        self.assertEqual(expected_primes, sieve.primes)
+        self.assertEqual(expected_primes, PrimeSieve.simple_sieve(1000))
+        for n in range(1000):
+            self.assertEqual(n in expected_primes, sieve.is_prime(n))
+        return
+
+    def test_extend(self):
+        # grow the table over several small segments and compare it with a table
+        # built in one go
+        segment_size = PrimeSieve.segment_size
+        try:
+            PrimeSieve.segment_size = 97
+            sieve = PrimeSieve(limit=10)
+            for limit in [ 11, 50, 51, 1000, 5000 ]:
+                sieve.extend(limit)
+                self.assertEqual(limit, sieve.limit)
+        finally:
+            PrimeSieve.segment_size = segment_size
+        expected_sieve = PrimeSieve(limit=5000)
+        self.assertEqual(list(expected_sieve.spf), list(sieve.spf))
+        self.assertEqual(expected_sieve.primes, sieve.primes)
+        return
+
+    def test_factorize(self):
+        verbose = False
+        sieve = PrimeSieve(limit=100000)
+        for n in list(range(1, 2000)) + random.sample(range(2000, 100001), 200):
+            factors = sieve.factorize(n)
+            if verbose:
+                print(f'{n}: {factors}')
+            self.assertEqual(factors, sorted(factors))
+            self.assertEqual(n, self.list_multiplication(factors))
+            for p in factors:
+                self.assertTrue(sieve.is_prime(p))
+            if n >= 2:
+                self.assertEqual(factors[0], sieve.smallest_prime_factor(n))
+        return
+
+    def test_save_load(self):
+        sieve = PrimeSieve(limit=20000)
+        with tempfile.TemporaryDirectory() as dirname:
+            filename = os.path.join(dirname, 'spf.bin')
+            sieve.save(filename)
+            loaded_sieve = PrimeSieve.load(filename)
+            self.assertEqual(sieve.limit, loaded_sieve.limit)
+            self.assertEqual(sieve.primes, loaded_sieve.primes)
+            for n in range(2, 20001):
+                self.assertEqual(sieve.factorize(n), loaded_sieve.factorize(n))
+            # a loaded table can still grow
+            loaded_sieve.extend(30000)
+            self.assertEqual(PrimeSieve(limit=30000).primes, loaded_sieve.primes)
+            del loaded_sieve
+        return
+
+    def test_load_invalid_file(self):
+        with tempfile.TemporaryDirectory() as dirname:
+            filename = os.path.join(dirname, 'invalid.bin')
+            with open(filename, 'wb') as fd:
+                fd.write(b'not a table at all')
+            with self.assertRaises(ValueError):
+                PrimeSieve.load(filename)
+        return
+
+    def test_factorization_large_prime_cofactor(self):
+        # a number with a large prime cofactor is trial divided by the
+        # primes in the table only up to the square root of the cofactor
+        for number, expected_factors in [
+            [ 2 * 3 * 1000000007, [ 2, 3, 1000000007 ] ],
+            [ 999983 * 1000003, [ 999983, 1000003 ] ],
+            [ 1000003 ** 2 * 7, [ 7, 1000003, 1000003 ] ],
+        ]:
+            self.assertEqual(expected_factors, Factorization.prime_factorization(number))
+        return
+
+    # --- Internal Functions
+
+    def list_multiplication(self, number_list):
+        product = 1
+        for number in number_list:
+            product *= number
+        return product
+
+if __name__ == '__main__':
+    unittest.main()
+
+# --- end of file --- #